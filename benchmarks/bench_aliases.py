@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# benchmarks/bench_aliases.py
+
+"""
+Risoluzione dei nomi degli oggetti: scansione lineare di tutti gli oggetti
+e dei loro names contro l'indice degli alias (esatto, prefisso, mancante).
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_aliases --items 50000 --lookups 5000
+"""
+
+import time
+import argparse
+
+from engine.data.aliases import WorldAliases, normalize
+from engine.data.models import World, Item
+
+ADJECTIVES = ("rossa", "antica", "rotta", "dorata", "piccola", "pesante", "strana")
+
+
+def _world(items: int):
+    w = World({"start_room": "a"})
+    for n in range(items):
+        adj = ADJECTIVES[n % len(ADJECTIVES)]
+        w.items[f"ogg_{n}"] = Item(f"ogg_{n}", [f"pietra {adj} {n}", f"sasso {n}"], "", 1.0, [])
+    return w
+
+
+def naive_resolve(world, phrase):
+    tokens = normalize(phrase)
+    found = []
+    for iid, item in world.items.items():
+        for name in (iid, *item.names):
+            words = normalize(name)
+            if len(tokens) <= len(words) and all(w.startswith(t) for t, w in zip(tokens, words)):
+                found.append(iid)
+                break
+    return found
+
+
+def _time(fn, phrases):
+    t0 = time.perf_counter()
+    for p in phrases:
+        fn(p)
+    return (time.perf_counter() - t0) / len(phrases) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--items", type=int, default=50000)
+    ap.add_argument("--lookups", type=int, default=5000)
+    ap.add_argument("--naive-lookups", type=int, default=20)
+    args = ap.parse_args()
+    world = _world(args.items)
+
+    t0 = time.perf_counter()
+    aliases = WorldAliases(world)
+    build = time.perf_counter() - t0
+    print(f"{args.items} oggetti, {len(aliases.items)} chiavi, costruzione indice {build * 1000:.0f} ms")
+
+    step = max(1, args.items // args.lookups)
+    cases = {
+        "esatto": [f"la pietra {ADJECTIVES[n % len(ADJECTIVES)]} {n}" for n in range(0, args.items, step)],
+        "prefisso": [f"sas {n}" for n in range(0, args.items, step)],
+        "mancante": [f"lanterna {n}" for n in range(0, args.items, step)],
+    }
+    for label, phrases in cases.items():
+        indexed = _time(aliases.items.resolve, phrases)
+        naive = _time(lambda p: naive_resolve(world, p), phrases[:args.naive_lookups])
+        print(f"  {label:9s} scansione {naive:12.1f} µs   indice {indexed:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
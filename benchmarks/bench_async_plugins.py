@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# benchmarks/bench_async_plugins.py
+
+"""
+Latenza del turno con plugin I/O-bound: N sessioni concorrenti nello
+stesso loop asyncio (come in `tqe serve`), ognuna con un plugin che su ogni
+comando "leggi" attende un I/O simulato e registra ogni azione in post_action.
+
+  sync   time.sleep() negli hook: ogni attesa ferma il loop e tutte le sessioni
+  async  hook async attesi da dispatch_async, post_action in background
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_async_plugins --sessions 20 --turns 20 --io-ms 5
+"""
+
+import time
+import asyncio
+import argparse
+import tempfile
+
+from engine.core.game import Game
+from engine.data.loader import load_world
+from engine.plugins.base import PluginBase
+from benchmarks.worldgen import generate_world
+
+IO_SECONDS = 0.005
+
+
+class SyncArchive(PluginBase):
+    def on_command_leggi(self, action, state, world):
+        time.sleep(IO_SECONDS)
+        return "Hai letto il registro."
+
+    def on_post_action(self, action, state, world):
+        time.sleep(IO_SECONDS)
+
+
+class AsyncArchive(PluginBase):
+    async def on_command_leggi(self, action, state, world):
+        await asyncio.sleep(IO_SECONDS)
+        return "Hai letto il registro."
+
+    async def on_post_action(self, action, state, world):
+        await asyncio.sleep(IO_SECONDS)
+
+
+SCRIPT = ["guarda", "leggi registro", "vai est", "inventario", "vai ovest"]
+
+
+async def _session(world, plugin_cls, turns, latencies):
+    game = Game(world, profile=False)
+    plugin_cls().register(game.dispatcher)
+    for n in range(turns):
+        t0 = time.perf_counter()
+        await game.process_async(SCRIPT[n % len(SCRIPT)])
+        latencies.append(time.perf_counter() - t0)
+        await asyncio.sleep(0)  # il client risponde: cede il loop
+    return game
+
+
+async def _run(world, plugin_cls, sessions, turns):
+    latencies = []
+    t0 = time.perf_counter()
+    games = await asyncio.gather(*(_session(world, plugin_cls, turns, latencies) for _ in range(sessions)))
+    elapsed = time.perf_counter() - t0
+    for game in games:
+        await game.dispatcher.drain()
+    return elapsed, sorted(latencies)
+
+
+def _percentile(values, p):
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main():
+    global IO_SECONDS
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=20)
+    ap.add_argument("--turns", type=int, default=20)
+    ap.add_argument("--io-ms", type=float, default=5.0)
+    args = ap.parse_args()
+    IO_SECONDS = args.io_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = load_world(generate_world(tmp, rooms=400))
+
+    print(f"{args.sessions} sessioni x {args.turns} turni, I/O simulato {args.io_ms:.0f} ms")
+    print(f"{'plugin':<8}{'p50 ms':>10}{'p99 ms':>10}{'totale s':>10}{'turni/s':>10}")
+    for name, cls in (("sync", SyncArchive), ("async", AsyncArchive)):
+        elapsed, lat = asyncio.run(_run(world, cls, args.sessions, args.turns))
+        print(f"{name:<8}{_percentile(lat, 50) * 1e3:>10.2f}{_percentile(lat, 99) * 1e3:>10.2f}"
+              f"{elapsed:>10.2f}{len(lat) / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# benchmarks/bench_check.py
+
+"""
+Tempo di 'tqe check' su un mondo grande: controlli per stanza in serie
+e distribuiti su un pool di processi, più l'analisi del grafo.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_check --rooms 100000
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from engine.data.loader import load_world
+from engine.data.validate import check_world, check_rooms, _parallel_check_rooms
+from benchmarks.worldgen import generate_world
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=100000)
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world_path = generate_world(tmp, rooms=args.rooms, npcs=args.rooms // 100,
+                                    missions=args.rooms // 100)
+        load_world(world_path, use_cache=True)  # compila lo snapshot
+
+        t0 = time.perf_counter()
+        world = load_world(world_path, use_cache=True)
+        load = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        check_rooms(world, list(world.rooms))
+        serial = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _parallel_check_rooms(world, args.jobs)
+        parallel = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        report = check_world(world, jobs=args.jobs)
+        total = time.perf_counter() - t0
+
+    print(f"{args.rooms} stanze, {args.jobs} processi")
+    print(f"  caricamento (snapshot)      {load * 1000:8.0f} ms")
+    print(f"  controlli stanze, serie     {serial * 1000:8.0f} ms")
+    print(f"  controlli stanze, pool      {parallel * 1000:8.0f} ms")
+    print(f"  check_world completo        {total * 1000:8.0f} ms "
+          f"({report['errors']} errori, {report['warnings']} avvisi)")
+
+
+if __name__ == "__main__":
+    main()
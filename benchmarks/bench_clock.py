@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# benchmarks/bench_clock.py
+
+"""
+Eventi programmati per sessione: a ogni turno il tempo avanza e scattano
+gli eventi scaduti. Confronto fra una lista scandita a ogni turno e la
+TimerQueue (heap) dello stato, più il costo di un turno completo di Game
+con molti eventi pendenti.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_clock --events 50000 --turns 20000
+"""
+
+import time
+import random
+import argparse
+import tempfile
+
+from engine.core.clock import schedule
+from engine.core.game import Game
+from engine.data.containers import TimerQueue
+from engine.data.models import World, Room
+
+
+def naive_turns(events, steps):
+    # lista di (scadenza, nome): ogni turno scorre tutti gli eventi pendenti
+    pending = list(events)
+    now = fired = 0
+    for step in steps:
+        now += step
+        due = [e for e in pending if e[0] <= now]
+        if due:
+            pending = [e for e in pending if e[0] > now]
+            due.sort()
+            fired += len(due)
+    return fired
+
+
+def heap_turns(events, steps):
+    queue = TimerQueue()
+    for due, name in events:
+        queue.push(due, name)
+    now = fired = 0
+    for step in steps:
+        now += step
+        while queue.pop_due(now) is not None:
+            fired += 1
+    return fired
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--events", type=int, default=50000)
+    ap.add_argument("--turns", type=int, default=20000)
+    args = ap.parse_args()
+
+    rnd = random.Random(1)
+    steps = [rnd.randint(1, 10) for _ in range(args.turns)]
+    horizon = sum(steps) * 2
+    events = [(rnd.randrange(horizon), f"evento{n}") for n in range(args.events)]
+
+    print(f"{args.events} eventi programmati, {args.turns} turni")
+    t0 = time.perf_counter()
+    naive_fired = naive_turns(events, steps)
+    naive = (time.perf_counter() - t0) / args.turns * 1e6
+    t0 = time.perf_counter()
+    heap_fired = heap_turns(events, steps)
+    heap = (time.perf_counter() - t0) / args.turns * 1e6
+    print(f"  lista scandita      : {naive:10.2f} µs/turno")
+    print(f"  TimerQueue (heap)   : {heap:10.2f} µs/turno (inserimenti compresi)")
+    print(f"  eventi scattati     : {naive_fired} / {heap_fired}")
+
+    world = World({"start_room": "a"})
+    world.rooms["a"] = Room("a", "Stanza", "Una stanza.", {}, [])
+    with tempfile.TemporaryDirectory() as tmp:
+        for pending in (0, args.events):
+            game = Game(world, save_dir=tmp)
+            for due, name in events[:pending]:
+                schedule(game.state, horizon + due, name)
+            t0 = time.perf_counter()
+            for _ in range(args.turns):
+                game.process("guarda")
+            per_turn = (time.perf_counter() - t0) / args.turns * 1e6
+            print(f"  turno Game, {pending:6d} pendenti: {per_turn:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# benchmarks/bench_describe.py
+
+"""
+Costo di 'guarda' su un server con molte sessioni: descrizione ricostruita
+a ogni richiesta (Room.render) contro describe() con cache invalidata
+dalle versioni di oggetti, uscite e flag.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_describe --rooms 500 --sessions 200 --looks 50000
+"""
+
+import time
+import random
+import argparse
+
+from engine.data.models import World, Room, Item
+from engine.data.overlay import WorldOverlay
+
+
+def _world(rooms: int, items_per_room: int) -> World:
+    w = World({"start_room": "r0"})
+    for n in range(rooms):
+        ids = [f"i{n}_{k}" for k in range(items_per_room)]
+        for iid in ids:
+            w.items[iid] = Item(iid, [f"oggetto {iid}", iid], "", 1.0, [])
+        conns = {"nord": f"r{(n + 1) % rooms}", "sud": f"r{(n - 1) % rooms}",
+                 "est": f"r{(n + 7) % rooms}", "ovest": f"r{(n - 7) % rooms}"}
+        w.rooms[f"r{n}"] = Room(f"r{n}", f"Stanza {n}",
+                                "Una stanza piuttosto ordinaria, con pareti di pietra. " * 3,
+                                conns, ids)
+    return w
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=500)
+    ap.add_argument("--items", type=int, default=12, help="Oggetti per stanza")
+    ap.add_argument("--sessions", type=int, default=200)
+    ap.add_argument("--looks", type=int, default=50000)
+    ap.add_argument("--take-every", type=int, default=20, help="Un 'prendi' ogni N 'guarda'")
+    args = ap.parse_args()
+
+    world = _world(args.rooms, args.items)
+    rng = random.Random(0)
+    sessions = [WorldOverlay(world) for _ in range(args.sessions)]
+    ids = list(world.rooms)
+    plan = [(rng.choice(sessions), rng.choice(ids), n % args.take_every == 0) for n in range(args.looks)]
+
+    def run(describe):
+        t0 = time.perf_counter()
+        for session, rid, take in plan:
+            room = session.rooms[rid]
+            if take and room.items:
+                room.items.remove(room.items[0])
+            describe(room, session)
+        return (time.perf_counter() - t0) / len(plan) * 1e6
+
+    uncached = run(lambda room, w: room.render({}, w))
+    for s in sessions:
+        s.restore({})
+    cached = run(lambda room, w: room.describe({}, w))
+
+    print(f"{args.rooms} stanze, {args.sessions} sessioni, {args.looks} 'guarda' "
+          f"(un 'prendi' ogni {args.take_every})")
+    print(f"  senza cache  {uncached:7.2f} µs/guarda")
+    print(f"  con cache    {cached:7.2f} µs/guarda")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# benchmarks/bench_dialogue.py
+
+"""
+Conversazioni con NPC dai dialoghi molto grandi: interpretazione diretta
+della lista npc.dialogues a ogni battuta (ricerca del nodo per id, filtri
+e testo ricostruiti) contro il grafo compilato di engine.core.dialogue.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_dialogue --npcs 20 --nodes 5000 --turns 20000
+"""
+
+import time
+import random
+import argparse
+
+from engine.core.dialogue import dialogue_graph, END_MARKERS
+from engine.core.missions import requirement_met
+from engine.data.models import World, Room, NPC
+from engine.data.overlay import WorldOverlay
+from engine.data.state import GameState
+
+
+def _dialogues(nodes: int, rnd: random.Random):
+    out = []
+    for n in range(nodes):
+        options = [{"reply": f"Risposta {k}", "text": f"Replica {n}.{k}",
+                    "next": f"n{rnd.randrange(nodes)}"} for k in range(3)]
+        options[2]["requires"] = {"have_item": "moneta"}
+        out.append({"id": f"n{n}", "text": f"Battuta {n} " + "bla " * 20, "options": options})
+    return out
+
+
+def _world(npcs: int, nodes: int) -> WorldOverlay:
+    rnd = random.Random(1)
+    w = World({"start_room": "piazza"})
+    w.rooms["piazza"] = Room("piazza", "Piazza", "", {}, [])
+    for n in range(npcs):
+        w.npcs[f"npc{n}"] = NPC(f"npc{n}", f"NPC {n}", "piazza", _dialogues(nodes, rnd))
+    return WorldOverlay(w)
+
+
+def interpreted_talk(npc, state, world, choice=None) -> str:
+    # dialogo senza compilazione: il nodo corrente è cercato per id
+    variables = state["variables"]
+    key = f"dialogue_{npc.id}"
+    current = variables.get(key, npc.dialogues[0]["id"])
+    node = next((d for d in npc.dialogues if d.get("id") == current), None)
+    if node is None:
+        return f"{npc.name} non ha altro da dire in questo momento."
+    options = [o for o in node.get("options", [])
+               if all(requirement_met(kind, key, state, world)
+                      for kind, keys in (o.get("requires") or {}).items()
+                      for key in ([keys] if isinstance(keys, str) else keys))]
+    if choice is None:
+        lines = [f"{npc.name} dice: \"{node.get('text', '')}\"", "Opzioni:"]
+        lines.extend(f"  {i}. {o.get('reply')}" for i, o in enumerate(options, 1))
+        lines.append(f"Per rispondere digita: parla {npc.id} <numero_opzione>")
+        return "\n".join(lines)
+    option = options[choice - 1]
+    target = option.get("next")
+    variables[key] = None if target in END_MARKERS else target
+    return f"{npc.name} dice: \"{option.get('text')}\""
+
+
+def _run(talk, world, turns: int, seed: int = 2) -> float:
+    rnd = random.Random(seed)
+    state = GameState(current_room="piazza", inventory=["moneta"])
+    npcs = list(world.npcs)
+    t0 = time.perf_counter()
+    for t in range(turns):
+        npc_id = npcs[t % len(npcs)]
+        talk(npc_id, state, world)
+        talk(npc_id, state, world, rnd.randint(1, 3))
+    return (time.perf_counter() - t0) / (2 * turns) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--npcs", type=int, default=20)
+    ap.add_argument("--nodes", type=int, default=5000, help="Nodi di dialogo per NPC")
+    ap.add_argument("--turns", type=int, default=20000)
+    args = ap.parse_args()
+
+    world = _world(args.npcs, args.nodes)
+    print(f"{args.npcs} NPC da {args.nodes} nodi, {args.turns} scambi (battuta + scelta)")
+
+    t0 = time.perf_counter()
+    for npc_id in world.npcs:
+        dialogue_graph(world, npc_id)
+    print(f"  compilazione        : {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+    interpreted = _run(lambda nid, s, w, c=None: interpreted_talk(w.npcs[nid], s, w, c), world, args.turns)
+    compiled = _run(lambda nid, s, w, c=None: dialogue_graph(w, nid).talk(s, w, c), world, args.turns)
+    print(f"  lista interpretata  : {interpreted:8.2f} µs/battuta")
+    print(f"  grafo compilato     : {compiled:8.2f} µs/battuta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# benchmarks/bench_dispatch.py
+
+"""
+Throughput di EventDispatcher.dispatch con 0, 10 e 100 plugin sottoscritti:
+tabella compilata contro la vecchia catena di if con lookup "command_{cmd}".
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_dispatch --calls 200000
+"""
+
+import time
+import argparse
+from types import SimpleNamespace
+
+from engine.core.dispatcher import EventDispatcher
+from engine.data.models import World, Room, Item
+
+COMMANDS = ["look", "inventory", "stats", "move", "take", "missions"]
+
+
+class LegacyDispatcher(EventDispatcher):
+    """
+    Riproduce la dispatch precedente: ricerca "command_{cmd}" a ogni
+    chiamata e catena lineare di confronti sui comandi core.
+    """
+
+    def dispatch(self, action, state, world):
+        cmd = action.command
+        for callback in self.subscribers.get(f"command_{cmd}", []):
+            out = callback(action, state, world)
+            if out is not None:
+                return out
+        for name in ("help", "look", "inventory", "move", "take", "drop",
+                     "use", "save", "load", "missions", "stats"):
+            if cmd == name:
+                return self.commands[name](action, state, world)
+        return f"Comando non riconosciuto: '{cmd}'. Digita 'help' per assistenza."
+
+
+def _world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "a"}, ["chiave"])
+    w.items["chiave"] = Item("chiave", ["chiave"], "Una chiave", 0.1, [])
+    return w
+
+
+def _subscribe_plugins(dispatcher, count):
+    for n in range(count):
+        dispatcher.subscribe("pre_action", lambda a, s, w: None)
+        dispatcher.subscribe(f"command_verbo{n}", lambda a, s, w: None)
+        if n % 10 == 0:
+            # un plugin su dieci osserva anche un comando core
+            dispatcher.subscribe(f"command_{COMMANDS[n % len(COMMANDS)]}", lambda a, s, w: None)
+
+
+def _run(cls, plugins, calls):
+    dispatcher = cls()
+    _subscribe_plugins(dispatcher, plugins)
+    world = _world()
+    state = {"current_room": "a", "inventory": [], "missions": {}, "time": 0}
+    actions = [SimpleNamespace(command=c, target=None, indirect=None) for c in COMMANDS]
+    dispatch = dispatcher.dispatch
+
+    t0 = time.perf_counter()
+    for n in range(calls):
+        dispatch(actions[n % len(actions)], state, world)
+    return calls / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--calls", type=int, default=200000)
+    args = ap.parse_args()
+
+    print(f"{'plugin':>7}{'if-chain':>14}{'compilata':>14}")
+    for plugins in (0, 10, 100):
+        legacy = _run(LegacyDispatcher, plugins, args.calls)
+        compiled = _run(EventDispatcher, plugins, args.calls)
+        print(f"{plugins:>7}{legacy:>10.0f}/s  {compiled:>10.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# benchmarks/bench_heavy_plugins.py
+
+"""
+Effetto di un plugin lento sulle altre sessioni di `tqe serve`: una
+sessione invoca ripetutamente un comando gestito da un plugin CPU-bound,
+le altre eseguono un copione normale. Confronta il plugin eseguito nel
+loop del server (heavy = False) e nel pool di processi (heavy = True).
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_heavy_plugins --sessions 20 --work-ms 50
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.worldgen import generate_world
+from benchmarks.bench_server_load import _session, _percentile, _wait_for_socket
+from engine.core.server import REPLY_END
+
+PLUGIN = '''
+import time
+from engine.plugins.base import PluginBase
+
+class Oracolo(PluginBase):
+    heavy = {heavy}
+    timeout = 5.0
+
+    def on_command_evoca(self, action, state, world):
+        # lavoro CPU-bound (generazione procedurale, NPC costoso, ...)
+        deadline = time.process_time() + {work}
+        n = 0
+        while time.process_time() < deadline:
+            n += 1
+        state["profezie"] = state.get("profezie", 0) + 1
+        return "L'oracolo ha parlato."
+'''
+
+
+async def _slow_session(path: str, stop: asyncio.Event, latencies: list):
+    reader, writer = await asyncio.open_unix_connection(path)
+    end = REPLY_END.encode("utf-8")
+    await reader.readuntil(end)
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        writer.write(b"evoca\n")
+        await reader.readuntil(end)
+        latencies.append(time.perf_counter() - t0)
+    writer.close()
+
+
+async def _run(path: str, sessions: int, turns: int):
+    stop = asyncio.Event()
+    normal, slow = [], []
+    slow_task = asyncio.create_task(_slow_session(path, stop, slow))
+    await asyncio.sleep(0.2)
+    await asyncio.gather(*(_session(path, turns, normal) for _ in range(sessions)))
+    stop.set()
+    await slow_task
+    return sorted(normal), sorted(slow)
+
+
+def _measure(tmp: str, world_path: str, heavy: bool, args):
+    with open(os.path.join(tmp, "plugins", "oracolo.py"), "w") as f:
+        f.write(PLUGIN.format(heavy=heavy, work=args.work_ms / 1000))
+    sock = os.path.join(tmp, f"tqe-{heavy}.sock")
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=repo)
+    proc = subprocess.Popen([sys.executable, "-m", "engine.utils.cli", "serve",
+                             "--world", world_path, "--unix", sock],
+                            cwd=tmp, env=env, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(_wait_for_socket(sock))
+        return asyncio.run(_run(sock, args.sessions, args.turns))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=20, help="sessioni normali")
+    ap.add_argument("--turns", type=int, default=50, help="comandi per sessione normale")
+    ap.add_argument("--work-ms", type=float, default=50.0, help="CPU per chiamata del plugin lento")
+    ap.add_argument("--rooms", type=int, default=400)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world_path = generate_world(tmp, rooms=args.rooms)
+        os.makedirs(os.path.join(tmp, "plugins"))
+        print(f"{args.sessions} sessioni normali + 1 sessione con un plugin da {args.work_ms:.0f} ms CPU")
+        print(f"{'modo':<22}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'plugin p50 ms':>15}")
+        for heavy, name in ((False, "inline nel server"), (True, "pool di processi")):
+            normal, slow = _measure(tmp, world_path, heavy, args)
+            print(f"{name:<22}{_percentile(normal, 50) * 1e3:>10.2f}{_percentile(normal, 99) * 1e3:>10.2f}"
+                  f"{normal[-1] * 1e3:>10.2f}{_percentile(slow, 50) * 1e3:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
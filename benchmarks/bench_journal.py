@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# benchmarks/bench_journal.py
+
+"""
+Costo per comando del journal: sessione senza journal, con fsync
+raggruppate (finestra di durabilità) e con una fsync per comando.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_journal --rooms 2000 --commands 5000
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from engine.core.game import Game
+from engine.data.loader import load_world
+from benchmarks.worldgen import generate_world
+from benchmarks.bench_replay import random_walk
+
+
+def _measure(world, lines, **kwargs) -> float:
+    game = Game(world, **kwargs)
+    actions = [game.parser.parse(line, game.state, game.world) for line in lines]
+    t0 = time.perf_counter()
+    for action in actions:
+        game.execute(action)
+    elapsed = time.perf_counter() - t0
+    game.close()
+    return elapsed / len(lines) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=2000)
+    ap.add_argument("--commands", type=int, default=5000)
+    ap.add_argument("--fsync-commands", type=int, default=500, help="Comandi misurati con fsync a ogni comando")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = load_world(generate_world(tmp, rooms=args.rooms))
+        lines = [line for line in random_walk(world, args.commands) if line not in ("esci", "exit")]
+        runs = (
+            ("senza journal", {}, lines),
+            ("finestra 50 ms", {"sync_window": 0.05}, lines),
+            ("finestra 1 s", {"sync_window": 1.0}, lines),
+            ("fsync per comando", {"sync_window": 0}, lines[:args.fsync_commands]),
+        )
+        print(f"{args.rooms} stanze, {len(lines)} comandi")
+        for n, (label, opts, cmds) in enumerate(runs):
+            if opts:
+                opts = dict(opts, journal=os.path.join(tmp, f"j{n}.tqej"))
+            us = _measure(world, cmds, save_dir=tmp, **opts)
+            print(f"  {label:18s} {us:9.1f} µs/comando")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# benchmarks/bench_lazy_world.py
+
+"""
+Picco di RSS e tempo al primo prompt: loader eager contro mondo lazy.
+
+Ogni modalità gira in un processo separato, così il picco di memoria
+(ru_maxrss) non è falsato dalle misure precedenti.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_lazy_world --rooms 100000
+"""
+
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from benchmarks.worldgen import generate_world
+
+MODES = ("eager-yaml", "eager-snapshot", "lazy")
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM riparte da zero dopo exec; ru_maxrss su Linux eredita il picco del padre
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode: str, world_path: str):
+    t0 = time.perf_counter()
+    from engine.data.loader import load_world
+    from engine.core.game import Game
+
+    if mode == "eager-yaml":
+        world = load_world(world_path)
+    elif mode == "eager-snapshot":
+        world = load_world(world_path, use_cache=True)
+    else:
+        world = load_world(world_path, lazy=True, lazy_capacity=1024)
+
+    game = Game(world)
+    room = game.world.rooms[game.state["current_room"]]
+    room.describe(game.state, game.world)
+    elapsed = time.perf_counter() - t0
+    rss_mb = _peak_rss_mb()
+    print(f"{elapsed:.4f} {rss_mb:.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=100000)
+    ap.add_argument("--child", nargs=2, metavar=("MODE", "WORLD"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Genero un mondo da {args.rooms} stanze…", flush=True)
+        world_path = generate_world(tmp, rooms=args.rooms, missions=args.rooms // 100)
+        from engine.data.loader import load_world
+        load_world(world_path, use_cache=True)  # compila lo snapshot
+
+        print(f"{'modalità':<16}{'primo prompt':>14}{'picco RSS':>12}")
+        for mode in MODES:
+            out = subprocess.check_output(
+                [sys.executable, "-m", "benchmarks.bench_lazy_world", "--child", mode, world_path],
+                text=True)
+            elapsed, rss = out.split()
+            print(f"{mode:<16}{float(elapsed) * 1000:>11.1f} ms{float(rss):>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# benchmarks/bench_missions.py
+
+"""
+Costo per turno del controllo missioni: scansione completa di tutte le
+missioni (comportamento precedente) contro MissionTracker incrementale.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_missions --missions 5000 --turns 2000
+"""
+
+import time
+import argparse
+from types import SimpleNamespace
+
+from engine.core.missions import MissionTracker
+from engine.data.models import World, Room, Item, Mission
+
+
+def _world(missions: int, items: int):
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {}, [])
+    for n in range(items):
+        w.items[f"i{n}"] = Item(f"i{n}", [f"i{n}"], "", 1.0, [])
+    for n in range(missions):
+        req = {"have_item": [f"i{(n * 7) % items}", f"i{(n * 13 + 1) % items}"]}
+        if n % 5 == 0:
+            req["visited_room"] = ["a"]
+        w.missions[f"m{n}"] = Mission(f"m{n}", f"Missione {n}", "", req, [], {})
+    return w
+
+
+def _state(world):
+    return {"current_room": "a", "inventory": [], "time": 0,
+            "missions": {mid: "In corso" for mid in world.missions}}
+
+
+def legacy_check(world, state):
+    for mid, m in world.missions.items():
+        if state["missions"].get(mid) == "In corso":
+            req = m.requirements.get("have_item", [])
+            if all(item in state["inventory"] for item in req):
+                state["missions"][mid] = "Completata"
+
+
+def _turns(turns, items):
+    # un oggetto nuovo ogni 4 turni, gli altri turni non cambiano l'inventario
+    for t in range(turns):
+        yield f"i{(t // 4) % items}" if t % 4 == 0 else None
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--missions", type=int, default=5000)
+    ap.add_argument("--items", type=int, default=2000)
+    ap.add_argument("--turns", type=int, default=2000)
+    args = ap.parse_args()
+    world = _world(args.missions, args.items)
+    action = SimpleNamespace(command="look", target=None, indirect=None)
+
+    state = _state(world)
+    t0 = time.perf_counter()
+    for iid in _turns(args.turns, args.items):
+        if iid:
+            state["inventory"].append(iid)
+        legacy_check(world, state)
+    legacy = time.perf_counter() - t0
+    legacy_done = sum(1 for v in state["missions"].values() if v == "Completata")
+
+    state = _state(world)
+    tracker = MissionTracker(world, state)
+    t0 = time.perf_counter()
+    for iid in _turns(args.turns, args.items):
+        if iid:
+            state["inventory"].append(iid)
+        tracker.update(action)
+    incremental = time.perf_counter() - t0
+    done = sum(1 for v in state["missions"].values() if v == "Completata")
+
+    print(f"{args.missions} missioni, {args.turns} turni (completate: {legacy_done} / {done})")
+    print(f"  scansione completa : {legacy / args.turns * 1e6:10.1f} µs/turno")
+    print(f"  incrementale       : {incremental / args.turns * 1e6:10.1f} µs/turno")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# benchmarks/bench_plugins.py
+
+"""
+Costruzione di Game con molti plugin: caricamento eager (listdir + import +
+dir() a ogni sessione, come in passato) contro PluginRegistry (manifest,
+import al primo evento, scoperta condivisa dal processo).
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_plugins --plugins 100 --sessions 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+import subprocess
+import tempfile
+
+from benchmarks.worldgen import generate_world
+
+PLUGIN = '''
+import re
+import json
+from engine.plugins.base import PluginBase
+
+PATTERNS = [re.compile(r"{n}_" + str(k)) for k in range(20)]
+TABLE = json.loads(json.dumps({{str(k): k * k for k in range(200)}}))
+
+class Plugin{n}(PluginBase):
+    priority = {prio}
+
+    def on_pre_action(self, action, state, world):
+        return None
+
+    def on_post_action(self, action, state, world):
+        return None
+
+    def on_command_verbo{n}(self, action, state, world):
+        return "plugin {n}"
+'''
+
+# Eseguito in un processo nuovo per ogni misura: nessun modulo già importato
+CHILD = r'''
+import os, sys, time, importlib
+sys.path.insert(0, {repo!r})
+os.chdir({root!r})
+from engine.data.loader import load_world
+from engine.plugins.base import PluginBase
+import engine.core.game as game_mod
+
+def eager_load(self):
+    root = os.getcwd()
+    plugins_dir = os.path.join(root, "plugins")
+    sys.path.insert(0, root)
+    for f in os.listdir(plugins_dir):
+        if f.startswith("__") or not f.endswith(".py"):
+            continue
+        m = importlib.import_module(f"plugins.{{f[:-3]}}")
+        for attr in dir(m):
+            cls = getattr(m, attr)
+            if isinstance(cls, type) and issubclass(cls, PluginBase) and cls is not PluginBase:
+                cls().register(self.dispatcher)
+
+if {mode!r} == "eager":
+    game_mod.Game._load_plugins = eager_load
+world = load_world(os.path.join({root!r}, "config", "world.yaml"))
+t0 = time.perf_counter()
+game_mod.Game(world, profile=False)
+first = time.perf_counter() - t0
+t0 = time.perf_counter()
+for _ in range({sessions}):
+    game_mod.Game(world, profile=False)
+rest = (time.perf_counter() - t0) / {sessions}
+t0 = time.perf_counter()
+g = game_mod.Game(world, profile=False)
+g.process("guarda")
+turn = time.perf_counter() - t0
+print(first, rest, turn)
+'''
+
+
+def _run(root, mode, sessions):
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = CHILD.format(repo=repo, root=root, mode=mode, sessions=sessions)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return [float(x) for x in out.stdout.split()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--plugins", type=int, default=100)
+    ap.add_argument("--sessions", type=int, default=200)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_world(tmp, rooms=100)
+        os.makedirs(os.path.join(tmp, "plugins"))
+        for n in range(args.plugins):
+            with open(os.path.join(tmp, "plugins", f"plugin_{n:03d}.py"), "w") as f:
+                f.write(PLUGIN.format(n=n, prio=n % 3))
+
+        rows = [
+            ("eager", _run(tmp, "eager", args.sessions)),
+            ("registry, senza manifest", _run(tmp, "lazy", args.sessions)),
+            ("registry, con manifest", _run(tmp, "lazy", args.sessions)),
+        ]
+        manifest = os.path.join(tmp, "plugins", "__pycache__", "tqe_plugins.json")
+        os.remove(manifest)
+
+    print(f"{args.plugins} plugin, {args.sessions} sessioni")
+    print(f"{'':<26}{'prima Game':>12}{'Game succ.':>12}{'1° turno':>12}")
+    for name, (first, rest, turn) in rows:
+        print(f"{name:<26}{first * 1e3:>9.2f} ms{rest * 1e6:>9.1f} µs{turn * 1e3:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
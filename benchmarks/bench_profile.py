@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# benchmarks/bench_profile.py
+
+"""
+Costo della profilazione per comando: la stessa pipeline di Game.execute
+scritta a mano (parser -> pre_action -> dispatch -> missioni -> post_action,
+nessun punto di strumentazione), Game con profilazione spenta e attiva.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_profile --rooms 2500 --commands 50000
+"""
+
+import time
+import argparse
+import tempfile
+
+from engine.core.game import Game
+from engine.data.loader import load_world
+from engine.core.replay import cycle_commands
+from benchmarks.worldgen import generate_world
+from benchmarks.bench_replay import random_walk
+
+
+def bare_pipeline(game, lines):
+    parse, emit, dispatch = game.parser.parse, game.dispatcher.emit, game.dispatcher.dispatch
+    state, world = game.state, game.world
+    update = game.missions.update
+    for line in lines:
+        action = parse(line, state, world)
+        if emit("pre_action", action, state, world) is not None:
+            continue
+        output = dispatch(action, state, world)
+        out = update(action)
+        if output:
+            out.append(output)
+        emit("post_action", action, state, world)
+        "\n".join(out)
+
+
+def game_pipeline(game, lines):
+    process = game.process
+    for line in lines:
+        process(line)
+
+
+def _best(fn, world, lines, repeat, **kwargs) -> float:
+    best = None
+    for _ in range(repeat):
+        game = Game(world, **kwargs)
+        t0 = time.perf_counter()
+        fn(game, lines)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(lines) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=2500)
+    ap.add_argument("--commands", type=int, default=50000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = load_world(generate_world(tmp, rooms=args.rooms, missions=args.rooms // 10))
+    walk = [c for c in random_walk(world, args.commands // 2) if c not in ("esci", "exit")]
+    lines = list(cycle_commands(walk, args.commands))
+
+    bare = _best(bare_pipeline, world, lines, args.repeat, profile=False)
+    off = _best(game_pipeline, world, lines, args.repeat, profile=False)
+    on = _best(game_pipeline, world, lines, args.repeat, profile=True)
+    print(f"{len(lines)} comandi, migliore di {args.repeat}")
+    print(f"  pipeline a mano          {bare:7.2f} µs/comando")
+    print(f"  Game, profilazione spenta {off:6.2f} µs/comando ({(off / bare - 1) * 100:+.1f}%)")
+    print(f"  Game, profilazione attiva {on:6.2f} µs/comando ({(on / off - 1) * 100:+.1f}% rispetto a spenta)")
+
+
+if __name__ == "__main__":
+    main()
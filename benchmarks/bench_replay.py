@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# benchmarks/bench_replay.py
+
+"""
+Benchmark di throughput standard del motore: esegue una trascrizione di
+comandi attraverso l'intera pipeline di Game (parser, pre_action, dispatch,
+missioni, post_action) con engine.core.replay e riporta comandi/s.
+
+Senza argomenti genera un mondo a griglia e una passeggiata casuale;
+con --world/--transcript misura un'avventura reale.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_replay --rooms 2500 --commands 100000
+    python -m benchmarks.bench_replay --world demo_adventure/config/world.yaml \
+        --transcript demo_adventure/walkthrough.txt --commands 50000
+"""
+
+import random
+import argparse
+import tempfile
+
+from benchmarks.worldgen import generate_world
+from engine.core.game import Game
+from engine.core.replay import read_transcript, replay, cycle_commands
+from engine.data.loader import load_world
+
+
+def random_walk(world, length: int, seed: int = 0):
+    """
+    Trascrizione sintetica: spostamenti casuali, sguardi, raccolta e
+    abbandono degli oggetti incontrati, inventario e missioni.
+    """
+    rng = random.Random(seed)
+    room_id = world.start_room_id
+    carried = []
+    commands = []
+    while len(commands) < length:
+        room = world.rooms[room_id]
+        roll = rng.random()
+        if roll < 0.4 and room.connections:
+            direction = rng.choice(list(room.connections.keys()))
+            commands.append(f"vai {direction}")
+            room_id = room.connections[direction]
+        elif roll < 0.55 and room.items:
+            commands.append(f"prendi {room.items[0]}")
+            carried.append(room.items[0])
+        elif roll < 0.65 and carried:
+            commands.append(f"lascia {carried.pop()}")
+        elif roll < 0.85:
+            commands.append("guarda")
+        elif roll < 0.95:
+            commands.append("inventario")
+        else:
+            commands.append("missioni")
+    return commands
+
+
+def measure(world, commands, total: int) -> "ReplayResult":
+    """
+    Esegue `total` comandi (ripetendo la lista) su una nuova sessione.
+    """
+    game = Game(world)
+    return replay(game, cycle_commands(commands, total), stop_on_exit=False)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--world", type=str, default=None)
+    ap.add_argument("--transcript", type=str, default=None)
+    ap.add_argument("--rooms", type=int, default=2500)
+    ap.add_argument("--commands", type=int, default=100000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world_path = args.world or generate_world(tmp, rooms=args.rooms, missions=args.rooms // 10)
+        world = load_world(world_path, use_cache=args.world is None)
+
+    if args.transcript:
+        commands = [c for c in read_transcript(args.transcript)
+                    if c.lower() not in ("exit", "esci")]
+    else:
+        # la passeggiata copre metà dei comandi, poi viene ripetuta
+        commands = random_walk(world, max(1, args.commands // 2))
+
+    best = None
+    for _ in range(args.repeat):
+        result = measure(world, commands, args.commands)
+        if best is None or result.elapsed < best.elapsed:
+            best = result
+    print(f"{best.count} comandi in {best.elapsed * 1000:.1f} ms: "
+          f"{best.commands_per_sec:,.0f} comandi/s "
+          f"({best.elapsed / best.count * 1e6:.1f} µs/comando)")
+
+
+if __name__ == "__main__":
+    main()
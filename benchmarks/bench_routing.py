@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# benchmarks/bench_routing.py
+
+"""
+Percorsi minimi fra stanze: BFS a ogni richiesta contro il Router
+(tabelle next-hop sui mondi piccoli, A* con landmark sui grandi).
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_routing --sizes 1000 100000 --queries 200
+"""
+
+import math
+import time
+import random
+import argparse
+
+from engine.core.routing import RoomGraph, Router, bfs_directions
+from engine.data.models import World, Room
+
+
+def _grid_world(rooms: int) -> World:
+    w = World({"start_room": "r0"})
+    side = max(1, int(math.sqrt(rooms)))
+    for n in range(rooms):
+        x, y = n % side, n // side
+        conns = {}
+        if x > 0:
+            conns["ovest"] = f"r{n - 1}"
+        if x < side - 1 and n + 1 < rooms:
+            conns["est"] = f"r{n + 1}"
+        if y > 0:
+            conns["nord"] = f"r{n - side}"
+        if n + side < rooms:
+            conns["sud"] = f"r{n + side}"
+        w.rooms[f"r{n}"] = Room(f"r{n}", f"Stanza {n}", "", conns, [])
+    return w
+
+
+def _per_query(fn, pairs) -> float:
+    t0 = time.perf_counter()
+    for s, t in pairs:
+        fn(s, t)
+    return (time.perf_counter() - t0) / len(pairs) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--bfs-queries", type=int, default=20)
+    args = ap.parse_args()
+
+    for size in args.sizes:
+        world = _grid_world(size)
+        rng = random.Random(size)
+        ids = list(world.rooms)
+        # pochi punti di interesse richiesti da molti giocatori (taverne, negozi, ...)
+        hubs = rng.sample(ids, 10)
+        pairs = [(rng.choice(ids), rng.choice(hubs)) for _ in range(args.queries)]
+
+        t0 = time.perf_counter()
+        router = Router(RoomGraph(world.rooms))
+        build = time.perf_counter() - t0
+        mode = "next-hop" if router.use_next_hop else f"ALT, {len(router.landmarks)} landmark"
+
+        bfs = _per_query(lambda s, t: bfs_directions(world.rooms, s, t), pairs[:args.bfs_queries])
+        cold = _per_query(router.directions, pairs)
+        warm = _per_query(router.directions, pairs)
+        for s, t in pairs[:args.bfs_queries]:
+            assert len(router.directions(s, t)) == len(bfs_directions(world.rooms, s, t))
+
+        print(f"{size} stanze ({mode}), costruzione {build * 1000:.0f} ms")
+        print(f"  BFS per richiesta    {bfs:10.1f} µs")
+        print(f"  router (prima volta) {cold:10.1f} µs")
+        print(f"  router (a regime)    {warm:10.1f} µs")
+        if not router.use_next_hop:
+            index = router.graph.index
+            alt = _per_query(lambda s, t: router._astar(index[s], index[t]), pairs[:args.bfs_queries])
+            print(f"  solo A* ALT          {alt:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# benchmarks/bench_saves.py
+
+"""
+Latenza e dimensione su disco dei salvataggi: snapshot completo a ogni
+salvataggio contro snapshot + delta (SaveStore), con un autosalvataggio
+per turno su una sessione che ha modificato molte stanze.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_saves --rooms 5000 --touched 2000 --turns 500
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+
+from engine.core.game import Game
+from engine.data.loader import load_world
+from engine.data.saves import SaveStore
+from benchmarks.worldgen import generate_world
+
+
+def _session(world, touched: int, seed: int = 1):
+    game = Game(world, save_dir=tempfile.mkdtemp())
+    rnd = random.Random(seed)
+    room_ids = list(world.rooms)
+    game.state["inventory"].add("item_0", 1)
+    for rid in rnd.sample(room_ids, min(touched, len(room_ids))):
+        game.world.rooms[rid].items.append("item_0")
+    for n in range(200):
+        game.state["visited"].add(room_ids[n % len(room_ids)])
+    return game, rnd, room_ids
+
+
+def _turn(game, rnd, room_ids):
+    # un turno tipico: si sposta un oggetto e si visita una stanza
+    rid = rnd.choice(room_ids)
+    game.world.rooms[rid].items.append("item_0")
+    game.state["current_room"] = rid
+    game.state["visited"].add(rid)
+    game.state["time"] += 1
+
+
+def _run(store: SaveStore, game, rnd, room_ids, turns: int):
+    times = []
+    for _ in range(turns):
+        _turn(game, rnd, room_ids)
+        t0 = time.perf_counter()
+        store.save("autosave", game.state, game.world)
+        times.append(time.perf_counter() - t0)
+    size = os.path.getsize(store.path("autosave"))
+    t0 = time.perf_counter()
+    store.load("autosave")
+    load = time.perf_counter() - t0
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.99)], size, load
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=5000)
+    ap.add_argument("--touched", type=int, default=2000, help="Stanze modificate prima della misura")
+    ap.add_argument("--turns", type=int, default=500)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = load_world(generate_world(tmp, rooms=args.rooms))
+        print(f"{args.rooms} stanze, {args.touched} modificate, {args.turns} autosalvataggi")
+        for label, compact_every in (("sempre completo", 0), ("completo + delta", 32)):
+            game, rnd, room_ids = _session(world, args.touched)
+            store = SaveStore(os.path.join(tmp, label.replace(" ", "_")), compact_every=compact_every)
+            p50, p99, size, load = _run(store, game, rnd, room_ids, args.turns)
+            print(f"  {label:17s} p50 {p50 * 1000:7.3f} ms  p99 {p99 * 1000:7.3f} ms  "
+                  f"file {size / 1024:8.1f} KiB  caricamento {load * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
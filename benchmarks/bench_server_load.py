@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# benchmarks/bench_server_load.py
+
+"""
+Generatore di carico per `tqe serve`: apre N sessioni concorrenti, ognuna
+esegue lo stesso copione di comandi, e riporta comandi/s e latenza p50/p99
+al crescere del numero di sessioni.
+
+Il server gira in un processo separato su un socket Unix.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_server_load --sessions 1 10 100 500
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.worldgen import generate_world
+from engine.core.server import REPLY_END
+
+SCRIPT = ["guarda", "inventario", "vai est", "guarda", "vai ovest", "statistiche"]
+
+
+async def _session(path: str, turns: int, latencies: list):
+    reader, writer = await asyncio.open_unix_connection(path)
+    end = REPLY_END.encode("utf-8")
+    await reader.readuntil(end)  # intro
+    for n in range(turns):
+        t0 = time.perf_counter()
+        writer.write((SCRIPT[n % len(SCRIPT)] + "\n").encode("utf-8"))
+        await reader.readuntil(end)
+        latencies.append(time.perf_counter() - t0)
+    writer.write(b"esci\n")
+    await writer.drain()
+    writer.close()
+
+
+async def _run(path: str, sessions: int, turns: int):
+    latencies = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_session(path, turns, latencies) for _ in range(sessions)))
+    elapsed = time.perf_counter() - t0
+    return elapsed, sorted(latencies)
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def _wait_for_socket(path: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_unix_connection(path)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Il server non è partito in tempo.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100, 500])
+    ap.add_argument("--turns", type=int, default=50, help="comandi per sessione")
+    ap.add_argument("--rooms", type=int, default=400)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world_path = generate_world(tmp, rooms=args.rooms)
+        sock = os.path.join(tmp, "tqe.sock")
+        proc = subprocess.Popen([sys.executable, "-m", "engine.utils.cli", "serve",
+                                 "--world", world_path, "--unix", sock],
+                                stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(_wait_for_socket(sock))
+            print(f"{'sessioni':>9}{'comandi/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+            for sessions in args.sessions:
+                elapsed, lat = asyncio.run(_run(sock, sessions, args.turns))
+                rate = len(lat) / elapsed
+                print(f"{sessions:>9}{rate:>12.0f}{_percentile(lat, 50) * 1000:>10.2f}"
+                      f"{_percentile(lat, 99) * 1000:>10.2f}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
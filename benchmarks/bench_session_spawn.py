@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# benchmarks/bench_session_spawn.py
+
+"""
+Creazione di una sessione: copia profonda del World contro WorldOverlay.
+Riporta tempo di creazione e memoria per sessione (dopo qualche modifica).
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_session_spawn --rooms 20000 --sessions 50
+"""
+
+import gc
+import copy
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from benchmarks.worldgen import generate_world
+from engine.data.loader import load_world
+from engine.data.overlay import WorldOverlay
+
+
+def _play(world):
+    # Qualche modifica tipica di una sessione: prende e sposta oggetti
+    for n in range(5):
+        room = world.rooms[f"r{n}"]
+        if room.items:
+            iid = room.items[0]
+            room.items.remove(iid)
+            world.rooms["r0"].items.append(iid)
+
+
+def _measure(spawn, world, sessions):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    live = [spawn(world) for _ in range(sessions)]
+    elapsed = time.perf_counter() - t0
+    for s in live:
+        _play(s)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed / sessions, (after - before) / sessions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=20000)
+    ap.add_argument("--sessions", type=int, default=50)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = load_world(generate_world(tmp, rooms=args.rooms), use_cache=True)
+
+    deep_t, deep_m = _measure(copy.deepcopy, world, max(1, args.sessions // 10))
+    over_t, over_m = _measure(WorldOverlay, world, args.sessions)
+
+    print(f"Mondo: {args.rooms} stanze")
+    print(f"{'':<12}{'creazione':>14}{'memoria/sessione':>20}")
+    print(f"{'deepcopy':<12}{deep_t * 1e3:>11.2f} ms{deep_m / 1024:>17.1f} KB")
+    print(f"{'overlay':<12}{over_t * 1e6:>11.2f} µs{over_m / 1024:>17.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
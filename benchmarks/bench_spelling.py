@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# benchmarks/bench_spelling.py
+
+"""
+Correzione degli errori di battitura su un vocabolario grande: confronto
+con tutti i termini (distanza di edit limitata, come farebbe un
+difflib/get_close_matches) contro l'indice di cancellazioni SymSpell
+(SpellingIndex), che confronta solo i termini con una cancellazione in comune.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_spelling --terms 100000 --lookups 2000
+"""
+
+import time
+import random
+import string
+import argparse
+import tracemalloc
+
+from engine.core.spelling import SpellingIndex, edit_distance, max_typos
+
+
+def _vocabulary(count: int, rnd: random.Random):
+    words = set()
+    while len(words) < count:
+        words.add("".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 12))))
+    return sorted(words)
+
+
+def _typo(word: str, rnd: random.Random) -> str:
+    # uno o due errori: cancellazione, inserimento, sostituzione, trasposizione
+    for _ in range(rnd.choice((1, 1, 2)) if len(word) >= 7 else 1):
+        i = rnd.randrange(len(word) - 1)
+        kind = rnd.randrange(4)
+        if kind == 0:
+            word = word[:i] + word[i + 1:]
+        elif kind == 1:
+            word = word[:i] + rnd.choice(string.ascii_lowercase) + word[i:]
+        elif kind == 2:
+            word = word[:i] + rnd.choice(string.ascii_lowercase) + word[i + 1:]
+        else:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def naive_lookup(terms, word: str):
+    limit = max_typos(word)
+    found = [(t, d) for t, d in ((t, edit_distance(word, t, limit)) for t in terms) if d <= limit]
+    found.sort(key=lambda td: (td[1], td[0]))
+    return found
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--terms", type=int, default=100000)
+    ap.add_argument("--lookups", type=int, default=2000)
+    args = ap.parse_args()
+
+    rnd = random.Random(1)
+    terms = _vocabulary(args.terms, rnd)
+    queries = [_typo(rnd.choice(terms), rnd) for _ in range(args.lookups)]
+
+    t0 = time.perf_counter()
+    index = SpellingIndex(terms)
+    build = time.perf_counter() - t0
+    tracemalloc.start()
+    part = SpellingIndex(terms[:len(terms) // 10])
+    memory = tracemalloc.get_traced_memory()[0] * 10
+    tracemalloc.stop()
+    del part
+
+    print(f"{len(terms)} termini, {len(queries)} ricerche")
+    print(f"  costruzione indice  : {build * 1000:8.0f} ms, {memory / 2**20:.0f} MiB, "
+          f"{len(index.deletes)} cancellazioni (memoria stimata su 1/10)")
+
+    sample = queries[:max(1, len(queries) // 100)]
+    t0 = time.perf_counter()
+    for word in sample:
+        naive_lookup(terms, word)
+    naive = (time.perf_counter() - t0) / len(sample) * 1e6
+
+    latencies = []
+    for word in queries:
+        t0 = time.perf_counter()
+        index.lookup(word, max_typos(word))
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+
+    print(f"  scansione completa  : {naive:10.1f} µs/ricerca")
+    print(f"  SpellingIndex p50   : {p50:10.1f} µs/ricerca (p99 {p99:.1f})")
+
+    mismatches = sum(naive_lookup(terms, w) != sorted(index.lookup(w, max_typos(w)),
+                                                      key=lambda td: (td[1], td[0]))
+                     for w in sample)
+    print(f"  risultati diversi   : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# benchmarks/bench_state.py
+
+"""
+Stato di sessione come dizionario libero contro GameState: memoria per
+sessione e costo degli autosalvataggi (cattura + delta) quando lo stato
+contiene molte stanze visitate e variabili dei plugin.
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_state --sessions 2000 --visited 2000 --turns 500
+"""
+
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+from engine.data.containers import ItemBag
+from engine.data.models import World, Room
+from engine.data.overlay import WorldOverlay
+from engine.data.saves import SaveStore
+from engine.data.state import GameState
+
+
+def _dict_state(n: int) -> dict:
+    # lo stato costruito da Game.__init__ prima di GameState
+    return {
+        "current_room": f"r{n}",
+        "inventory": ItemBag(),
+        "missions": {},
+        "time": 0,
+        "visited": {f"r{n}"},
+        "talked_to": set(),
+        "variables": {},
+    }
+
+
+def _game_state(n: int) -> GameState:
+    return GameState(current_room=f"r{n}", visited=(f"r{n}",))
+
+
+def _memory(factory, sessions: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    states = [factory(n) for n in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del states
+    return used / sessions
+
+
+def _fill(state, visited: int, variables: int):
+    state["visited"].update(f"r{n}" for n in range(visited))
+    for n in range(variables):
+        state["variables"][f"dialogue_npc{n}"] = n
+    for n in range(20):
+        state["inventory"].add(f"item_{n}", 1)
+
+
+def _saves(state, world, directory: str, turns: int, seed: int = 1):
+    rnd = random.Random(seed)
+    store = SaveStore(directory)
+    store.save("autosave", state, world)
+    times, written = [], 0
+    for t in range(turns):
+        # un turno tipico: cambia la stanza, a volte una variabile
+        state["current_room"] = f"r{rnd.randrange(100)}"
+        state["time"] = t
+        if t % 10 == 0:
+            state["variables"]["dialogue_npc0"] = t
+        t0 = time.perf_counter()
+        written += store.save("autosave", state, world)
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.99)], written / turns
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=2000)
+    ap.add_argument("--visited", type=int, default=2000, help="Stanze visitate nello stato")
+    ap.add_argument("--variables", type=int, default=200, help="Variabili dei plugin nello stato")
+    ap.add_argument("--turns", type=int, default=500)
+    args = ap.parse_args()
+
+    print(f"memoria per sessione (stato appena creato, {args.sessions} sessioni)")
+    for label, factory in (("dict", _dict_state), ("GameState", _game_state)):
+        print(f"  {label:10s} {_memory(factory, args.sessions):8.0f} byte")
+
+    w = World({"start_room": "r0"})
+    w.rooms["r0"] = Room("r0", "R0", "", {}, [])
+    print(f"autosalvataggi: {args.visited} stanze visitate, {args.variables} variabili, {args.turns} turni")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, factory in (("dict", _dict_state), ("GameState", _game_state)):
+            state = factory(0)
+            _fill(state, args.visited, args.variables)
+            p50, p99, size = _saves(state, WorldOverlay(w), f"{tmp}/{label}", args.turns)
+            print(f"  {label:10s} p50 {p50 * 1000:7.3f} ms  p99 {p99 * 1000:7.3f} ms  "
+                  f"delta medio {size:7.1f} byte")
+
+
+if __name__ == "__main__":
+    main()
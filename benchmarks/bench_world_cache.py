@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# benchmarks/bench_world_cache.py
+
+"""
+Avvio a freddo (parsing YAML/JSON) contro avvio a caldo (snapshot compilato).
+
+Uso (dalla root del repository):
+    python -m benchmarks.bench_world_cache --rooms 20000
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+import yaml
+
+from benchmarks.worldgen import generate_world
+from engine.data import loader
+from engine.data.loader import load_world, parse_world
+from engine.data.cache import cache_path_for
+
+
+def _timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rooms", type=int, default=20000)
+    ap.add_argument("--items-per-room", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world_path = generate_world(tmp, rooms=args.rooms, items_per_room=args.items_per_room,
+                                    missions=args.rooms // 100)
+        yaml_kb = os.path.getsize(world_path) / 1024
+
+        # Parser YAML puro Python (comportamento storico di yaml.safe_load)
+        fast_loader = loader._YamlLoader
+        loader._YamlLoader = yaml.SafeLoader
+        try:
+            t_pure = _timed(lambda: parse_world(world_path), 1)
+        finally:
+            loader._YamlLoader = fast_loader
+
+        t_cold = _timed(lambda: parse_world(world_path), args.repeat)
+
+        t0 = time.perf_counter()
+        load_world(world_path, use_cache=True)  # prima esecuzione: scrive lo snapshot
+        t_first = time.perf_counter() - t0
+        cache_kb = os.path.getsize(cache_path_for(world_path)) / 1024
+
+        t_warm = _timed(lambda: load_world(world_path, use_cache=True), args.repeat)
+
+    print(f"Mondo: {args.rooms} stanze, world.yaml {yaml_kb:.0f} KB, snapshot {cache_kb:.0f} KB")
+    print(f"  freddo, yaml.SafeLoader      : {t_pure * 1000:9.1f} ms")
+    print(f"  freddo, loader predefinito   : {t_cold * 1000:9.1f} ms  ({loader._YamlLoader.__name__})")
+    print(f"  primo avvio (parse + scrittura): {t_first * 1000:7.1f} ms")
+    print(f"  caldo, snapshot              : {t_warm * 1000:9.1f} ms  (x{t_pure / t_warm:.1f} vs SafeLoader)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# benchmarks/worldgen.py
+
+"""
+Generatore di mondi sintetici per i benchmark: stanze disposte a griglia
+(collegamenti nord/sud/est/ovest), oggetti sparsi, NPC e missioni.
+"""
+
+import os
+import json
+import math
+import yaml
+
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def generate_world(target_dir: str, rooms: int = 1000, items_per_room: int = 1,
+                   npcs: int = 0, missions: int = 0) -> str:
+    """
+    Scrive config/world.yaml e config/items.json in target_dir.
+    Restituisce il percorso di world.yaml.
+    """
+    cfg_dir = os.path.join(target_dir, "config")
+    os.makedirs(cfg_dir, exist_ok=True)
+
+    side = max(1, int(math.sqrt(rooms)))
+    room_defs = {}
+    item_defs = {}
+    for n in range(rooms):
+        x, y = n % side, n // side
+        connections = {}
+        if x > 0:
+            connections["ovest"] = f"r{n - 1}"
+        if x < side - 1 and n + 1 < rooms:
+            connections["est"] = f"r{n + 1}"
+        if y > 0:
+            connections["nord"] = f"r{n - side}"
+        if n + side < rooms:
+            connections["sud"] = f"r{n + side}"
+
+        room_items = []
+        for k in range(items_per_room):
+            iid = f"i{n}_{k}"
+            room_items.append(iid)
+            item_defs[iid] = {
+                "names": [f"oggetto {n} {k}", iid],
+                "description": f"Un oggetto qualunque ({n}/{k}).",
+                "weight": 1.0,
+                "usable_on": [],
+            }
+
+        room_defs[f"r{n}"] = {
+            "name": f"Stanza {n}",
+            "desc": f"Una stanza generata, numero {n}, alle coordinate {x},{y}.",
+            "connections": connections,
+            "items": room_items,
+        }
+
+    npc_defs = {}
+    for n in range(npcs):
+        npc_defs[f"npc{n}"] = {
+            "name": f"Abitante {n}",
+            "location": f"r{(n * 7919) % rooms}",
+            "dialogues": [{"text": f"Ciao, sono l'abitante {n}.", "options": []}],
+        }
+
+    mission_defs = {}
+    item_ids = list(item_defs)
+    for n in range(missions):
+        req = [item_ids[(n * 31 + j) % len(item_ids)] for j in range(2)] if item_ids else []
+        mission_defs[f"m{n}"] = {
+            "title": f"Missione {n}",
+            "description": "Raccogli gli oggetti richiesti.",
+            "requirements": {"have_item": req},
+            "steps": [],
+            "rewards": {"xp": 10},
+        }
+
+    world = {
+        "config": {
+            "start_room": "r0",
+            "start_time": 0,
+            "intro_text": "Mondo generato per i benchmark.",
+            "initial_missions": list(mission_defs),
+        },
+        "rooms": room_defs,
+        "npcs": npc_defs,
+        "missions": mission_defs,
+    }
+    world_path = os.path.join(cfg_dir, "world.yaml")
+    with open(world_path, "w", encoding="utf-8") as f:
+        yaml.dump(world, f, Dumper=_Dumper, sort_keys=False, allow_unicode=True)
+    with open(os.path.join(cfg_dir, "items.json"), "w", encoding="utf-8") as f:
+        json.dump(item_defs, f)
+    return world_path
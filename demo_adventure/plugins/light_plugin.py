@@ -1,6 +1,6 @@
 # demo_adventure/plugins/light_plugin.py
 
-from engine.plugins.base import PluginBase
+from engine.plugins.base import PluginBase, when
 from types import SimpleNamespace
 
 class LightPlugin(PluginBase):
@@ -10,22 +10,21 @@ class LightPlugin(PluginBase):
     - genera la gemma una volta illuminato
     """
 
+    @when(command="look", room="grotta")
     def on_pre_action(self, action: SimpleNamespace, state, world):
-        # Prima di ogni comando, impedisce di vedere in grotta se torch_lit è False
-        if action.command == "look" and state["current_room"] == "grotta":
-            if not state.get("torch_lit", False):
-                return "È troppo buio per vedere. Forse una torcia farebbe al caso tuo!"
+        # Chiamato solo per 'guarda' in grotta: al buio se torch_lit è False
+        if not state.get("torch_lit", False):
+            return "È troppo buio per vedere. Forse una torcia farebbe al caso tuo!"
         return None
 
+    @when(item="torcia")
     def on_command_use(self, action: SimpleNamespace, state, world):
         # Intercetta 'use torcia' (o 'usa torcia')
-        if action.target == "torcia":
-            state["torch_lit"] = True
+        state["torch_lit"] = True
 
-            # Quando accendi la torcia, se non c'è ancora la gemma, la facciamo comparire
-            grotta = world.rooms.get("grotta")
-            if grotta and "gemma" not in grotta.items:
-                grotta.items.append("gemma")
+        # Quando accendi la torcia, se non c'è ancora la gemma, la facciamo comparire
+        grotta = world.rooms.get("grotta")
+        if grotta and "gemma" not in grotta.items:
+            grotta.items.append("gemma")
 
-            return "Hai acceso la torcia! Un bagliore caldo illumina la stanza."
-        return None
+        return "Hai acceso la torcia! Un bagliore caldo illumina la stanza."
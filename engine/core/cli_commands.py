@@ -6,8 +6,13 @@ import shutil
 import json
 import yaml
 
-from engine.data.loader import load_world
+from engine.data.loader import load_world, parse_world
+from engine.data.cache import write_snapshot
+from engine.data.validate import check_world
 from engine.core.game import Game
+from engine.core.server import serve
+from engine.core.profiler import Profiler
+from engine.core.replay import read_transcript, replay, cycle_commands
 
 def init_project(project_name: str):
     """
@@ -47,21 +52,127 @@ def init_project(project_name: str):
 
     print(f"Esegui 'cd {project_name} && python3 -m engine.utils.cli run' per partire col gioco.")
 
-def run_game(world_path: str = 'config/world.yaml'):
-    """
-    Carica il mondo e avvia la sessione di gioco.
-    """
+def _resolve_world_path(world_path: str):
     if not os.path.isfile(world_path):
         world_path = os.path.join(os.getcwd(), world_path)
 
     if not os.path.isfile(world_path):
         print(f"File di world non trovato: {world_path}")
+        return None
+    return world_path
+
+def run_game(world_path: str = 'config/world.yaml', use_cache: bool = True,
+             lazy: bool = False, autosave: int = 0, journal: str = None,
+             sync_window: float = 0.05, profile: str = None):
+    """
+    Carica il mondo e avvia la sessione di gioco.
+    """
+    world_path = _resolve_world_path(world_path)
+    if not world_path:
         return
 
-    world = load_world(world_path)
-    game = Game(world)
+    world = load_world(world_path, use_cache=use_cache, lazy=lazy)
+    game = Game(world, autosave=autosave, journal=journal, sync_window=sync_window, profile=profile)
+    if game.recovered:
+        print(f"Sessione ripristinata dal journal: {game.recovered} comandi rieseguiti.")
     game.run()
 
+def replay_game(transcript: str, world_path: str = 'config/world.yaml',
+                repeat: int = 1, quiet: bool = False, lazy: bool = False,
+                profile: str = None):
+    """
+    Esegue in modo non interattivo i comandi di un file di trascrizione
+    e riporta il throughput (comandi/s).
+    """
+    world_path = _resolve_world_path(world_path)
+    if not world_path:
+        return
+    if not os.path.isfile(transcript):
+        print(f"File di trascrizione non trovato: {transcript}")
+        return
+
+    commands = read_transcript(transcript)
+    if not commands:
+        print("La trascrizione non contiene comandi.")
+        return
+    world = load_world(world_path, use_cache=True, lazy=lazy)
+    game = Game(world, profile=profile)
+
+    if repeat > 1:
+        # 'esci' fermerebbe la ripetizione: lo si esclude dal ciclo
+        commands = [c for c in commands if c.strip().lower() not in ("exit", "esci")]
+        result = replay(game, cycle_commands(commands, len(commands) * repeat))
+    else:
+        result = replay(game, commands)
+
+    if not quiet:
+        print(result.transcript())
+    print(f"\n{result.count} comandi in {result.elapsed * 1000:.1f} ms "
+          f"({result.commands_per_sec:,.0f} comandi/s)")
+    if game.profiler is not None:
+        print("\n" + game.profiler.report())
+    game.close()
+
+def serve_game(world_path: str = 'config/world.yaml', host: str = '127.0.0.1',
+               port: int = 4000, unix_path: str = None, lazy: bool = False,
+               profile: str = None):
+    """
+    Carica il mondo una sola volta e ospita più sessioni di gioco via socket.
+    """
+    world_path = _resolve_world_path(world_path)
+    if not world_path:
+        return
+
+    world = load_world(world_path, use_cache=True, lazy=lazy)
+    if not profile:
+        serve(world, host=host, port=port, unix_path=unix_path)
+        return
+
+    # un solo Profiler condiviso da tutte le sessioni
+    profiler = Profiler()
+    serve(world, host=host, port=port, unix_path=unix_path,
+          session_factory=lambda w: Game(w, profile=profiler))
+    print(profiler.report())
+    if profile.endswith(".json"):
+        profiler.dump(profile)
+
+def compile_world(world_path: str = 'config/world.yaml'):
+    """
+    Compila il mondo in uno snapshot binario riusato da 'tqe run'.
+    """
+    world_path = _resolve_world_path(world_path)
+    if not world_path:
+        return
+
+    world = parse_world(world_path)
+    cache_path = write_snapshot(world, world_path)
+    size_kb = os.path.getsize(cache_path) / 1024
+    print(f"Mondo compilato in '{cache_path}' ({size_kb:.1f} KB, "
+          f"{len(world.rooms)} stanze, {len(world.items)} oggetti).")
+
+def check_project(world_path: str = 'config/world.yaml', jobs: int = None,
+                  output_format: str = 'json') -> int:
+    """
+    Valida il mondo (riferimenti, raggiungibilità, oggetti inutilizzati).
+    Stampa il report in JSON (o testo) e restituisce 1 se ci sono errori.
+    """
+    world_path = _resolve_world_path(world_path)
+    if not world_path:
+        return 2
+
+    world = load_world(world_path, use_cache=True)
+    report = check_world(world, jobs=jobs)
+    report = {"world": world_path, **report}
+    if output_format == 'json':
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for issue in report["issues"]:
+            print(f"{issue['severity']:7s} {issue['code']:20s} {issue['table']}/{issue['id']}: {issue['message']}")
+        print(f"{report['errors']} errori, {report['warnings']} avvisi "
+              f"({report['reachable_rooms']}/{report['rooms']} stanze raggiungibili, "
+              f"{report['elapsed_ms']} ms)")
+    return 1 if report["errors"] else 0
+
 def test_project():
     """
     Esegue i test di unità e integrazione usando pytest.
@@ -0,0 +1,231 @@
+# engine/core/clock.py
+
+from typing import Any, Dict, Iterator, Optional
+
+from engine.core.routing import next_room
+from engine.data.containers import Timer
+
+MINUTES_PER_DAY = 24 * 60
+
+# Minuti di gioco per comando (config.clock.costs li sostituisce); i comandi
+# non elencati costano config.clock.default, quelli "di servizio" nulla
+DEFAULT_COSTS = {
+    "move": 5, "travel": 15, "take": 1, "drop": 1, "use": 2, "talk": 2, "look": 1,
+}
+DEFAULT_COST = 1
+# Passo degli NPC in cammino: una stanza ogni NPC_STEP_MINUTES (config.clock.npc_step)
+NPC_STEP = "npc_step"
+NPC_STEP_MINUTES = 5
+FREE_COMMANDS = frozenset({"help", "inventory", "save", "load", "missions", "stats", "profile", "player", "exit"})
+
+
+def parse_time(value) -> int:
+    """
+    Minuti di gioco da un intero o da un orario "HH:MM".
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    hours, sep, minutes = str(value).partition(":")
+    if not sep:
+        return int(hours)
+    return int(hours) * 60 + int(minutes)
+
+
+class WorldEvent:
+    """
+    Evento del mondo (config.clock.events.<nome>):
+        in: minuti dall'inizio della partita  | at: orario "HH:MM" o minuto assoluto
+        every: ripetizione in minuti (facoltativa)
+        message: testo mostrato (solo nella stanza room, se indicata)
+        set_flag / clear_flag: flag del mondo attivati o spenti
+        set_exit: {room, direction, to}  | remove_exit: {room, direction}
+        send_npc: {npc, to} l'NPC si incammina verso la stanza to (vedi send_npc())
+    Gli eventi senza in/at partono solo se programmati da un plugin (schedule()).
+    """
+    __slots__ = ("name", "start", "at", "every", "message", "room",
+                 "set_flags", "clear_flags", "set_exits", "remove_exits", "send_npcs")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.start = parse_time(spec["in"]) if spec.get("in") is not None else None
+        at = spec.get("at")
+        # orario del giorno ("18:00") o minuto assoluto (1080)
+        self.at = None if at is None else (parse_time(at), isinstance(at, str))
+        every = spec.get("every")
+        self.every = parse_time(every) if every is not None else None
+        if self.every is not None and self.every <= 0:
+            raise ValueError(f"Evento '{name}': every deve essere positivo.")
+        self.message = spec.get("message")
+        self.room = spec.get("room")
+        self.set_flags = _as_tuple(spec.get("set_flag"))
+        self.clear_flags = _as_tuple(spec.get("clear_flag"))
+        self.set_exits = _as_tuple(spec.get("set_exit"))
+        self.remove_exits = _as_tuple(spec.get("remove_exit"))
+        self.send_npcs = _as_tuple(spec.get("send_npc"))
+
+    def first_due(self, now: int) -> Optional[int]:
+        if self.start is not None:
+            return now + self.start
+        if self.at is None:
+            return None
+        minute, daily = self.at
+        if not daily:
+            return minute
+        due = now - now % MINUTES_PER_DAY + minute
+        return due if due >= now else due + MINUTES_PER_DAY
+
+
+def _as_tuple(value) -> tuple:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+class Clock:
+    """
+    Tempo di gioco di un mondo (config.clock), compilato una volta e
+    condiviso dalle sessioni: costo in minuti dei comandi ed eventi del
+    mondo. Gli eventi pendenti di una sessione stanno in state["timers"]
+    (TimerQueue, salvata con lo stato): a ogni turno si estraggono solo
+    quelli scaduti, senza scorrere gli altri.
+    """
+
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        spec = spec or {}
+        self.costs = dict(DEFAULT_COSTS)
+        self.costs.update({command: 0 for command in FREE_COMMANDS})
+        self.costs.update(spec.get("costs") or {})
+        self.default = spec.get("default", DEFAULT_COST)
+        self.npc_step = parse_time(spec.get("npc_step", NPC_STEP_MINUTES))
+        if self.npc_step <= 0:
+            raise ValueError("npc_step deve essere positivo.")
+        self.events: Dict[str, WorldEvent] = {
+            name: WorldEvent(name, event or {}) for name, event in (spec.get("events") or {}).items()}
+
+    def cost(self, command: str) -> int:
+        return self.costs.get(command, self.default)
+
+    def start(self, state):
+        """
+        Programma gli eventi del mondo con in/at all'inizio di una partita.
+        """
+        now = state["time"]
+        for event in self.events.values():
+            due = event.first_due(now)
+            if due is not None:
+                state["timers"].push(due, event.name)
+
+    def due(self, state) -> Iterator[Timer]:
+        """
+        Estrae in ordine gli eventi scaduti (scadenza <= state["time"]),
+        riprogrammando quelli ripetuti; vede anche gli eventi aggiunti
+        nel frattempo dagli hook se già scaduti.
+        """
+        timers = state["timers"]
+        while True:
+            timer = timers.pop_due(state["time"])
+            if timer is None:
+                return
+            event = self.events.get(timer.name)
+            if event is not None and event.every:
+                timers.push(timer.due + event.every, timer.name, timer.data)
+            yield timer
+
+    def apply(self, timer: Timer, state, world) -> Optional[str]:
+        """
+        Effetti dell'evento del mondo timer.name; restituisce il messaggio
+        da mostrare (None se nessuno o se il giocatore è altrove).
+        """
+        if timer.name == NPC_STEP:
+            return self.step_npcs(timer, state, world)
+        event = self.events.get(timer.name)
+        if event is None:
+            return None
+        for flag in event.set_flags:
+            world.flags[flag] = True
+        for flag in event.clear_flags:
+            world.flags[flag] = False
+        for spec in event.set_exits:
+            world.rooms[spec["room"]].set_exit(spec["direction"], spec["to"])
+        for spec in event.remove_exits:
+            world.rooms[spec["room"]].remove_exit(spec["direction"])
+        for spec in event.send_npcs:
+            send_npc(state, world, spec["npc"], spec["to"])
+        message = timer.data.get("message", event.message)
+        if message and (event.room is None or event.room == state["current_room"]):
+            return message
+        return None
+
+    def step_npcs(self, timer: Timer, state, world) -> Optional[str]:
+        """
+        Muove di una stanza (Router.next_step) ogni NPC in cammino;
+        restituisce arrivi e partenze visibili dalla stanza del giocatore.
+        """
+        here = state["current_room"]
+        targets = world.npc_targets
+        lines = []
+        for npc_id, target in list(targets.items()):
+            source = world.npc_location(npc_id) if npc_id in world.npcs else None
+            step = next_room(world, source, target) if source is not None else None
+            if step is None:
+                # arrivato, senza strada o NPC rimosso
+                del targets[npc_id]
+                continue
+            world.move_npc(npc_id, step)
+            if step == target:
+                del targets[npc_id]
+            if source == here:
+                lines.append(f"{world.npcs[npc_id].name} se ne va.")
+            elif step == here:
+                lines.append(f"{world.npcs[npc_id].name} arriva.")
+        if targets:
+            state["timers"].push(timer.due + self.npc_step, NPC_STEP)
+        return "\n".join(lines) or None
+
+
+def world_clock(world) -> Clock:
+    base = getattr(world, "base", world)
+    return base.cached("clock", lambda: Clock(getattr(base, "clock", None)))
+
+
+# --- API per i plugin -----------------------------------------------------
+
+def schedule(state, delay: int, name: str, **data) -> Timer:
+    """
+    Programma l'evento name fra delay minuti di gioco: alla scadenza
+    scattano gli effetti dell'evento del mondo con quel nome (se esiste) e
+    gli hook on_timer_<name> dei plugin, che ricevono il Timer con data.
+    data deve essere serializzabile: finisce nei salvataggi.
+    """
+    return state["timers"].push(state["time"] + parse_time(delay), name, data)
+
+
+def schedule_at(state, when, name: str, **data) -> Timer:
+    """
+    Come schedule(), a un minuto di gioco assoluto o al prossimo orario "HH:MM".
+    """
+    now = state["time"]
+    due = WorldEvent(name, {"at": when}).first_due(now)
+    return state["timers"].push(due, name, data)
+
+
+def send_npc(state, world, npc_id: str, room: str):
+    """
+    Manda l'NPC npc_id verso la stanza room lungo il percorso più breve:
+    avanza di una stanza ogni config.clock.npc_step minuti di gioco.
+    """
+    targets = world.npc_targets
+    walking = bool(targets)
+    targets[npc_id] = room
+    if not walking:
+        # un solo timer muove tutti gli NPC in cammino
+        state["timers"].push(state["time"] + world_clock(world).npc_step, NPC_STEP)
+
+
+def cancel(state, timer) -> bool:
+    """
+    Annulla un evento programmato (Timer o id); False se era già scattato.
+    """
+    return state["timers"].cancel(getattr(timer, "id", timer))
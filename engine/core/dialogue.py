@@ -0,0 +1,195 @@
+# engine/core/dialogue.py
+
+from typing import Dict, List, Optional, Tuple
+
+from engine.core.missions import REQUIREMENT_KINDS, requirement_met, _as_list
+
+# Valori di `next` che chiudono la conversazione (se non sono id di nodi)
+END_MARKERS = frozenset({"fine", "end"})
+END = -1
+
+Requirement = Tuple[str, str]
+
+
+def _requirements(spec) -> Tuple[Requirement, ...]:
+    # stessi tipi di requisito delle missioni (have_item, flag_set, ...)
+    if not spec:
+        return ()
+    return tuple((kind, key) for kind in REQUIREMENT_KINDS for key in _as_list(spec.get(kind)))
+
+
+def _met(requires: Tuple[Requirement, ...], state, world) -> bool:
+    return all(requirement_met(kind, key, state, world) for kind, key in requires)
+
+
+class DialogueOption:
+    """
+    Risposta selezionabile: testo della scelta, replica dell'NPC
+    (già formattata) e indice del nodo successivo.
+    """
+    __slots__ = ("reply", "line", "next", "requires")
+
+    def __init__(self, reply: str, line: Optional[str], next_node: int,
+                 requires: Tuple[Requirement, ...]):
+        self.reply = reply
+        self.line = line
+        self.next = next_node
+        self.requires = requires
+
+
+class DialogueNode:
+    """
+    Nodo compilato: battuta dell'NPC e menu delle opzioni già formattati
+    (menu None se alcune opzioni hanno condizioni e va composto al volo).
+    """
+    __slots__ = ("id", "line", "options", "next", "requires", "menu")
+
+    def __init__(self, node_id: str, line: str, options: Tuple[DialogueOption, ...],
+                 next_node: int, requires: Tuple[Requirement, ...], menu: Optional[str]):
+        self.id = node_id
+        self.line = line
+        self.options = options
+        self.next = next_node
+        self.requires = requires
+        self.menu = menu
+
+
+class DialogueGraph:
+    """
+    Dialoghi di un NPC compilati in un grafo indicizzato.
+
+    npc.dialogues è una lista di nodi:
+        { id: str (facoltativo), text: str, requires: {...} (facoltativo),
+          next: id o indice (nodi senza opzioni),
+          options: [{reply: str, text: str, next: id o indice, requires: {...}}] }
+    `next` assente vale "nodo seguente nella lista", "fine"/"end" chiude la
+    conversazione; requires usa i requisiti delle missioni. La posizione
+    della sessione è l'indice del nodo in state["variables"]["dialogue_<npc>"].
+    """
+
+    def __init__(self, npc):
+        self.npc_id = npc.id
+        self.name = npc.name
+        self.key = f"dialogue_{npc.id}"
+        # (nodo, valore di next) che non corrispondono a nessun nodo
+        self.dangling: List[Tuple[str, object]] = []
+
+        raw = npc.dialogues or []
+        self.index: Dict[str, int] = {}
+        for n, node in enumerate(raw):
+            if node.get("id") is not None:
+                self.index[str(node["id"])] = n
+
+        self.nodes: List[DialogueNode] = []
+        for n, node in enumerate(raw):
+            node_id = str(node.get("id", n))
+            follow = n + 1 if n + 1 < len(raw) else END
+            options = []
+            for opt in node.get("options") or ():
+                text = opt.get("text")
+                options.append(DialogueOption(
+                    str(opt.get("reply", "")),
+                    self._line(text) if text else None,
+                    self._target(opt.get("next"), follow, node_id, len(raw)),
+                    _requirements(opt.get("requires")),
+                ))
+            options = tuple(options)
+            menu = None
+            if not any(opt.requires for opt in options):
+                menu = self._menu(options)
+            self.nodes.append(DialogueNode(
+                node_id,
+                self._line(node.get("text", "")),
+                options,
+                self._target(node.get("next"), follow, node_id, len(raw)),
+                _requirements(node.get("requires")),
+                menu,
+            ))
+
+    def _target(self, value, follow: int, node_id: str, size: int) -> int:
+        if value is None:
+            return follow
+        if isinstance(value, int) and not isinstance(value, bool):
+            if 0 <= value < size:
+                return value
+        else:
+            value = str(value)
+            if value in self.index:
+                return self.index[value]
+            if value.lower() in END_MARKERS:
+                return END
+        self.dangling.append((node_id, value))
+        return END
+
+    def _line(self, text: str) -> str:
+        return f"{self.name} dice: \"{text}\""
+
+    def _menu(self, options) -> str:
+        if not options:
+            return ""
+        lines = ["Opzioni:"]
+        lines.extend(f"  {i}. {opt.reply}" for i, opt in enumerate(options, 1))
+        lines.append(f"Per rispondere digita: parla {self.npc_id} <numero_opzione>")
+        return "\n".join(lines)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # --- conversazione ---------------------------------------------------
+
+    def position(self, state) -> int:
+        return state.setdefault("variables", {}).get(self.key, 0)
+
+    def visible(self, node: DialogueNode, state, world) -> Tuple[DialogueOption, ...]:
+        if node.menu is not None:
+            return node.options
+        return tuple(opt for opt in node.options if _met(opt.requires, state, world))
+
+    def talk(self, state, world, choice: Optional[int] = None) -> str:
+        """
+        Senza choice mostra il nodo corrente (i nodi senza opzioni fanno
+        avanzare la conversazione); con choice sceglie l'opzione numero
+        choice (da 1) fra quelle visibili e passa al nodo indicato.
+        """
+        variables = state.setdefault("variables", {})
+        pos = variables.get(self.key, 0)
+        if not 0 <= pos < len(self.nodes):
+            return f"{self.name} non ha altro da dire in questo momento."
+        node = self.nodes[pos]
+        if node.requires and not _met(node.requires, state, world):
+            # il nodo resta in attesa finché le condizioni non valgono
+            return f"{self.name} non ha altro da dire in questo momento."
+
+        if choice is None:
+            if not node.options:
+                variables[self.key] = node.next
+                return node.line
+            menu = node.menu
+            if menu is None:
+                menu = self._menu(self.visible(node, state, world))
+            return f"{node.line}\n{menu}" if menu else node.line
+
+        options = self.visible(node, state, world)
+        if not options:
+            return f"{self.name} non aspetta una risposta."
+        if not 1 <= choice <= len(options):
+            return f"Opzione non valida: scegli un numero da 1 a {len(options)}."
+        option = options[choice - 1]
+        variables[self.key] = option.next
+        if option.line is not None:
+            return option.line
+        # scelta senza replica: si prosegue subito con il nodo successivo
+        return self.talk(state, world)
+
+
+def dialogue_graph(world, npc_id: str) -> DialogueGraph:
+    """
+    Grafo dei dialoghi dell'NPC, compilato una volta sul mondo base e
+    condiviso da tutte le sessioni.
+    """
+    base = getattr(world, "base", world)
+    graphs = base.cached("dialogues", dict)
+    graph = graphs.get(npc_id)
+    if graph is None:
+        graph = graphs[npc_id] = DialogueGraph(base.npcs[npc_id])
+    return graph
@@ -1,106 +1,412 @@
 # engine/core/dispatcher.py
 
+import bisect
+import asyncio
+import logging
+import itertools
+from time import perf_counter_ns
 from types import SimpleNamespace
 
+from engine.core.routing import find_directions
+from engine.core.profiler import callback_name
+from engine.core.subscriptions import SubscriptionFilter, SubscriptionIndex
+
+log = logging.getLogger(__name__)
+
+
+def _blocking(coro):
+    # hook async chiamato dal percorso sincrono (CLI, replay, turni in un
+    # thread): la coroutine gira in un loop temporaneo
+    return asyncio.run(coro)
+
+
+class Refusal(str):
+    """
+    Output di un comando non eseguito (uscita inesistente, oggetto assente...):
+    si mostra come gli altri, ma il turno non fa passare il tempo di gioco.
+    """
+    __slots__ = ()
+
+
 class EventDispatcher:
     """
     Gestisce la dispatch dei comandi e l’emissione di eventi per i plugin.
+
+    I callback dei plugin e gli handler core vengono risolti una volta sola
+    in una tabella compilata (comando -> hook + handler), ricostruita solo
+    quando cambiano le sottoscrizioni o i comandi registrati.
+
+    Le sottoscrizioni possono avere filtri dichiarativi (comando, stanza,
+    oggetto, flag di stato): per gli eventi che ne hanno, un indice
+    (SubscriptionIndex) seleziona i soli callback pertinenti all'azione.
+
+    Hook e handler possono essere coroutine (async def): dispatch_async() ed
+    emit_async() le attendono, emit_background() le avvia come task senza
+    attenderle; i percorsi sincroni le eseguono fino in fondo.
     """
 
-    def __init__(self):
+    def __init__(self, grammar=None):
+        # regole del parser della sessione: i sinonimi registrati con
+        # register_command() diventano verbi (anche di più parole)
+        self.grammar = grammar
+        # evento -> callback, in ordine di priorità (poi di registrazione)
         self.subscribers = {}
+        self._entries = {}
+        self._seq = itertools.count()
+        # evento -> indice, solo per gli eventi con sottoscrizioni filtrate
+        self.indexes = {}
+
+        # comando canonico -> handler(action, state, world)
+        self.commands = {}
+        # sinonimo -> comando canonico (per i verbi registrati dai plugin)
+        self.aliases = {}
+        # comando canonico -> sinonimi mostrati da 'help'
+        self.help_entries = {}
+        self._table = None
+
+        # Profilazione (vedi set_profiler): None = nessuno strumento installato
+        self.profiler = None
+        self._timed_events = {}
+        # task dei listener async avviati da emit_background()
+        self._background = set()
 
-    def subscribe(self, event_name: str, callback):
+        self._register_core_commands()
+
+    def _register_core_commands(self):
+        core = [
+            ("help", self._handle_help, ["help", "aiuto"]),
+            ("look", self._handle_look, ["guarda", "look"]),
+            ("inventory", self._handle_inventory, ["inventario", "inventory"]),
+            ("move", self._handle_move, ["vai", "move"]),
+            ("travel", self._handle_travel, ["vai a", "raggiungi", "travel"]),
+            ("take", self._handle_take, ["prendi", "take"]),
+            ("drop", self._handle_drop, ["lascia", "drop"]),
+            ("use", self._handle_use, ["usa", "use"]),
+            ("save", self._handle_save, ["salva", "save"]),
+            ("load", self._handle_load, ["carica", "load"]),
+            ("missions", self._handle_missions, ["missioni", "missions"]),
+            ("stats", self._handle_stats, ["statistiche", "stats"]),
+        ]
+        for name, handler, syns in core:
+            self.register_command(name, handler)
+            self.help_entries[name] = syns
+        # 'exit' è gestito da Game, qui compare solo nell'help
+        self.help_entries["exit"] = ["esci", "exit"]
+
+    def subscribe(self, event_name: str, callback, priority: int = 0, *,
+                  command=None, room=None, item=None, flag=None):
         """
         Registra un callback su un evento (es. "command_take", "pre_action", ecc.).
+        I callback con priorità più alta vengono chiamati per primi; a parità
+        di priorità vale l'ordine di registrazione.
+        command/room/item/flag (stringa o insieme di stringhe) limitano il
+        callback alle azioni che soddisfano tutti i filtri indicati (vedi
+        SubscriptionFilter): gli altri turni non lo chiamano affatto.
+        Restituisce la chiave della sottoscrizione (vedi replace_callback()).
+        """
+        filters = {k: v for k, v in (("command", command), ("room", room),
+                                     ("item", item), ("flag", flag)) if v is not None}
+        return self.subscribe_many([(event_name, callback, priority, filters)])[0]
+
+    def subscribe_many(self, subscriptions):
+        """
+        Come subscribe() per una sequenza di (evento, callback, priorità) o
+        (evento, callback, priorità, filtri): liste e indici vengono
+        ricostruiti una volta sola.
+        """
+        keys = []
+        touched = set()
+        for event_name, callback, priority, *rest in subscriptions:
+            filters = rest[0] if rest else None
+            key = (-priority, next(self._seq))
+            entry = key + (callback, SubscriptionFilter(**filters) if filters else None)
+            bisect.insort(self._entries.setdefault(event_name, []), entry)
+            keys.append(key)
+            touched.add(event_name)
+        for event_name in touched:
+            entries = self._entries[event_name]
+            self.subscribers[event_name] = [e[2] for e in entries]
+            if any(e[3] is not None for e in entries):
+                self.indexes[event_name] = SubscriptionIndex(entries)
+            else:
+                self.indexes.pop(event_name, None)
+        self._table = None
+        self._timed_events = {}
+        return keys
+
+    def replace_callback(self, event_name: str, key, callback):
+        """
+        Sostituisce il callback della sottoscrizione key mantenendone la
+        posizione e i filtri (usato dai plugin caricati in modo lazy). Liste
+        e indice vengono aggiornati sul posto: un emit in corso vede già il
+        nuovo callback.
+        """
+        entries = self._entries[event_name]
+        n = bisect.bisect_left(entries, key)
+        if n == len(entries) or entries[n][:2] != key:
+            raise KeyError((event_name, key))
+        entry = entries[n] = key + (callback, entries[n][3])
+        self.subscribers[event_name][n] = callback
+        index = self.indexes.get(event_name)
+        if index is not None:
+            index.replace(entry)
+        self._table = None
+        self._timed_events = {}
+
+    def register_command(self, name: str, handler, aliases=()):
+        """
+        Registra (o sostituisce) l'handler core di un comando canonico.
+        I plugin possono così aggiungere verbi nuovi, con i relativi sinonimi.
+        """
+        self.commands[name] = handler
+        for alias in aliases:
+            self.aliases[alias] = name
+        if aliases and self.grammar is not None:
+            self.grammar.verb(name, *aliases)
+        if aliases:
+            self.help_entries.setdefault(name, [])
+            self.help_entries[name].extend(a for a in aliases if a not in self.help_entries[name])
+        self._table = None
+
+    def _compile(self) -> dict:
+        """
+        Costruisce la tabella comando -> (hook dei plugin, handler core).
+        Comprende i comandi core, quelli con soli hook "command_<cmd>"
+        e i sinonimi registrati.
+        """
+        names = set(self.commands)
+        names.update(ev[len("command_"):] for ev in self.subscribers if ev.startswith("command_"))
+
+        table = {}
+        profiler = self.profiler
+        for name in names:
+            # con filtri gli hook sono l'indice, risolto a ogni dispatch
+            hooks = self.indexes.get(f"command_{name}") or tuple(self.subscribers.get(f"command_{name}", ()))
+            handler = self.commands.get(name)
+            if profiler is not None:
+                hooks = self._timed(hooks)
+                if handler is not None:
+                    handler = profiler.timed(f"core:{name}", handler)
+            table[name] = (hooks, handler)
+        for alias, name in self.aliases.items():
+            if alias not in table:
+                table[alias] = table[name]
+        self._table = table
+        return table
+
+    def knows(self, command: str) -> bool:
+        """
+        True se command ha un handler, hook "command_<cmd>" o è un sinonimo registrato.
+        """
+        table = self._table
+        if table is None:
+            table = self._compile()
+        return command in table
+
+    @staticmethod
+    def _unknown(action) -> str:
+        suggestions = getattr(action, "suggestions", None)
+        if suggestions:
+            return Refusal(f"Comando non riconosciuto: '{action.command}'. Forse intendevi: "
+                           f"{', '.join(suggestions)}? Digita 'help' per assistenza.")
+        return Refusal(f"Comando non riconosciuto: '{action.command}'. Digita 'help' per assistenza.")
+
+    def set_profiler(self, profiler):
+        """
+        Attiva la profilazione: dispatch ed emit (anche async) vengono
+        sostituiti da versioni misurate e la tabella compilata avvolge hook e
+        handler. Senza profiler il percorso normale resta invariato.
         """
-        self.subscribers.setdefault(event_name, []).append(callback)
+        self.profiler = profiler
+        self._table = None
+        self._timed_events = {}
+        self.emit = self._emit_profiled
+        self.emit_async = self._emit_async_profiled
+        profiler.instrument(self, "dispatch", "stage:dispatch")
+        profiler.instrument(self, "dispatch_async", "stage:dispatch")
+
+    def _timed(self, hooks):
+        timed = lambda cb: self.profiler.timed(f"plugin:{callback_name(cb)}", cb)
+        if isinstance(hooks, SubscriptionIndex):
+            return hooks.map(timed)
+        return [timed(cb) for cb in hooks]
+
+    def _timed_callbacks(self, event_name: str, args):
+        callbacks = self._timed_events.get(event_name)
+        if callbacks is None:
+            callbacks = self._timed_events[event_name] = self._timed(
+                self.indexes.get(event_name) or self.subscribers.get(event_name, ()))
+        if isinstance(callbacks, SubscriptionIndex):
+            return callbacks.select(args[0], args[1])
+        return callbacks
+
+    def _emit_profiled(self, event_name: str, *args, **kwargs):
+        callbacks = self._timed_callbacks(event_name, args)
+        add = self.profiler.histogram(f"stage:{event_name}").add
+        t0 = perf_counter_ns()
+        try:
+            for callback in callbacks:
+                result = callback(*args, **kwargs)
+                if result is not None:
+                    if asyncio.iscoroutine(result):
+                        result = _blocking(result)
+                        if result is None:
+                            continue
+                    return result
+            return None
+        finally:
+            add(perf_counter_ns() - t0)
+
+    async def _emit_async_profiled(self, event_name: str, *args, **kwargs):
+        callbacks = self._timed_callbacks(event_name, args)
+        add = self.profiler.histogram(f"stage:{event_name}").add
+        t0 = perf_counter_ns()
+        try:
+            for callback in callbacks:
+                result = callback(*args, **kwargs)
+                if result is not None:
+                    if asyncio.iscoroutine(result):
+                        result = await result
+                        if result is None:
+                            continue
+                    return result
+            return None
+        finally:
+            add(perf_counter_ns() - t0)
 
     def emit(self, event_name: str, *args, **kwargs):
         """
         Emette un evento ai callback registrati.
         Restituisce il primo valore non-None ritornato da un callback.
+        Per gli eventi con filtri i primi due argomenti sono action e state.
         """
-        for callback in self.subscribers.get(event_name, []):
+        index = self.indexes.get(event_name)
+        callbacks = index.select(args[0], args[1]) if index is not None else self.subscribers.get(event_name, ())
+        for callback in callbacks:
             result = callback(*args, **kwargs)
             if result is not None:
+                if asyncio.iscoroutine(result):
+                    result = _blocking(result)
+                    if result is None:
+                        continue
                 return result
         return None
 
-    def dispatch(self, action: SimpleNamespace, state: dict, world) -> str:
+    async def emit_async(self, event_name: str, *args, **kwargs):
         """
-        Esegue il comando action.command e restituisce l’output testuale.
-        Notifica prima i plugin su "command_{cmd}", poi gestisce i comandi core.
+        Come emit(), attendendo i callback async.
         """
-        cmd = action.command
-        tgt = action.target
-        ind = getattr(action, "indirect", None)
-
-        # 1) Plugin hook command_{cmd} prima dei comandi core
-        for callback in self.subscribers.get(f"command_{cmd}", []):
-            out = callback(action, state, world)
-            if out is not None:
-                return out
-
-        # 2) Comandi core
-        if cmd == "help":
-            return self._handle_help()
-
-        if cmd == "look":
-            return self._handle_look(tgt, state, world)
-
-        if cmd == "inventory":
-            return self._handle_inventory(state, world)
+        index = self.indexes.get(event_name)
+        callbacks = index.select(args[0], args[1]) if index is not None else self.subscribers.get(event_name, ())
+        for callback in callbacks:
+            result = callback(*args, **kwargs)
+            if result is not None:
+                if asyncio.iscoroutine(result):
+                    result = await result
+                    if result is None:
+                        continue
+                return result
+        return None
 
-        if cmd == "move":
-            return self._handle_move(tgt, state, world)
+    def emit_background(self, event_name: str, *args, **kwargs):
+        """
+        Emette un evento senza attendere i listener async (es. post_action):
+        quelli sincroni girano subito, le coroutine diventano task nel loop
+        corrente e il turno prosegue. I valori restituiti sono ignorati.
+        Va chiamato dentro un loop asyncio (vedi drain()).
+        """
+        index = self.indexes.get(event_name)
+        callbacks = index.select(args[0], args[1]) if index is not None else self.subscribers.get(event_name, ())
+        for callback in callbacks:
+            result = callback(*args, **kwargs)
+            if asyncio.iscoroutine(result):
+                task = asyncio.get_running_loop().create_task(result)
+                self._background.add(task)
+                task.add_done_callback(self._background_done)
 
-        if cmd == "take":
-            return self._handle_take(tgt, state, world)
+    def _background_done(self, task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Errore in un listener in background", exc_info=task.exception())
 
-        if cmd == "drop":
-            return self._handle_drop(tgt, state, world)
+    async def drain(self):
+        """
+        Attende i listener avviati da emit_background() (es. a fine sessione).
+        """
+        while self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
 
-        if cmd == "use":
-            return self._handle_use(tgt, ind, state, world)
+    def dispatch(self, action: SimpleNamespace, state: dict, world) -> str:
+        """
+        Esegue il comando action.command e restituisce l’output testuale.
+        Notifica prima i plugin su "command_{cmd}", poi gestisce i comandi core.
+        """
+        table = self._table
+        if table is None:
+            table = self._compile()
 
-        if cmd == "save":
-            return f"Salvataggio in slot '{tgt}' completato."
+        entry = table.get(action.command)
+        if entry is not None:
+            hooks, handler = entry
+            if hooks.__class__ is SubscriptionIndex:
+                hooks = hooks.select(action, state)
+            # 1) Plugin hook command_{cmd} prima dei comandi core
+            for callback in hooks:
+                out = callback(action, state, world)
+                if out is not None:
+                    if asyncio.iscoroutine(out):
+                        out = _blocking(out)
+                        if out is None:
+                            continue
+                    return out
+            # 2) Comando core
+            if handler is not None:
+                out = handler(action, state, world)
+                return _blocking(out) if asyncio.iscoroutine(out) else out
 
-        if cmd == "load":
-            return f"Caricamento da slot '{tgt}' completato."
+        return self._unknown(action)
 
-        if cmd == "missions":
-            return self._handle_missions(state, world)
+    async def dispatch_async(self, action: SimpleNamespace, state: dict, world) -> str:
+        """
+        Come dispatch(), attendendo hook e handler async: l'I/O di un plugin
+        non blocca le altre sessioni servite dallo stesso loop.
+        """
+        table = self._table
+        if table is None:
+            table = self._compile()
 
-        if cmd == "stats":
-            return self._handle_stats(state, world)
+        entry = table.get(action.command)
+        if entry is not None:
+            hooks, handler = entry
+            if hooks.__class__ is SubscriptionIndex:
+                hooks = hooks.select(action, state)
+            for callback in hooks:
+                out = callback(action, state, world)
+                if out is not None:
+                    if asyncio.iscoroutine(out):
+                        out = await out
+                        if out is None:
+                            continue
+                    return out
+            if handler is not None:
+                out = handler(action, state, world)
+                return (await out) if asyncio.iscoroutine(out) else out
 
-        return f"Comando non riconosciuto: '{cmd}'. Digita 'help' per assistenza."
+        return self._unknown(action)
 
     # --- Handlers interni ------------------------------------------------
 
-    def _handle_help(self) -> str:
-        mappings = {
-            "help": ["help", "aiuto"],
-            "look": ["guarda", "look"],
-            "inventory": ["inventario", "inventory"],
-            "move": ["vai", "move"],
-            "take": ["prendi", "take"],
-            "drop": ["lascia", "drop"],
-            "use": ["usa", "use"],
-            "save": ["salva", "save"],
-            "load": ["carica", "load"],
-            "missions": ["missioni", "missions"],
-            "stats": ["statistiche", "stats"],
-            "exit": ["esci", "exit"]
-        }
+    def _handle_help(self, action, state, world) -> str:
         lines = ["Comandi disponibili:"]
-        for core_cmd, syns in mappings.items():
+        for core_cmd, syns in self.help_entries.items():
+            # il verbo canonico compare sempre, come per i comandi core
+            if core_cmd not in syns:
+                syns = [*syns, core_cmd]
             lines.append(f"- {core_cmd}: {', '.join(syns)}")
         return "\n".join(lines)
 
-    def _handle_look(self, target, state, world) -> str:
+    def _handle_look(self, action, state, world) -> str:
+        target = action.target
         room = world.rooms[state["current_room"]]
         if not target:
             return room.describe(state, world)
@@ -108,54 +414,106 @@ class EventDispatcher:
             return world.items[target].description
         if target in room.items:
             return world.items[target].description
-        return f"Non vedo '{target}' qui."
+        return Refusal(f"Non vedo '{target}' qui.")
 
-    def _handle_inventory(self, state, world) -> str:
+    def _handle_inventory(self, action, state, world) -> str:
         inv = state["inventory"]
         if not inv:
             return "L'inventario è vuoto."
         lines = ["Inventario:"]
         for iid in inv:
             item = world.items[iid]
-            lines.append(f"- {item.names[0]}: {item.description}")
+            qty = inv.count(iid)
+            name = item.names[0] if qty == 1 else f"{item.names[0]} (x{qty})"
+            lines.append(f"- {name}: {item.description}")
         return "\n".join(lines)
 
-    def _handle_move(self, direction, state, world) -> str:
+    def _handle_move(self, action, state, world) -> str:
+        direction = action.target
         room = world.rooms[state["current_room"]]
+        if direction and direction not in room.connections:
+            # 'vai taverna': una stanza adiacente al posto della direzione
+            direction = next((d for d, rid in room.connections.items() if rid == direction), None)
         if not direction or direction not in room.connections:
-            return "Non puoi andare lì."
+            return Refusal("Non puoi andare lì.")
         state["current_room"] = room.connections[direction]
         dest = world.rooms[state["current_room"]]
         return f"Sei arrivato in {dest.name}."
 
-    def _handle_take(self, iid, state, world) -> str:
+    def _handle_travel(self, action, state, world) -> str:
+        """
+        Viaggio verso una stanza già visitata, lungo il percorso più breve.
+        """
+        target = action.target
+        if not target or target not in world.rooms:
+            return Refusal("Non conosci nessun posto con quel nome.")
+        if target == state["current_room"]:
+            return Refusal("Sei già qui.")
+        if target not in state.get("visited", ()):
+            return Refusal("Non conosci la strada per arrivarci.")
+        steps = find_directions(world, state["current_room"], target)
+        if steps is None:
+            return Refusal("Da qui non c'è modo di arrivarci.")
+        # ogni stanza del percorso conta come visitata, come a piedi
+        room = state["current_room"]
+        visited = state.setdefault("visited", set())
+        for direction in steps:
+            room = world.rooms[room].connections[direction]
+            visited.add(room)
+        state["current_room"] = target
+        return f"Percorso: {', '.join(steps)}.\nSei arrivato in {world.rooms[target].name}."
+
+    def _handle_take(self, action, state, world) -> str:
+        iid = action.target
         if not iid:
-            return "Devi specificare un oggetto da prendere."
+            return Refusal("Devi specificare un oggetto da prendere.")
         room = world.rooms[state["current_room"]]
         if iid not in room.items:
-            return f"Non vedo '{iid}' qui."
-        room.items.remove(iid)
-        state["inventory"].append(iid)
-        return f"Hai raccolto {iid}."
+            return Refusal(f"Non vedo '{iid}' qui.")
+        qty = self._move_items(iid, room.items, state["inventory"], world)
+        return f"Hai raccolto {iid}." if qty == 1 else f"Hai raccolto {iid} (x{qty})."
 
-    def _handle_drop(self, iid, state, world) -> str:
+    def _handle_drop(self, action, state, world) -> str:
+        iid = action.target
         if not iid:
-            return "Devi specificare un oggetto da lasciare."
+            return Refusal("Devi specificare un oggetto da lasciare.")
         if iid not in state["inventory"]:
-            return f"Non hai '{iid}' nell'inventario."
+            return Refusal(f"Non hai '{iid}' nell'inventario.")
         room = world.rooms[state["current_room"]]
-        state["inventory"].remove(iid)
-        room.items.append(iid)
-        return f"Hai lasciato {iid}."
+        qty = self._move_items(iid, state["inventory"], room.items, world)
+        return f"Hai lasciato {iid}." if qty == 1 else f"Hai lasciato {iid} (x{qty})."
+
+    @staticmethod
+    def _move_items(iid, src, dst, world) -> int:
+        """
+        Sposta iid da src a dst (ItemBag o liste): un'unità, oppure l'intera
+        pila se l'oggetto è impilabile. Restituisce la quantità spostata.
+        """
+        item = world.items.get(iid)
+        qty = src.count(iid) if getattr(item, "stackable", False) else 1
+        if qty == 1:
+            src.remove(iid)
+            dst.append(iid)
+        else:
+            src.remove(iid, qty)
+            dst.add(iid, qty)
+        return qty
 
-    def _handle_use(self, iid, ind, state, world) -> str:
+    def _handle_use(self, action, state, world) -> str:
+        iid = action.target
         if not iid:
-            return "Devi specificare un oggetto da usare."
+            return Refusal("Devi specificare un oggetto da usare.")
         if iid not in state["inventory"]:
-            return f"Non hai '{iid}' nell'inventario."
+            return Refusal(f"Non hai '{iid}' nell'inventario.")
         return f"Hai usato {iid}."
 
-    def _handle_missions(self, state, world) -> str:
+    def _handle_save(self, action, state, world) -> str:
+        return f"Salvataggio in slot '{action.target}' completato."
+
+    def _handle_load(self, action, state, world) -> str:
+        return f"Caricamento da slot '{action.target}' completato."
+
+    def _handle_missions(self, action, state, world) -> str:
         if not state["missions"]:
             return "Non ci sono missioni attive."
         lines = ["Missioni attive:"]
@@ -164,6 +522,6 @@ class EventDispatcher:
             lines.append(f"- {title}: {st}")
         return "\n".join(lines)
 
-    def _handle_stats(self, state, world) -> str:
+    def _handle_stats(self, action, state, world) -> str:
         minutes = state.get("time", 0)
         return f"Tempo di gioco: {minutes//60}h {minutes%60}m"
@@ -1,93 +1,329 @@
 # engine/core/game.py
 
 import os
-import sys
-import importlib
+import json
+from types import SimpleNamespace
 from engine.data.loader import load_world
-from engine.core.dispatcher import EventDispatcher
+from engine.data.overlay import WorldOverlay
+from engine.data.state import GameState
+from engine.data.saves import SaveStore, SaveError, restore_state, overlay_delta
+from engine.data.journal import Journal, read_journal
+from engine.core.dispatcher import EventDispatcher, Refusal
 from engine.core.parser import Parser
-from engine.plugins.base import PluginBase
+from engine.core.missions import MissionTracker
+from engine.core.clock import world_clock
+from engine.core.profiler import Profiler, profiler_from_env
+from engine.plugins.registry import plugin_registry
+from engine.plugins.dialogue_plugin import DialoguePlugin
 
 class Game:
-    def __init__(self, world):
+    def __init__(self, world, save_dir: str = "saves", autosave: int = 0,
+                 journal: str = None, sync_window: float = 0.05, profile=None):
+        # Il mondo base resta condiviso e immutabile: le modifiche della
+        # sessione finiscono nel delta dell'overlay
+        if world is not None and not isinstance(world, WorldOverlay):
+            world = WorldOverlay(world)
         self.world = world
         self.parser = Parser()
-        self.dispatcher = EventDispatcher()
+        self.dispatcher = EventDispatcher(self.parser.grammar)
+        # i verbi noti al dispatcher (anche solo come hook) non vanno corretti
+        self.parser.known = self.dispatcher.knows
 
         # Stato di gioco
-        self.state = {
-            "current_room": self.world.start_room_id,
-            "inventory": [],
-            "missions": {},
-            "time": self.world.start_time
-        }
+        self.state = GameState(
+            current_room=self.world.start_room_id,
+            time=self.world.start_time,
+            visited=(self.world.start_room_id,),
+        )
+
+        # Tempo di gioco: eventi del mondo programmati dall'inizio della partita
+        self.clock = world_clock(self.world)
+        self.clock.start(self.state)
 
         # Attiva missioni iniziali
         for mid in getattr(self.world, "initial_missions", []):
             if mid in self.world.missions:
                 self.state["missions"][mid] = "In corso"
 
+        # Profilazione: profile=True, un Profiler condiviso (server) oppure
+        # la variabile TQE_PROFILE ("1" o un percorso per il report JSON)
+        if profile is None:
+            profile = profiler_from_env()
+        self.profile_path = profile if isinstance(profile, str) and profile.endswith(".json") else None
+        self.profiler = profile if isinstance(profile, Profiler) else (Profiler() if profile else None)
+        if self.profiler is not None:
+            self.dispatcher.set_profiler(self.profiler)
+            self.profiler.instrument(self.parser, "parse", "stage:parse")
+            self.profiler.instrument(self, "process", "turn")
+            self.profiler.instrument(self, "process_async", "turn")
+            self.profiler.instrument(self, "_clock_events", "stage:clock")
+            self.profiler.instrument(self, "_clock_events_async", "stage:clock")
+
+        self.missions = self._tracker()
+        self.finished = False
+
+        # Salvataggi: 'salva'/'carica' e autosalvataggio ogni N turni (0 = mai)
+        self.saves = SaveStore(save_dir)
+        self.autosave = autosave
+        self.turns = 0
+        self.dispatcher.register_command("save", self._handle_save)
+        self.dispatcher.register_command("load", self._handle_load)
+        self.dispatcher.register_command("profile", self._handle_profile, aliases=("profilo",))
+
+        # Dialoghi con gli NPC ('parla <npc> [numero]'): incluso nel motore
+        DialoguePlugin().register(self.dispatcher)
+
         # Carica plugin
         self._load_plugins()
 
+        # Journal delle azioni: se esiste già, la sessione viene ripristinata
+        self.journal = None
+        self.recovered = 0
+        if journal:
+            if os.path.isfile(journal):
+                self.recovered = self.recover(journal)
+            self.journal = Journal(journal, sync_window)
+
     def _load_plugins(self):
-        root = os.getcwd()
-        plugins_dir = os.path.join(root, "plugins")
-        if not os.path.isdir(plugins_dir):
-            return
-        sys.path.insert(0, root)
-        for f in os.listdir(plugins_dir):
-            if f.startswith("__") or not f.endswith(".py"):
-                continue
-            m = importlib.import_module(f"plugins.{f[:-3]}")
-            for attr in dir(m):
-                cls = getattr(m, attr)
-                if isinstance(cls, type) and issubclass(cls, PluginBase) and cls is not PluginBase:
-                    plugin = cls()
-                    plugin.register(self.dispatcher)
+        # Scoperta condivisa da tutte le sessioni del processo (manifest in
+        # plugins/__pycache__/): i moduli si importano al primo evento
+        self.plugins = plugin_registry(os.getcwd()).attach(self.dispatcher)
+        # con plugin heavy un turno può attendere il pool di processi
+        self.heavy_plugins = any(getattr(p, "heavy", False) for p in self.plugins)
+
+    def intro(self) -> str:
+        """
+        Testo di benvenuto mostrato all'inizio della sessione.
+        """
+        lines = []
+        if self.world.intro_text:
+            lines.append(self.world.intro_text.strip() + "\n")
+        lines.append("Benvenuto in TextQuestEngine!\n")
+        return "\n".join(lines)
+
+    def process(self, line: str) -> str:
+        """
+        Esegue un turno completo a partire dalla riga digitata e restituisce
+        l'output testuale (senza stamparlo). Dopo 'exit' self.finished è True.
+        """
+        action = self.parser.parse(line, self.state, self.world)
+        return self.execute(action)
+
+    async def process_async(self, line: str) -> str:
+        """
+        Come process(), attendendo gli hook async dei plugin; i listener
+        async di post_action partono in background e non ritardano la risposta.
+        """
+        action = self.parser.parse(line, self.state, self.world)
+        return await self.execute_async(action)
+
+    def execute(self, action) -> str:
+        """
+        Esegue un'azione già interpretata dal parser:
+        pre_action -> dispatch -> tempo ed eventi scaduti -> controllo missioni -> post_action.
+        Con il journal attivo l'azione viene registrata prima di eseguirla.
+        """
+        self._begin_turn(action)
+
+        # 1) pre_action: cattura output plugin
+        pre = self.dispatcher.emit("pre_action", action, self.state, self.world)
+        if pre is not None:
+            return pre
+
+        if action.command == "exit":
+            return self._exit()
+
+        # 2) dispatch comando (ora plugin command_{cmd} viene chiamato PRIMA)
+        output = self.dispatcher.dispatch(action, self.state, self.world)
+
+        # 3) Avanza il tempo di gioco e fa scattare gli eventi scaduti
+        events = self._clock_events(action, output)
+
+        # 4) Controlla missioni completate (solo quelle toccate dal turno)
+        lines = self.missions.update(action)
+
+        # 5) Output del comando, poi gli eventi del turno
+        if output:
+            lines.append(output)
+        lines.extend(out for out in events if out)
+
+        # 6) post_action
+        self.dispatcher.emit("post_action", action, self.state, self.world)
+        return self._end_turn(lines)
+
+    async def execute_async(self, action) -> str:
+        """
+        Come execute(), con gli hook async attesi e post_action in background.
+        """
+        self._begin_turn(action)
+        pre = await self.dispatcher.emit_async("pre_action", action, self.state, self.world)
+        if pre is not None:
+            return pre
+        if action.command == "exit":
+            return self._exit()
+        output = await self.dispatcher.dispatch_async(action, self.state, self.world)
+        events = await self._clock_events_async(action, output)
+        lines = self.missions.update(action)
+        if output:
+            lines.append(output)
+        lines.extend(out for out in events if out)
+        self.dispatcher.emit_background("post_action", action, self.state, self.world)
+        return self._end_turn(lines)
+
+    def _begin_turn(self, action):
+        self.turns += 1
+        if self.journal is not None:
+            self.journal.append(self.turns, action)
+
+    def _clock_events(self, action, output) -> list:
+        events = []
+        for timer in self._advance_clock(action, output):
+            events.append(self.clock.apply(timer, self.state, self.world))
+            events.append(self.dispatcher.emit(f"timer_{timer.name}", timer, self.state, self.world))
+        return events
+
+    async def _clock_events_async(self, action, output) -> list:
+        events = []
+        for timer in self._advance_clock(action, output):
+            events.append(self.clock.apply(timer, self.state, self.world))
+            events.append(await self.dispatcher.emit_async(f"timer_{timer.name}", timer, self.state, self.world))
+        return events
+
+    def _advance_clock(self, action, output):
+        # i comandi sconosciuti o non riusciti (Refusal) non fanno passare il tempo
+        if not isinstance(output, Refusal) and self.dispatcher.knows(action.command):
+            cost = self.clock.cost(action.command)
+            if cost:
+                self.state["time"] += cost
+        return self.clock.due(self.state)
+
+    def _exit(self) -> str:
+        self.finished = True
+        return "Grazie per aver giocato. Arrivederci!"
+
+    def _end_turn(self, lines) -> str:
+        if self.autosave and self.turns % self.autosave == 0:
+            self.save("autosave")
+        return "\n".join(lines)
+
+    def save(self, slot: str) -> int:
+        """
+        Salva stato e modifiche al mondo nello slot (SaveError se non valido).
+        Con il journal attivo il salvataggio diventa il nuovo checkpoint.
+        """
+        written = self.saves.save(slot, self.state, self.world, {"turns": self.turns})
+        if self.journal is not None:
+            self.journal.checkpoint(slot, self.turns)
+        return written
+
+    def load(self, slot: str):
+        """
+        Ripristina la sessione dallo slot (SaveError se assente o illeggibile).
+        """
+        self._restore(self.saves.load(slot))
+
+    def _restore(self, image):
+        self.state = restore_state(image)
+        if isinstance(self.world, WorldOverlay):
+            self.world.restore(overlay_delta(image))
+        self.missions = self._tracker()
+
+    def _tracker(self) -> MissionTracker:
+        tracker = MissionTracker(self.world, self.state)
+        if self.profiler is not None:
+            self.profiler.instrument(tracker, "update", "stage:missions")
+        return tracker
+
+    def recover(self, path: str) -> int:
+        """
+        Ripristina la sessione da un journal: carica lo slot dell'ultimo
+        checkpoint e riesegue le azioni successive tramite execute().
+        Restituisce il numero di azioni rieseguite.
+        """
+        checkpoint, entries = read_journal(path)
+        start = 0
+        if checkpoint is not None:
+            slot, start = checkpoint
+            image = self.saves.load(slot)
+            self._restore(image)
+            # salvataggio scritto ma crash prima del checkpoint: vale lo slot
+            start = max(start, image.get("meta", {}).get("turns", start))
+
+        journal, self.journal = self.journal, None
+        replayed = 0
+        try:
+            for turn, command, target, indirect in entries:
+                if turn <= start:
+                    continue
+                if command == "exit":
+                    # la sessione ripristinata continua
+                    self.turns = turn
+                    continue
+                self.turns = turn - 1
+                self.execute(SimpleNamespace(command=command, target=target, indirect=indirect))
+                replayed += 1
+        finally:
+            self.journal = journal
+        self.turns = max(self.turns, start)
+        return replayed
+
+    def close(self):
+        """
+        Chiusura regolare della sessione: il journal viene svuotato (non
+        c'è nulla da ripristinare al prossimo avvio).
+        """
+        if self.journal is not None:
+            self.journal.close(discard=True)
+        if self.profiler is not None and self.profile_path:
+            self.profiler.dump(self.profile_path)
+
+    def _handle_profile(self, action, state, world) -> str:
+        """
+        'profile' mostra i tempi per fase e per callback,
+        'profile json' li restituisce in JSON, 'profile reset' li azzera.
+        """
+        if self.profiler is None:
+            return "Profilazione disattivata: avvia con --profile o TQE_PROFILE=1."
+        if action.target == "reset":
+            self.profiler.reset()
+            return "Statistiche di profilazione azzerate."
+        if action.target == "json":
+            return json.dumps(self.profiler.as_dict(), indent=2)
+        if not self.profiler.histograms:
+            return "Nessun dato di profilazione."
+        return self.profiler.report()
+
+    def _handle_save(self, action, state, world) -> str:
+        slot = action.target or "default"
+        try:
+            self.save(slot)
+        except (SaveError, OSError) as e:
+            return f"Salvataggio non riuscito: {e}"
+        return f"Salvataggio in slot '{slot}' completato."
+
+    def _handle_load(self, action, state, world) -> str:
+        slot = action.target or "default"
+        try:
+            self.load(slot)
+        except (SaveError, OSError) as e:
+            return f"Caricamento non riuscito: {e}"
+        return f"Caricamento da slot '{slot}' completato."
 
     def run(self):
         if not self.world:
             raise RuntimeError("Mondo non caricato. Chiama load_world() prima di run().")
 
         # Intro
-        if self.world.intro_text:
-            print(self.world.intro_text.strip(), "\n")
-        print("Benvenuto in TextQuestEngine!\n")
+        print(self.intro())
 
-        while True:
+        while not self.finished:
             try:
                 line = input("> ")
             except (EOFError, KeyboardInterrupt):
                 print("\nArrivederci!")
                 break
 
-            action = self.parser.parse(line, self.state, self.world)
-
-            # 1) pre_action: cattura output plugin
-            pre = self.dispatcher.emit("pre_action", action, self.state, self.world)
-            if pre is not None:
-                print(pre)
-                continue
-
-            if action.command == "exit":
-                print("Grazie per aver giocato. Arrivederci!")
-                break
-
-            # 2) dispatch comando (ora plugin command_{cmd} viene chiamato PRIMA)
-            output = self.dispatcher.dispatch(action, self.state, self.world)
-
-            # 3) Controlla missioni completate
-            for mid, m in self.world.missions.items():
-                if self.state["missions"].get(mid) == "In corso":
-                    req = m.requirements.get("have_item", [])
-                    if all(item in self.state["inventory"] for item in req):
-                        self.state["missions"][mid] = "Completata"
-                        print(m.rewards.get("message", f"Missione '{m.title}' completata!"))
-
-            # 4) Stampa output del comando
+            output = self.process(line)
             if output:
                 print(output)
-
-            # 5) post_action
-            self.dispatcher.emit("post_action", action, self.state, self.world)
+        self.close()
@@ -0,0 +1,343 @@
+# engine/core/grammar.py
+
+import re
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from engine.core.spelling import SpellingIndex
+
+# Token: parole (anche con trattini, es. nomi degli slot) e articoli elisi
+# staccati dalla parola che segue ("l'ascia" -> "l'", "ascia")
+_TOKEN = re.compile(r"[\w-]+'?")
+
+# Nodo dell'automa dei verbi: token -> nodo figlio, _VERB -> comando
+_VERB = ""
+
+# Cresce a ogni registrazione in una qualsiasi Grammar: finché non cambia,
+# compiled() restituisce l'automa senza ricontrollare i livelli genitori
+_generation = 0
+
+
+def tokenize(line: str) -> List[str]:
+    """
+    Minuscolo, senza punteggiatura, in un solo passaggio della regex.
+    """
+    return _TOKEN.findall(line.lower().replace("’", "'"))
+
+
+def join(tokens: List[str]) -> str:
+    """
+    Testo di una sequenza di token, con gli articoli elisi riattaccati.
+    """
+    return " ".join(tokens).replace("' ", "'")
+
+
+class Action(SimpleNamespace):
+    """
+    Azione interpretata: comando canonico, target e indirect (id già
+    risolti quando il parser ha il mondo). Resta un SimpleNamespace:
+    i plugin possono aggiungere attributi.
+    """
+
+    def __init__(self, command: str, target: Optional[str] = None,
+                 indirect: Optional[str] = None, **extra):
+        self.command = command
+        self.target = target
+        self.indirect = indirect
+        if extra:
+            self.__dict__.update(extra)
+
+    def __reduce__(self):
+        # pickle (pool dei plugin heavy): SimpleNamespace ricreerebbe Action() senza argomenti
+        return (Action, (self.command, self.target, self.indirect), dict(vars(self)))
+
+
+class Pattern:
+    """
+    Schema degli argomenti di un verbo, es. "<target> @with <indirect>":
+    - <target>, <indirect>: una o più parole
+    - <number>: un numero (finisce in indirect)
+    - @classe: una preposizione della classe (vedi Grammar.preposition)
+    - altre parole: da digitare così come sono
+    command, se indicato, sostituisce il comando del verbo ("vai a ..." -> travel).
+    """
+    __slots__ = ("source", "elements", "command")
+
+    def __init__(self, source: str, prepositions: Dict[str, frozenset], command: Optional[str] = None):
+        self.source = source
+        self.command = command
+        elements = []
+        for word in source.split():
+            if word in ("<target>", "<indirect>"):
+                elements.append(("slot", word[1:-1]))
+            elif word == "<number>":
+                elements.append(("number", "indirect"))
+            elif word.startswith("@"):
+                elements.append(("word", prepositions.get(word[1:], frozenset())))
+            else:
+                elements.append(("word", frozenset([word])))
+        self.elements = tuple(elements)
+
+    def match(self, tokens: List[str], start: int) -> Optional[Dict[str, str]]:
+        """
+        Argomenti (slot -> testo) se tokens[start:] segue lo schema, altrimenti
+        None. Uno slot si ferma al primo token accettato dall'elemento seguente.
+        """
+        elements = self.elements
+        last = len(elements) - 1
+        n = len(tokens)
+        i = start
+        slots = {}
+        for k, (kind, value) in enumerate(elements):
+            if kind != "slot":
+                if i >= n:
+                    return None
+                token = tokens[i]
+                if kind == "word":
+                    if token not in value:
+                        return None
+                elif not token.isdigit():
+                    return None
+                else:
+                    slots[value] = token
+                i += 1
+                continue
+            if i >= n:
+                return None
+            if k == last:
+                end = n
+            else:
+                next_kind, next_value = elements[k + 1]
+                if next_kind == "slot":
+                    end = i + 1
+                elif k + 1 == last:
+                    # l'elemento finale deve cadere sull'ultimo token
+                    token = tokens[-1]
+                    ok = token in next_value if next_kind == "word" else token.isdigit()
+                    end = n - 1 if ok and n - 1 > i else None
+                else:
+                    end = None
+                    for j in range(i + 1, n):
+                        token = tokens[j]
+                        if (token in next_value) if next_kind == "word" else token.isdigit():
+                            end = j
+                            break
+                if end is None:
+                    return None
+            slots[value] = join(tokens[i:end])
+            i = end
+        return slots if i == n else None
+
+
+class CompiledGrammar:
+    """
+    Automa dei verbi (trie sui token: i verbi di più parole si riconoscono
+    in un solo passaggio, scegliendo il più lungo) e schemi per comando.
+    """
+    __slots__ = ("trie", "patterns", "verbs", "_spelling", "extensions")
+
+    def __init__(self, verbs: Dict[Tuple[str, ...], str], patterns: Dict[str, Tuple[Pattern, ...]]):
+        self.trie: dict = {}
+        self.verbs = len(verbs)
+        for words, command in verbs.items():
+            node = self.trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[_VERB] = command
+        self.patterns = patterns
+        self._spelling = None
+        # regole di un livello figlio -> automa esteso: le sessioni che
+        # aggiungono gli stessi verbi (comandi del motore, plugin) lo condividono
+        self.extensions: Dict[tuple, "CompiledGrammar"] = {}
+
+    def spelling(self):
+        """
+        Indice di correzione (SpellingIndex) delle prime parole dei verbi,
+        costruito al primo errore di battitura.
+        """
+        if self._spelling is None:
+            self._spelling = SpellingIndex(word for word in self.trie if word != _VERB)
+        return self._spelling
+
+    def verb(self, tokens: List[str]) -> Tuple[Optional[str], int]:
+        """
+        (comando, numero di token del verbo) per l'inizio di tokens,
+        (None, 0) se non inizia con un verbo registrato.
+        """
+        node = self.trie
+        found, length, n = None, 0, 0
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                break
+            n += 1
+            command = node.get(_VERB)
+            if command is not None:
+                found, length = command, n
+        return found, length
+
+    def parse(self, tokens: List[str]) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        (comando, target, indirect) come testo non ancora risolto,
+        None se la riga non inizia con un verbo.
+        """
+        command, start = self.verb(tokens)
+        if command is None:
+            return None
+        for pattern in self.patterns.get(command, ()):
+            slots = pattern.match(tokens, start)
+            if slots is not None:
+                return pattern.command or command, slots.get("target"), slots.get("indirect")
+        if start < len(tokens):
+            return command, join(tokens[start:]), None
+        return command, None, None
+
+
+class Grammar:
+    """
+    Verbi (con sinonimi, anche di più parole), classi di preposizioni e
+    schemi degli argomenti registrati da motore, mondo e plugin.
+    compiled() costruisce l'automa una volta e lo ricostruisce solo dopo
+    nuove registrazioni; extend() crea un livello che aggiunge regole a
+    una grammatica esistente senza modificarla. Livelli con le stesse regole
+    sopra lo stesso genitore (es. le sessioni di un mondo) condividono
+    l'automa e il suo indice di correzione.
+    """
+
+    def __init__(self, parent: Optional["Grammar"] = None):
+        self.parent = parent
+        self._verbs: Dict[Tuple[str, ...], str] = {}
+        self._prepositions: Dict[str, set] = {}
+        self._patterns: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        self._compiled: Optional[CompiledGrammar] = None
+        self._parent_compiled: Optional[CompiledGrammar] = None
+        self._generation = -1
+
+    def extend(self) -> "Grammar":
+        return Grammar(self)
+
+    # --- registrazione ---------------------------------------------------
+
+    def verb(self, command: str, *synonyms: str):
+        """
+        Registra command (e i sinonimi, es. "raccogli", "pick up") come verbo.
+        """
+        for phrase in (command,) + synonyms:
+            words = tuple(tokenize(phrase))
+            if words and self._known(words) != command:
+                self._verbs[words] = command
+                self._changed()
+
+    def _known(self, words: Tuple[str, ...]) -> Optional[str]:
+        grammar = self
+        while grammar is not None:
+            command = grammar._verbs.get(words)
+            if command is not None:
+                return command
+            grammar = grammar.parent
+        return None
+
+    def preposition(self, name: str, *words: str):
+        """
+        Aggiunge parole alla classe di preposizioni name (usata come @name negli schemi).
+        """
+        self._prepositions.setdefault(name, set()).update(w.lower() for w in words)
+        self._changed()
+
+    def pattern(self, command: str, pattern: str, result: Optional[str] = None):
+        """
+        Schema degli argomenti di command (vedi Pattern), provato prima di
+        quelli registrati in precedenza per lo stesso comando.
+        """
+        self._patterns.setdefault(command, []).insert(0, (pattern, result))
+        self._changed()
+
+    def update(self, spec: Optional[dict]):
+        """
+        Regole da un dizionario (es. config.grammar del world.yaml):
+            verbs:        {comando: [sinonimi]}
+            prepositions: {classe: [parole]}
+            patterns:     {comando: ["schema", {pattern: "schema", command: "comando"}]}
+        """
+        spec = spec or {}
+        for command, synonyms in (spec.get("verbs") or {}).items():
+            self.verb(command, *([synonyms] if isinstance(synonyms, str) else synonyms or ()))
+        for name, words in (spec.get("prepositions") or {}).items():
+            self.preposition(name, *([words] if isinstance(words, str) else words))
+        for command, patterns in (spec.get("patterns") or {}).items():
+            for p in [patterns] if isinstance(patterns, (str, dict)) else patterns:
+                if isinstance(p, dict):
+                    self.pattern(command, p["pattern"], p.get("command"))
+                else:
+                    self.pattern(command, p)
+
+    # --- compilazione ----------------------------------------------------
+
+    def _layers(self) -> List["Grammar"]:
+        layers = []
+        grammar = self
+        while grammar is not None:
+            layers.append(grammar)
+            grammar = grammar.parent
+        layers.reverse()
+        return layers
+
+    def _changed(self):
+        global _generation
+        self._compiled = None
+        _generation += 1
+
+    def compiled(self) -> CompiledGrammar:
+        if self._generation == _generation and self._compiled is not None:
+            return self._compiled
+        parent = self.parent.compiled() if self.parent is not None else None
+        if self._compiled is not None and parent is self._parent_compiled:
+            return self._compiled
+        if parent is not None and not (self._verbs or self._prepositions or self._patterns):
+            # livello vuoto: si usa l'automa del genitore così com'è
+            compiled = parent
+        elif parent is not None:
+            key = self._rules()
+            compiled = parent.extensions.get(key)
+            if compiled is None:
+                compiled = parent.extensions[key] = self._build()
+        else:
+            compiled = self._build()
+        self._compiled, self._parent_compiled = compiled, parent
+        self._generation = _generation
+        return compiled
+
+    def _rules(self) -> tuple:
+        return (tuple(sorted(self._verbs.items())),
+                tuple(sorted((name, frozenset(words)) for name, words in self._prepositions.items())),
+                tuple(sorted((command, tuple(entries)) for command, entries in self._patterns.items())))
+
+    def _build(self) -> CompiledGrammar:
+        layers = self._layers()
+        verbs, prepositions, patterns = {}, {}, {}
+        for layer in layers:
+            verbs.update(layer._verbs)
+            for name, words in layer._prepositions.items():
+                prepositions.setdefault(name, set()).update(words)
+        frozen = {name: frozenset(words) for name, words in prepositions.items()}
+        for layer in layers:
+            for command, entries in layer._patterns.items():
+                # i livelli più recenti hanno la precedenza
+                patterns[command] = tuple(Pattern(p, frozen, r) for p, r in entries) \
+                    + patterns.get(command, ())
+        return CompiledGrammar(verbs, patterns)
+
+
+def default_grammar(synonyms: Dict[str, str], spec: Optional[dict] = None) -> Grammar:
+    """
+    Grammatica di base: i sinonimi dei comandi (token -> comando) più le
+    regole di spec (vedi Grammar.update()).
+    """
+    grammar = Grammar()
+    by_command: Dict[str, List[str]] = {}
+    for token, command in synonyms.items():
+        by_command.setdefault(command, []).append(token)
+    for command, tokens in by_command.items():
+        grammar.verb(command, *tokens)
+    grammar.update(spec)
+    return grammar
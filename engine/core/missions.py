@@ -0,0 +1,165 @@
+# engine/core/missions.py
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Tipi di requisito supportati in missions.<id>.requirements:
+#   have_item:    oggetti nell'inventario
+#   visited_room: stanze visitate almeno una volta
+#   flag_set:     flag veri nello stato di gioco o nei flag del mondo
+#   talked_to:    NPC con cui si è parlato
+REQUIREMENT_KINDS = ("have_item", "visited_room", "flag_set", "talked_to")
+
+Trigger = Tuple[str, str]
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def requirement_met(kind: str, key: str, state, world) -> bool:
+    """
+    Vero se il requisito (tipo, chiave) vale per lo stato della sessione.
+    """
+    if kind == "have_item":
+        return key in state["inventory"]
+    if kind == "visited_room":
+        return key in state["visited"]
+    if kind == "talked_to":
+        return key in state.get("talked_to", ())
+    return bool(state.get(key) or world.flags.get(key))
+
+
+class MissionIndex:
+    """
+    Indice trigger -> missioni, costruito una volta per mondo:
+    per ogni (tipo requisito, chiave) le missioni che ne dipendono.
+    """
+
+    def __init__(self, missions: Dict[str, Any]):
+        self.order: Dict[str, int] = {}
+        self.requirements: Dict[str, Tuple[Trigger, ...]] = {}
+        self.by_trigger: Dict[Trigger, List[str]] = {}
+        self.watched_flags = set()
+
+        for n, (mid, mission) in enumerate(missions.items()):
+            self.order[mid] = n
+            reqs = []
+            for kind in REQUIREMENT_KINDS:
+                for key in _as_list(mission.requirements.get(kind)):
+                    reqs.append((kind, key))
+                    self.by_trigger.setdefault((kind, key), []).append(mid)
+                    if kind == "flag_set":
+                        self.watched_flags.add(key)
+            self.requirements[mid] = tuple(reqs)
+
+
+class MissionTracker:
+    """
+    Valutazione incrementale delle missioni di una sessione: dopo ogni turno
+    si raccolgono i trigger cambiati (oggetti ottenuti, stanze visitate,
+    flag attivati, NPC con cui si è parlato) e si rivalutano solo le missioni
+    che dipendono da quei trigger.
+    """
+
+    def __init__(self, world, state: Dict[str, Any]):
+        self.world = world
+        self.state = state
+        self.index = world.cached("missions", lambda: MissionIndex(world.missions))
+        self._inventory = set()
+        self._inventory_version = None
+        # flag osservati falsi / veri all'ultimo turno: un flag spento torna
+        # fra quelli da osservare, così una nuova attivazione scatta di nuovo
+        self._unset_flags = set(self.index.watched_flags)
+        self._set_flags = set()
+        self._known_missions = set()
+        state.setdefault("visited", set()).add(state["current_room"])
+        state.setdefault("talked_to", set())
+        # stanze già viste dal tracker: anche quelle attraversate in un
+        # viaggio (aggiunte dal comando) diventano trigger
+        self._visited = set(state["visited"])
+        self._visited_version = None
+
+    def _changed_triggers(self, action) -> List[Trigger]:
+        state = self.state
+        changed = []
+
+        # Con ItemBag il diff dell'inventario si salta se non è cambiato nulla
+        inv = state["inventory"]
+        version = getattr(inv, "version", None)
+        if version is not None:
+            version = (id(inv), version)
+        if version is None or version != self._inventory_version:
+            inventory = set(inv)
+            for iid in inventory - self._inventory:
+                changed.append(("have_item", iid))
+            self._inventory = inventory
+            self._inventory_version = version
+
+        visited = state["visited"]
+        visited.add(state["current_room"])
+        version = getattr(visited, "version", None)
+        if version is not None:
+            version = (id(visited), version)
+        if version is None or version != self._visited_version:
+            for room in visited - self._visited:
+                changed.append(("visited_room", room))
+            self._visited = set(visited)
+            self._visited_version = version
+
+        if action is not None and action.command == "talk" and action.target in self.world.npcs:
+            if action.target not in state["talked_to"]:
+                state["talked_to"].add(action.target)
+                changed.append(("talked_to", action.target))
+
+        if self._unset_flags or self._set_flags:
+            flags = self.world.flags
+            for flag in [f for f in self._set_flags if not (state.get(f) or flags.get(f))]:
+                self._set_flags.discard(flag)
+                self._unset_flags.add(flag)
+            for flag in [f for f in self._unset_flags if state.get(f) or flags.get(f)]:
+                self._unset_flags.discard(flag)
+                self._set_flags.add(flag)
+                changed.append(("flag_set", flag))
+        return changed
+
+    def satisfied(self, mid: str) -> bool:
+        state, world = self.state, self.world
+        return all(requirement_met(kind, key, state, world)
+                   for kind, key in self.index.requirements.get(mid, ()))
+
+    def update(self, action=None) -> List[str]:
+        """
+        Da chiamare a fine turno: completa le missioni soddisfatte e
+        restituisce i messaggi di ricompensa, nell'ordine di definizione.
+        """
+        by_trigger = self.index.by_trigger
+        candidates = set()
+        for trigger in self._changed_triggers(action):
+            candidates.update(by_trigger.get(trigger, ()))
+
+        # Missioni attivate da poco (all'avvio o da un plugin): valutate una volta
+        missions = self.state["missions"]
+        # (confronto delle chiavi: una rimossa e una aggiunta nello stesso turno
+        # lasciano invariato il numero)
+        if missions.keys() != self._known_missions:
+            candidates.update(missions.keys() - self._known_missions)
+            self._known_missions = set(missions)
+
+        return self.complete(candidates)
+
+    def complete(self, candidates: Iterable[str]) -> List[str]:
+        missions = self.state["missions"]
+        order = self.index.order
+        messages = []
+        for mid in sorted(candidates, key=lambda m: order.get(m, len(order))):
+            if missions.get(mid) != "In corso" or mid not in order:
+                continue
+            if self.satisfied(mid):
+                missions[mid] = "Completata"
+                m = self.world.missions[mid]
+                messages.append(m.rewards.get("message", f"Missione '{m.title}' completata!"))
+        return messages
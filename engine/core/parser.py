@@ -1,14 +1,33 @@
 # engine/core/parser.py
 
-from types import SimpleNamespace
+from typing import Optional
+
+from engine.core.grammar import Action, CompiledGrammar, Grammar, default_grammar, join, tokenize
+from engine.core.spelling import world_spelling
+from engine.data.aliases import normalize, world_aliases
+
+
+def _world_grammar(world, base: Grammar) -> Grammar:
+    grammar = base.extend()
+    grammar.update(getattr(world, "grammar", None))
+    return grammar
+
 
 class Parser:
     """
-    Converte la stringa immessa dall'utente in un'azione interna:
+    Converte la stringa immessa dall'utente in un'azione interna (Action):
     - command: nome canonico del comando (es. "look", "take", "inventory")
     - target: oggetto/parametro (se presente)
-    - indirect: oggetto indiretto per comandi tipo 'use' (se presente)
-    Gestisce sinonimi in italiano e inglese.
+    - indirect: oggetto indiretto per comandi tipo 'use' (se presente),
+      numero dell'opzione per 'parla <npc> <numero>'
+    Gestisce sinonimi in italiano e inglese. Verbi, preposizioni e schemi
+    degli argomenti sono regole di una Grammar (estendibile dal mondo con
+    config.grammar e dai plugin), compilate in un automa sui token.
+    Se viene passato il mondo, target e indirect vengono risolti in id di
+    oggetti/NPC tramite l'indice degli alias ("prendi la lanterna" -> torcia).
+    Gli errori di battitura nel verbo e nei nomi vengono corretti entro
+    una distanza di edit limitata ("prnedi torcia" -> take torcia); se la
+    correzione del verbo è ambigua l'azione porta i suggerimenti.
     """
 
     # mappatura token -> comando canonico
@@ -25,30 +44,162 @@ class Parser:
         "missions": "missions", "missioni": "missions",
         "stats": "stats", "statistiche": "stats",
         "exit": "exit", "esci": "exit",
+        "talk": "talk", "parla": "talk",
+        "travel": "travel", "raggiungi": "travel",
+    }
+
+    # classi di preposizioni usate dagli schemi degli argomenti
+    PREPOSITIONS = {
+        # 'vai a <stanza>', 'vai alla <stanza>', 'move to <room>': viaggio verso una stanza
+        "to": ("a", "al", "all", "all'", "allo", "alla", "ai", "verso", "to"),
+        # 'usa <oggetto> con <oggetto2>', 'use <item> on <item2>'
+        "with": ("con", "col", "su", "sul", "sulla", "with", "on"),
+    }
+    PATTERNS = {
+        "use": ["<target> @with <indirect>"],
+        "move": [{"pattern": "@to <target>", "command": "travel"}],
+        # 'parla gnomo 2': risposta numero 2 del dialogo
+        "talk": ["<target> <number>"],
     }
+    TRAVEL_PREPOSITIONS = frozenset(PREPOSITIONS["to"])
 
-    def parse(self, line: str, state=None, world=None) -> SimpleNamespace:
+    # comandi i cui argomenti sono oggetti, NPC o stanze da risolvere
+    ITEM_COMMANDS = frozenset({"look", "take", "drop", "use"})
+    NPC_COMMANDS = frozenset({"talk"})
+    ROOM_COMMANDS = frozenset({"travel"})
+
+    _base_grammar: Optional[Grammar] = None
+
+    def __init__(self, grammar: Optional[Grammar] = None):
+        # regole della sessione (es. verbi dei plugin), sopra quelle del mondo
+        self.grammar = grammar if grammar is not None else Grammar(self.base_grammar())
+        # mondo (base) per cui è impostato il genitore di self.grammar
+        self._world = None
+        # verbo -> bool per i comandi gestiti altrove (es. dispatcher.knows):
+        # non vengono mai "corretti" verso un verbo della grammatica
+        self.known = None
+
+    normalize = staticmethod(tokenize)
+
+    @classmethod
+    def base_grammar(cls) -> Grammar:
+        if cls._base_grammar is None:
+            cls._base_grammar = default_grammar(cls.COMMAND_SYNONYMS, {
+                "prepositions": cls.PREPOSITIONS, "patterns": cls.PATTERNS})
+        return cls._base_grammar
+
+    def compiled(self, world=None) -> CompiledGrammar:
+        """
+        Automa per la sessione: grammatica di base, regole del mondo
+        (config.grammar, compilate una volta per mondo) e della sessione.
+        """
+        base = getattr(world, "base", world)
+        if base is not self._world:
+            self._world = base
+            parent = self.base_grammar()
+            if base is not None and hasattr(base, "cached"):
+                parent = base.cached("grammar", lambda: _world_grammar(base, self.base_grammar()))
+            self.grammar.parent = parent
+            self.grammar._generation = -1
+        return self.grammar.compiled()
+
+    def parse(self, line: str, state=None, world=None) -> Action:
         """
         line: stringa raw digitata dall'utente
-        state, world: ignorati, ma accettati per compatibilità
+        state, world: se presenti, usati per risolvere gli alias degli oggetti
         """
-        parts = line.strip().lower().split()
-        if not parts:
-            return SimpleNamespace(command="help", target=None, indirect=None)
-
-        cmd_token = parts[0]
-        command = self.COMMAND_SYNONYMS.get(cmd_token, cmd_token)
-
-        target = None
-        indirect = None
-
-        if len(parts) > 1:
-            # gestiamo 'usa <oggetto> con <oggetto2>'
-            if command == "use" and "con" in parts:
-                idx = parts.index("con")
-                target = " ".join(parts[1:idx])
-                indirect = " ".join(parts[idx+1:])
+        tokens = tokenize(line)
+        if not tokens:
+            return Action("help")
+
+        compiled = self.compiled(world)
+        parsed = compiled.parse(tokens)
+        place = parsed is None and world is not None and self._is_place(tokens, state, world)
+        suggestions = None
+        if parsed is None and not place and not (self.known is not None and self.known(tokens[0])):
+            # errore di battitura nel verbo: 'prnedi torcia' -> 'prendi torcia'
+            spelling = compiled.spelling()
+            fixed = spelling.correct(tokens[0])
+            if fixed is not None:
+                parsed = compiled.parse([fixed] + tokens[1:])
             else:
-                target = " ".join(parts[1:])
+                suggestions = spelling.suggest(tokens[0])
+
+        if parsed is not None:
+            command, target, indirect = parsed
+        elif place:
+            # solo una direzione o una stanza: 'nord', 'taverna'
+            command, target, indirect = "move", join(tokens), None
+        else:
+            # verbo sconosciuto: lo risolve il dispatcher (alias e hook dei plugin)
+            command, target, indirect = tokens[0], join(tokens[1:]) or None, None
+
+        if world is not None and target:
+            if command in self.ITEM_COMMANDS:
+                target = self.resolve_item(target, state, world)
+                if indirect:
+                    indirect = self.resolve_item(indirect, state, world)
+            elif command in self.NPC_COMMANDS:
+                target = self.resolve_npc(target, state, world)
+            elif command in self.ROOM_COMMANDS:
+                target = self.resolve_room(target, world)
+
+        if suggestions:
+            return Action(command, target, indirect, suggestions=tuple(suggestions))
+        return Action(command, target, indirect)
+
+    @staticmethod
+    def _is_place(tokens, state, world) -> bool:
+        phrase = join(tokens)
+        rooms = world.rooms
+        if phrase in rooms:
+            return True
+        if state and hasattr(rooms, "get"):
+            room = rooms.get(state.get("current_room"))
+            return room is not None and phrase in room.connections
+        return False
+
+    def resolve_item(self, phrase: str, state, world) -> str:
+        """
+        Id dell'oggetto indicato da phrase. Con più candidati si preferiscono
+        quelli nell'inventario o nella stanza corrente. Se nulla corrisponde
+        restituisce phrase invariata.
+        """
+        if phrase in world.items:
+            return phrase
+        ids = world_aliases(world).items.resolve(phrase) or self._respelled("items", phrase, world)
+        if not ids:
+            return phrase
+        if len(ids) > 1 and state:
+            scope = [state.get("inventory", ())]
+            room = world.rooms.get(state.get("current_room")) if hasattr(world.rooms, "get") else None
+            if room is not None:
+                scope.append(room.items)
+            for iid in ids:
+                if any(iid in where for where in scope):
+                    return iid
+        return ids[0]
+
+    def resolve_npc(self, phrase: str, state, world) -> str:
+        if phrase in world.npcs:
+            return phrase
+        ids = world_aliases(world).npcs.resolve(phrase) or self._respelled("npcs", phrase, world)
+        if len(ids) > 1 and state:
+            here = [nid for nid in ids if world.npc_location(nid) == state.get("current_room")]
+            if here:
+                return here[0]
+        return ids[0] if ids else phrase
+
+    def resolve_room(self, phrase: str, world) -> str:
+        if phrase in world.rooms:
+            return phrase
+        ids = world_aliases(world).rooms.resolve(phrase) or self._respelled("rooms", phrase, world)
+        return ids[0] if ids else phrase
 
-        return SimpleNamespace(command=command, target=target, indirect=indirect)
+    @staticmethod
+    def _respelled(kind: str, phrase: str, world) -> tuple:
+        # nessun alias corrisponde: si riprova con le parole corrette
+        fixed = world_spelling(world).correct(kind, " ".join(normalize(phrase)))
+        if fixed is None:
+            return ()
+        return getattr(world_aliases(world), kind).resolve(fixed)
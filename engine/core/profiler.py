@@ -0,0 +1,152 @@
+# engine/core/profiler.py
+
+import os
+import json
+import asyncio
+from time import perf_counter_ns
+from typing import Dict, Optional
+
+# Variabile d'ambiente: "1" attiva la profilazione, un percorso .json
+# la attiva e scrive il report in quel file alla chiusura della sessione
+PROFILE_ENV = "TQE_PROFILE"
+
+_BUCKETS = 64
+
+
+class Histogram:
+    """
+    Istogramma delle durate (in ns) con bucket a potenze di 2:
+    aggiungere un campione costa una bit_length(), i percentili sono
+    stimati con un errore massimo di un fattore 2.
+    """
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets = [0] * _BUCKETS
+
+    def add(self, ns: int):
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.buckets[min(ns.bit_length(), _BUCKETS - 1)] += 1
+
+    def percentile(self, p: float) -> int:
+        if not self.count:
+            return 0
+        # limite superiore del bucket, senza uscire da [min, max]
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return max(min(1 << i, self.max), self.min)
+        return self.max
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total / 1e6, 3),
+            "mean_us": round(self.total / self.count / 1e3, 2) if self.count else 0.0,
+            "p50_us": round(self.percentile(0.5) / 1e3, 2),
+            "p90_us": round(self.percentile(0.9) / 1e3, 2),
+            "p99_us": round(self.percentile(0.99) / 1e3, 2),
+            "max_us": round(self.max / 1e3, 2),
+        }
+
+
+def callback_name(callback) -> str:
+    owner = getattr(callback, "__self__", None)
+    if owner is not None:
+        return f"{type(owner).__name__}.{callback.__name__}"
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+class Profiler:
+    """
+    Tempi per fase del turno (stage:parse, stage:pre_action, stage:dispatch,
+    stage:clock, stage:missions, stage:post_action, turn) e per callback (plugin:<nome>,
+    core:<comando>).
+
+    Gli oggetti vengono strumentati solo quando la profilazione è attiva
+    (wrapper installati una volta, vedi instrument() e
+    EventDispatcher.set_profiler()): da spenta non costa nulla.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+
+    def histogram(self, name: str) -> Histogram:
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        return hist
+
+    def timed(self, name: str, fn):
+        """
+        Restituisce fn avvolta in una misura del tempo su histogram(name).
+        Se fn restituisce una coroutine, la misura termina quando la
+        coroutine è completata.
+        """
+        add = self.histogram(name).add
+
+        async def finish(coro, t0):
+            try:
+                return await coro
+            finally:
+                add(perf_counter_ns() - t0)
+
+        def wrapper(*args, **kwargs):
+            t0 = perf_counter_ns()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                add(perf_counter_ns() - t0)
+                raise
+            if result is not None and asyncio.iscoroutine(result):
+                return finish(result, t0)
+            add(perf_counter_ns() - t0)
+            return result
+
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def instrument(self, obj, attr: str, name: str):
+        setattr(obj, attr, self.timed(name, getattr(obj, attr)))
+
+    def reset(self):
+        # azzerati sul posto: i wrapper installati tengono i riferimenti
+        for hist in self.histograms.values():
+            hist.__init__()
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: h.as_dict() for name, h in sorted(self.histograms.items()) if h.count}
+
+    def dump(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def report(self) -> str:
+        rows = sorted(((n, h) for n, h in self.histograms.items() if h.count), key=lambda kv: -kv[1].total)
+        lines = [f"{'fase / callback':40s} {'n':>8s} {'media µs':>10s} {'p50':>8s} {'p99':>8s} {'tot ms':>10s}"]
+        for name, h in rows:
+            d = h.as_dict()
+            lines.append(f"{name:40s} {d['count']:8d} {d['mean_us']:10.2f} "
+                         f"{d['p50_us']:8.1f} {d['p99_us']:8.1f} {d['total_ms']:10.2f}")
+        return "\n".join(lines)
+
+
+def profiler_from_env() -> Optional[str]:
+    """
+    Valore di TQE_PROFILE se la profilazione è richiesta, altrimenti None.
+    """
+    value = os.environ.get(PROFILE_ENV, "").strip()
+    if value.lower() in ("", "0", "false", "no"):
+        return None
+    return value
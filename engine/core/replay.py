@@ -0,0 +1,80 @@
+# engine/core/replay.py
+
+import time
+from typing import Iterable, Iterator, List
+
+
+class ReplayResult:
+    """
+    Esito di un'esecuzione non interattiva: output di ogni comando,
+    numero di comandi eseguiti e tempo impiegato.
+    """
+
+    def __init__(self, commands: List[str], outputs: List[str], elapsed: float):
+        self.commands = commands
+        self.outputs = outputs
+        self.elapsed = elapsed
+
+    @property
+    def count(self) -> int:
+        return len(self.outputs)
+
+    @property
+    def commands_per_sec(self) -> float:
+        return self.count / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def transcript(self) -> str:
+        """
+        Trascrizione nello stesso formato della console ("> comando" + output).
+        """
+        lines = []
+        for cmd, out in zip(self.commands, self.outputs):
+            lines.append(f"> {cmd}")
+            if out:
+                lines.append(out)
+        return "\n".join(lines)
+
+
+def read_transcript(path: str) -> List[str]:
+    """
+    Legge un file di comandi, uno per riga. Righe vuote e commenti '#'
+    vengono ignorati. Se il file è il log di una sessione (righe "> comando"
+    seguite dall'output), vengono presi solo i comandi dopo il prompt.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f]
+
+    if any(line.startswith("> ") for line in lines):
+        return [line[2:].strip() for line in lines if line.startswith("> ")]
+    return [line.strip() for line in lines
+            if line.strip() and not line.lstrip().startswith("#")]
+
+
+def replay(game, commands: Iterable[str], stop_on_exit: bool = True) -> ReplayResult:
+    """
+    Esegue una sequenza di comandi sulla sessione game, senza input()/print():
+    parser -> pre_action -> dispatch -> missioni -> post_action per ogni riga.
+    Gli output vengono raccolti in memoria.
+    """
+    executed = []
+    outputs = []
+    process = game.process
+
+    t0 = time.perf_counter()
+    for line in commands:
+        executed.append(line)
+        outputs.append(process(line))
+        if stop_on_exit and game.finished:
+            break
+    elapsed = time.perf_counter() - t0
+    return ReplayResult(executed, outputs, elapsed)
+
+
+def cycle_commands(commands: List[str], total: int) -> Iterator[str]:
+    """
+    Ripete ciclicamente una lista di comandi fino a `total` righe
+    (utile per i benchmark di throughput).
+    """
+    n = len(commands)
+    for i in range(total):
+        yield commands[i % n]
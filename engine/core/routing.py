@@ -0,0 +1,323 @@
+# engine/core/routing.py
+
+import heapq
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Fino a questa dimensione si usano tabelle next-hop (una riga per destinazione,
+# riempita alla prima richiesta); oltre, A* con landmark (ALT)
+NEXT_HOP_MAX_ROOMS = 2048
+LANDMARKS = 8
+# Sui mondi grandi le destinazioni richieste spesso (taverne, negozi, ...)
+# ottengono comunque una riga next-hop, fino a HOT_ROWS righe
+HOT_TARGET_QUERIES = 4
+HOT_ROWS = 32
+
+UNREACHABLE = -1
+
+
+class RoomGraph:
+    """
+    Grafo orientato delle stanze con indici interi: ids[n] è l'id della
+    stanza n, adjacency[n] le stanze raggiungibili da n e labels[n] le
+    direzioni corrispondenti (solo uscite verso stanze esistenti).
+    """
+
+    def __init__(self, rooms):
+        self.ids: List[str] = list(rooms)
+        self.index: Dict[str, int] = {rid: n for n, rid in enumerate(self.ids)}
+        index = self.index
+        self.adjacency: List[array] = []
+        self.labels: List[Tuple[str, ...]] = []
+        for rid in self.ids:
+            targets = array("I")
+            labels = []
+            for direction, target in rooms[rid].connections.items():
+                n = index.get(target)
+                if n is not None:
+                    targets.append(n)
+                    labels.append(direction)
+            self.adjacency.append(targets)
+            self.labels.append(tuple(labels))
+        self._reverse: Optional[List[array]] = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def reverse(self) -> List[array]:
+        if self._reverse is None:
+            reverse = [array("I") for _ in self.ids]
+            for n, targets in enumerate(self.adjacency):
+                for m in targets:
+                    reverse[m].append(n)
+            self._reverse = reverse
+        return self._reverse
+
+    def distances(self, start: int, backward: bool = False) -> array:
+        """
+        BFS da start: distanza (in passi) di ogni stanza, UNREACHABLE se
+        non raggiungibile. Con backward=True distanza da ogni stanza a start.
+        """
+        adjacency = self.reverse if backward else self.adjacency
+        dist = array("i", [UNREACHABLE]) * len(self.ids)
+        dist[start] = 0
+        queue = deque([start])
+        while queue:
+            u = queue.popleft()
+            d = dist[u] + 1
+            for v in adjacency[u]:
+                if dist[v] == UNREACHABLE:
+                    dist[v] = d
+                    queue.append(v)
+        return dist
+
+    def reachable(self, start: str) -> bytearray:
+        """
+        seen[n] == 1 se la stanza n è raggiungibile da start.
+        """
+        seen = bytearray(len(self.ids))
+        if start in self.index:
+            for n, d in enumerate(self.distances(self.index[start])):
+                if d != UNREACHABLE:
+                    seen[n] = 1
+        return seen
+
+    def label(self, u: int, v: int) -> str:
+        targets = self.adjacency[u]
+        for k in range(len(targets)):
+            if targets[k] == v:
+                return self.labels[u][k]
+        raise KeyError((self.ids[u], self.ids[v]))
+
+
+class Router:
+    """
+    Percorsi minimi fra stanze, serviti da indici precalcolati sul grafo:
+
+    - mondi piccoli: tabelle next-hop per destinazione (una BFS all'indietro
+      dalla destinazione, poi ogni query segue la tabella in O(lunghezza))
+    - mondi grandi: A* con euristica ALT (distanze da/verso pochi landmark
+      e disuguaglianza triangolare), che visita solo una frazione del grafo;
+      le destinazioni più richieste passano alle tabelle next-hop
+
+    next_step() muove gli NPC in cammino una stanza alla volta (vedi next_room()).
+    """
+
+    def __init__(self, graph: RoomGraph, landmarks: int = LANDMARKS,
+                 next_hop_max: int = NEXT_HOP_MAX_ROOMS):
+        self.graph = graph
+        self.use_next_hop = len(graph) <= next_hop_max
+        self._rows: Dict[int, array] = {}
+        self._hits: Dict[int, int] = {}
+        self.landmarks: List[int] = []
+        self._from: List[array] = []
+        self._to: List[array] = []
+        if not self.use_next_hop and len(graph):
+            self._build_landmarks(landmarks)
+
+    # --- indici ----------------------------------------------------------
+
+    def _next_hop_row(self, target: int) -> array:
+        row = self._rows.get(target)
+        if row is None:
+            graph = self.graph
+            reverse = graph.reverse
+            row = array("i", [UNREACHABLE]) * len(graph)
+            row[target] = target
+            queue = deque([target])
+            while queue:
+                u = queue.popleft()
+                for p in reverse[u]:
+                    if row[p] == UNREACHABLE:
+                        row[p] = u
+                        queue.append(p)
+            self._rows[target] = row
+        return row
+
+    def precompute(self):
+        """
+        Riempie tutte le righe next-hop (solo mondi piccoli).
+        """
+        if self.use_next_hop:
+            for target in range(len(self.graph)):
+                self._next_hop_row(target)
+
+    def _build_landmarks(self, count: int):
+        # scelta farthest-first: ogni landmark è la stanza più lontana dai precedenti
+        graph = self.graph
+        n = len(graph)
+        nearest = array("i", [n]) * n
+        candidate = 0
+        for _ in range(min(count, n)):
+            self.landmarks.append(candidate)
+            forward = graph.distances(candidate)
+            self._from.append(forward)
+            self._to.append(graph.distances(candidate, backward=True))
+            best, best_d = None, -1
+            for v in range(n):
+                d = forward[v]
+                if d != UNREACHABLE and d < nearest[v]:
+                    nearest[v] = d
+                if nearest[v] > best_d and nearest[v] != n and v not in self.landmarks:
+                    best, best_d = v, nearest[v]
+            if best is None:
+                break
+            candidate = best
+
+    # --- query -----------------------------------------------------------
+
+    def route(self, source: str, target: str) -> Optional[List[int]]:
+        """
+        Indici delle stanze del percorso minimo (estremi inclusi), None se
+        la destinazione non è raggiungibile.
+        """
+        index = self.graph.index
+        if source not in index or target not in index:
+            return None
+        s, t = index[source], index[target]
+        if s == t:
+            return [s]
+        row = self._rows.get(t)
+        if row is None and not self.use_next_hop and len(self._rows) < HOT_ROWS:
+            hits = self._hits[t] = self._hits.get(t, 0) + 1
+            if hits >= HOT_TARGET_QUERIES:
+                row = self._next_hop_row(t)
+        if row is not None or self.use_next_hop:
+            row = row or self._next_hop_row(t)
+            if row[s] == UNREACHABLE:
+                return None
+            path = [s]
+            while s != t:
+                s = row[s]
+                path.append(s)
+            return path
+        return self._astar(s, t)
+
+    def _astar(self, s: int, t: int) -> Optional[List[int]]:
+        adjacency = self.graph.adjacency
+        bounds = [(f[t], b[t], f, b) for f, b in zip(self._from, self._to)]
+
+        def h(v):
+            best = 0
+            for ft, bt, f, b in bounds:
+                fv, bv = f[v], b[v]
+                if ft != UNREACHABLE and fv != UNREACHABLE and ft - fv > best:
+                    best = ft - fv
+                if bv != UNREACHABLE and bt != UNREACHABLE and bv - bt > best:
+                    best = bv - bt
+            return best
+
+        g = {s: 0}
+        parent = {s: s}
+        heap = [(h(s), 0, s)]
+        closed = set()
+        while heap:
+            _, neg_g, u = heapq.heappop(heap)
+            if u == t:
+                path = [t]
+                while u != s:
+                    u = parent[u]
+                    path.append(u)
+                path.reverse()
+                return path
+            if u in closed:
+                continue
+            closed.add(u)
+            gu = -neg_g + 1
+            for v in adjacency[u]:
+                if gu < g.get(v, gu + 1):
+                    g[v] = gu
+                    parent[v] = u
+                    heapq.heappush(heap, (gu + h(v), -gu, v))
+        return None
+
+    def path(self, source: str, target: str) -> Optional[List[str]]:
+        route = self.route(source, target)
+        if route is None:
+            return None
+        ids = self.graph.ids
+        return [ids[n] for n in route]
+
+    def directions(self, source: str, target: str) -> Optional[List[str]]:
+        """
+        Direzioni da seguire (es. ["fuori", "dentro"]), None se irraggiungibile.
+        """
+        route = self.route(source, target)
+        if route is None:
+            return None
+        label = self.graph.label
+        return [label(u, v) for u, v in zip(route, route[1:])]
+
+    def distance(self, source: str, target: str) -> int:
+        route = self.route(source, target)
+        return UNREACHABLE if route is None else len(route) - 1
+
+    def next_step(self, source: str, target: str) -> Optional[str]:
+        """
+        Prossima stanza verso target (None se già arrivati o irraggiungibile).
+        """
+        route = self.route(source, target)
+        if route is None or len(route) < 2:
+            return None
+        return self.graph.ids[route[1]]
+
+
+def bfs_directions(rooms, source: str, target: str) -> Optional[List[str]]:
+    """
+    Percorso con una BFS diretta su rooms, senza indici: per le sessioni
+    che hanno modificato le uscite e come riferimento nei benchmark.
+    """
+    if source not in rooms or target not in rooms:
+        return None
+    parent = {source: None}
+    queue = deque([source])
+    while queue:
+        u = queue.popleft()
+        if u == target:
+            steps = []
+            while parent[u] is not None:
+                u, direction = parent[u]
+                steps.append(direction)
+            steps.reverse()
+            return steps
+        for direction, v in rooms[u].connections.items():
+            if v not in parent and v in rooms:
+                parent[v] = (u, direction)
+                queue.append(v)
+    return None
+
+
+def room_graph(world) -> RoomGraph:
+    base = getattr(world, "base", world)
+    return base.cached("graph", lambda: RoomGraph(base.rooms))
+
+
+def router(world) -> Router:
+    """
+    Router condiviso, costruito una volta sul mondo base.
+    """
+    base = getattr(world, "base", world)
+    return base.cached("router", lambda: Router(room_graph(base)))
+
+
+def find_directions(world, source: str, target: str) -> Optional[List[str]]:
+    """
+    Direzioni da source a target per la sessione: indici precalcolati del
+    mondo base, oppure BFS se la sessione ha modificato delle uscite.
+    """
+    if getattr(world, "room_exits", None):
+        return bfs_directions(world.rooms, source, target)
+    return router(world).directions(source, target)
+
+
+def next_room(world, source: str, target: str) -> Optional[str]:
+    """
+    Prossima stanza da source verso target per la sessione (None se già
+    arrivati o irraggiungibile), come find_directions().
+    """
+    if getattr(world, "room_exits", None):
+        steps = bfs_directions(world.rooms, source, target)
+        return world.rooms[source].connections[steps[0]] if steps else None
+    return router(world).next_step(source, target)
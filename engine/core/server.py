@@ -0,0 +1,188 @@
+# engine/core/server.py
+
+import os
+import re
+import uuid
+import shutil
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from engine.core.game import Game
+from engine.core.dispatcher import Refusal
+from engine.data.saves import SaveStore
+
+log = logging.getLogger(__name__)
+
+# Ogni risposta del server termina con il prompt su una riga nuova:
+# i client leggono fino a REPLY_END per sapere che il turno è concluso.
+PROMPT = "> "
+REPLY_END = "\n" + PROMPT
+
+# Nomi dei giocatori (directory dei salvataggi): senza "-", così non
+# coincidono mai con le directory degli ospiti
+_PLAYER_NAME = re.compile(r"^\w{1,32}$")
+GUEST_PREFIX = "ospite-"
+
+
+class GameServer:
+    """
+    Server asyncio che ospita molte sessioni di gioco in un solo processo,
+    con un protocollo a righe su socket TCP o Unix (usabile anche con telnet/nc).
+
+    Il World viene caricato una sola volta e condiviso; ogni connessione
+    ottiene la propria sessione tramite session_factory(world).
+    """
+
+    def __init__(self, world, session_factory: Optional[Callable] = None,
+                 max_line: int = 4096):
+        self.world = world
+        self.session_factory = session_factory or default_session
+        self.max_line = max_line
+        self.sessions = 0
+        self.commands = 0
+        self._server = None
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        game = self.session_factory(self.world)
+        self.sessions += 1
+        try:
+            writer.write((game.intro() + REPLY_END).encode("utf-8"))
+            await writer.drain()
+
+            while not game.finished:
+                raw = await self._read_line(reader)
+                # oltre max_line la riga viene rifiutata, mai troncata
+                if raw is None or len(raw.rstrip(b"\r\n")) > self.max_line:
+                    writer.write((f"Comando troppo lungo (massimo {self.max_line} caratteri)."
+                                  + REPLY_END).encode("utf-8"))
+                    await writer.drain()
+                    continue
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace")
+                try:
+                    if getattr(game, "heavy_plugins", False):
+                        # il turno attende il pool dei plugin heavy: in un thread,
+                        # così il loop continua a servire le altre sessioni
+                        output = await asyncio.get_running_loop().run_in_executor(None, game.process, line)
+                    else:
+                        # hook async attesi nel loop, post_action async in background
+                        output = await game.process_async(line)
+                except Exception:
+                    log.exception("Errore nella sessione durante %r", line)
+                    output = "Errore interno: comando annullato."
+                self.commands += 1
+
+                end = "\n" if game.finished else REPLY_END
+                writer.write((output + end).encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            # i listener in background della sessione finiscono il loro lavoro
+            await game.dispatcher.drain()
+            try:
+                game.close()
+            except Exception:
+                log.exception("Errore nella chiusura della sessione")
+            self.sessions -= 1
+
+    @staticmethod
+    async def _read_line(reader: asyncio.StreamReader) -> Optional[bytes]:
+        """
+        Una riga del client (b"" a connessione chiusa), o None se supera il
+        limite dello stream: la riga viene scartata fino all'a capo.
+        """
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.LimitOverrunError as e:
+                consumed = e.consumed
+
+    async def start(self, host: str = "127.0.0.1", port: int = 4000,
+                    unix_path: Optional[str] = None):
+        """
+        Avvia il server in ascolto (TCP, oppure socket Unix se unix_path è dato).
+        """
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self.handle_client, path=unix_path,
+                                                           limit=self.max_line * 2)
+        else:
+            self._server = await asyncio.start_server(self.handle_client, host, port,
+                                                      limit=self.max_line * 2)
+        return self._server
+
+    async def serve_forever(self, **kwargs):
+        server = await self.start(**kwargs)
+        async with server:
+            await server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+class ServerSession(Game):
+    """
+    Sessione del server. Con 'giocatore <nome>' i salvataggi passano in
+    save_root/<nome>, dove il giocatore li ritrova alle connessioni successive.
+    Prima di allora la sessione è ospite: salva in una directory propria
+    (save_root/ospite-<id>) che viene rimossa alla disconnessione.
+    """
+
+    def __init__(self, world, save_root: str = "saves", **kwargs):
+        self.save_root = save_root
+        self.player: Optional[str] = None
+        self._guest_dir = os.path.join(save_root, GUEST_PREFIX + uuid.uuid4().hex)
+        super().__init__(world, save_dir=self._guest_dir, **kwargs)
+        self.dispatcher.register_command("player", self._handle_player, aliases=("giocatore",))
+
+    def _handle_player(self, action, state, world) -> str:
+        name = action.target or ""
+        if not _PLAYER_NAME.match(name):
+            return Refusal("Indica il tuo nome: 'giocatore <nome>' (una parola, lettere e cifre).")
+        self.player = name
+        self.saves = SaveStore(os.path.join(self.save_root, name))
+        return f"Benvenuto, {name}: i tuoi salvataggi ti aspettano anche alla prossima connessione."
+
+    def close(self):
+        super().close()
+        shutil.rmtree(self._guest_dir, ignore_errors=True)
+
+
+def default_session(world, save_root: str = "saves") -> Game:
+    """
+    Crea una sessione di gioco: Game avvolge il mondo condiviso in un
+    WorldOverlay, quindi la creazione non copia il mondo. I salvataggi
+    di ogni giocatore stanno in save_root/<nome> (vedi ServerSession).
+    """
+    return ServerSession(world, save_root=save_root)
+
+
+def serve(world, host: str = "127.0.0.1", port: int = 4000, unix_path: Optional[str] = None,
+          session_factory=None):
+    """
+    Avvia il server di gioco e resta in ascolto fino a Ctrl+C.
+    """
+    server = GameServer(world, session_factory)
+    where = unix_path or f"{host}:{port}"
+    print(f"Server TextQuestEngine in ascolto su {where} (Ctrl+C per terminare).")
+    try:
+        asyncio.run(server.serve_forever(host=host, port=port, unix_path=unix_path))
+    except KeyboardInterrupt:
+        print("\nServer arrestato.")
@@ -0,0 +1,221 @@
+# engine/core/spelling.py
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from engine.data.aliases import world_aliases
+
+# Distanza massima gestita dall'indice e lunghezza del prefisso su cui si
+# generano le cancellazioni (come SymSpell: oltre il prefisso la distanza
+# viene verificata solo sui candidati)
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def max_typos(word: str) -> int:
+    """
+    Errori corretti in una parola: nessuno fino a 3 lettere, uno fino a
+    6, due oltre (le parole corte sono troppo simili fra loro: "fai" non
+    diventa "vai").
+    """
+    n = len(word)
+    return 0 if n < 4 else 1 if n < 7 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Distanza di Damerau-Levenshtein (trasposizioni adiacenti comprese,
+    "optimal string alignment"), oppure limit + 1 se la supera.
+    """
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if abs(la - lb) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(lb + 1))
+    for i in range(1, la + 1):
+        cur = [i] + [0] * lb
+        ca = a[i - 1]
+        best = i
+        for j in range(1, lb + 1):
+            cb = b[j - 1]
+            cost = 0 if ca == cb else 1
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, prev2[j - 2] + 1)
+            cur[j] = d
+            if d < best:
+                best = d
+        if best > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[lb] if prev[lb] <= limit else limit + 1
+
+
+class SpellingIndex:
+    """
+    Indice per la correzione degli errori di battitura (schema SymSpell):
+    per ogni termine si registrano le stringhe ottenute cancellando fino a
+    max_distance caratteri dal suo prefisso. Una ricerca genera le
+    cancellazioni della parola digitata e confronta solo i termini che ne
+    condividono una, senza scorrere il vocabolario.
+    """
+
+    def __init__(self, terms: Iterable[str] = (), max_distance: int = MAX_DISTANCE,
+                 prefix_length: int = PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        # termine -> frequenza (a parità di distanza vince il più frequente)
+        self.terms: Dict[str, int] = {}
+        # cancellazione -> termine, o lista di termini se più d'uno
+        self.deletes: Dict[str, object] = {}
+        for term in terms:
+            self.add(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return term in self.terms
+
+    def add(self, term: str, count: int = 1):
+        if term in self.terms:
+            self.terms[term] += count
+            return
+        self.terms[term] = count
+        deletes = self.deletes
+        for key in self._deletes(term[:self.prefix_length], self.max_distance):
+            found = deletes.get(key)
+            if found is None:
+                deletes[key] = term
+            elif found.__class__ is str:
+                deletes[key] = [found, term]
+            else:
+                found.append(term)
+
+    @staticmethod
+    def _deletes(word: str, distance: int):
+        out = {word}
+        level = [word]
+        for _ in range(distance):
+            following = []
+            for w in level:
+                if len(w) <= 1:
+                    continue
+                for i in range(len(w)):
+                    d = w[:i] + w[i + 1:]
+                    if d not in out:
+                        out.add(d)
+                        following.append(d)
+            level = following
+        return out
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Termini entro max_distance da word: [(termine, distanza)] ordinati
+        per distanza, frequenza e ordine alfabetico.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        if max_distance <= 0:
+            return [(word, 0)] if word in self.terms else []
+
+        prefix = word[:self.prefix_length]
+        deletes = self.deletes
+        checked = set()
+        found = []
+        for key in self._deletes(prefix, max_distance):
+            terms = deletes.get(key)
+            if terms is None:
+                continue
+            for term in (terms,) if terms.__class__ is str else terms:
+                if term in checked:
+                    continue
+                checked.add(term)
+                distance = edit_distance(word, term, max_distance)
+                if distance <= max_distance:
+                    found.append((term, distance))
+        terms = self.terms
+        found.sort(key=lambda td: (td[1], -terms[td[0]], td[0]))
+        return found
+
+    def correct(self, word: str, max_distance: Optional[int] = None) -> Optional[str]:
+        """
+        Correzione di word se c'è un solo termine alla distanza minima
+        (entro max_typos(word) errori), altrimenti None.
+        """
+        if word in self.terms:
+            return word
+        limit = max_typos(word) if max_distance is None else max_distance
+        found = self.lookup(word, limit)
+        if not found:
+            return None
+        if len(found) > 1 and found[1][1] == found[0][1]:
+            return None
+        return found[0][0]
+
+    def suggest(self, word: str, limit: int = 3) -> List[str]:
+        """
+        Fino a limit termini vicini a word, con un errore in più di quelli
+        ammessi da correct(): si propongono, non si applicano.
+        """
+        if len(word) < 3:
+            return []
+        return [term for term, _ in self.lookup(word, max_typos(word) + 1)[:limit]]
+
+
+# Vocabolari di WorldSpelling (attributi di WorldAliases)
+SPELLING_KINDS = ("items", "npcs", "rooms")
+
+
+class WorldSpelling:
+    """
+    Vocabolari degli alias di un mondo (parole dei nomi di oggetti, NPC e
+    stanze), indicizzati al primo errore di battitura e condivisi da
+    tutte le sessioni. indexes: indici già costruiti (es. dallo snapshot).
+    """
+
+    def __init__(self, world, indexes: Optional[Dict[str, SpellingIndex]] = None):
+        self._world = world
+        self._indexes: Dict[str, SpellingIndex] = dict(indexes or {})
+
+    def index(self, kind: str) -> SpellingIndex:
+        index = self._indexes.get(kind)
+        if index is None:
+            index = SpellingIndex()
+            for word, count in getattr(world_aliases(self._world), kind).words().items():
+                index.add(word, count)
+            self._indexes[kind] = index
+        return index
+
+    def correct(self, kind: str, phrase: str) -> Optional[str]:
+        """
+        phrase con le parole sconosciute corrette, None se nessuna parola
+        cambia o una non ha una correzione univoca.
+        """
+        index = self.index(kind)
+        words = phrase.split()
+        changed = False
+        for n, word in enumerate(words):
+            if word in index or max_typos(word) == 0:
+                continue
+            fixed = index.correct(word)
+            if fixed is None:
+                return None
+            words[n] = fixed
+            changed = True
+        return " ".join(words) if changed else None
+
+
+def spelling_indexes(world) -> Dict[str, SpellingIndex]:
+    """
+    Tutti gli indici del mondo, da salvare nello snapshot.
+    """
+    spelling = WorldSpelling(world)
+    return {kind: spelling.index(kind) for kind in SPELLING_KINDS}
+
+
+def world_spelling(world) -> WorldSpelling:
+    base = getattr(world, "base", world)
+    return base.cached("spelling", lambda: WorldSpelling(base, base.cached("spelling_indexes", dict)))
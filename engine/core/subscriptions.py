@@ -0,0 +1,157 @@
+# engine/core/subscriptions.py
+
+import heapq
+import bisect
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+# Chiavi dei filtri dichiarativi, nell'ordine in cui vengono usate per
+# l'indice: una sottoscrizione finisce nel bucket della prima chiave che
+# specifica, le altre vengono controllate solo sui candidati
+FILTER_KEYS = ("room", "item", "command", "flag")
+
+Values = Union[str, Iterable[str]]
+
+
+def _values(value: Values) -> FrozenSet[str]:
+    return frozenset([value] if isinstance(value, str) else value)
+
+
+class SubscriptionFilter:
+    """
+    Condizioni di una sottoscrizione (tutte devono valere):
+    - command: action.command fra quelli indicati
+    - room:    state["current_room"] fra quelle indicate
+    - item:    action.target o action.indirect fra gli oggetti indicati
+    - flag:    almeno uno dei flag di stato indicati è vero
+    """
+    __slots__ = FILTER_KEYS
+
+    def __init__(self, command: Optional[Values] = None, room: Optional[Values] = None,
+                 item: Optional[Values] = None, flag: Optional[Values] = None):
+        self.command = _values(command) if command is not None else None
+        self.room = _values(room) if room is not None else None
+        self.item = _values(item) if item is not None else None
+        self.flag = _values(flag) if flag is not None else None
+
+    def primary(self) -> Tuple[str, FrozenSet[str]]:
+        for key in FILTER_KEYS:
+            values = getattr(self, key)
+            if values is not None:
+                return key, values
+        raise ValueError("Filtro vuoto.")
+
+    def matches(self, action, state) -> bool:
+        if self.command is not None and action.command not in self.command:
+            return False
+        if self.room is not None and state.get("current_room") not in self.room:
+            return False
+        if self.item is not None and action.target not in self.item \
+                and getattr(action, "indirect", None) not in self.item:
+            return False
+        if self.flag is not None and not any(state.get(f) for f in self.flag):
+            return False
+        return True
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        return {k: sorted(getattr(self, k)) for k in FILTER_KEYS if getattr(self, k) is not None}
+
+
+# Voce dell'indice: (-priorità, sequenza, callback, filtro o None)
+Entry = Tuple[int, int, object, Optional[SubscriptionFilter]]
+
+
+class SubscriptionIndex:
+    """
+    Sottoscrizioni di un evento indicizzate per stanza, oggetto, comando e
+    flag: select() restituisce, in ordine di priorità, solo i callback i
+    cui filtri valgono per l'azione corrente, senza chiamare gli altri.
+    """
+
+    def __init__(self, entries: Iterable[Entry]):
+        self.always: List[Entry] = []
+        self.buckets: Dict[str, Dict[str, List[Entry]]] = {key: {} for key in FILTER_KEYS}
+        for entry in sorted(entries, key=lambda e: e[:2]):
+            filt = entry[3]
+            if filt is None:
+                self.always.append(entry)
+                continue
+            key, values = filt.primary()
+            for value in values:
+                self.buckets[key].setdefault(value, []).append(entry)
+        self._rooms = self.buckets["room"]
+        self._items = self.buckets["item"]
+        self._commands = self.buckets["command"]
+        self._flags = self.buckets["flag"]
+
+    def map(self, fn) -> "SubscriptionIndex":
+        """
+        Stesso indice con i callback trasformati da fn (es. profilazione).
+        """
+        return SubscriptionIndex((*e[:2], fn(e[2]), e[3]) for e in self.entries())
+
+    def replace(self, entry: Entry):
+        """
+        Sostituisce sul posto la voce con la stessa chiave (priorità, sequenza).
+        """
+        filt = entry[3]
+        if filt is None:
+            targets = [self.always]
+        else:
+            key, values = filt.primary()
+            targets = [self.buckets[key][v] for v in values]
+        for entries in targets:
+            n = bisect.bisect_left(entries, entry[:2])
+            if n < len(entries) and entries[n][:2] == entry[:2]:
+                entries[n] = entry
+
+    def entries(self) -> List[Entry]:
+        seen = {}
+        for entry in self.always:
+            seen[entry[1]] = entry
+        for bucket in self.buckets.values():
+            for entries in bucket.values():
+                for entry in entries:
+                    seen[entry[1]] = entry
+        return sorted(seen.values(), key=lambda e: e[:2])
+
+    def select(self, action, state) -> List[object]:
+        lists = [self.always] if self.always else []
+        if self._rooms:
+            found = self._rooms.get(state.get("current_room"))
+            if found:
+                lists.append(found)
+        if self._items:
+            target, indirect = action.target, getattr(action, "indirect", None)
+            found = self._items.get(target)
+            if found:
+                lists.append(found)
+            if indirect != target:
+                found = self._items.get(indirect)
+                if found:
+                    lists.append(found)
+        if self._commands:
+            found = self._commands.get(action.command)
+            if found:
+                lists.append(found)
+        if self._flags:
+            for flag, found in self._flags.items():
+                if state.get(flag):
+                    lists.append(found)
+
+        if not lists:
+            return []
+        merged = lists[0] if len(lists) == 1 else heapq.merge(*lists, key=_order)
+        out = []
+        last = None
+        for entry in merged:
+            if entry[1] == last:
+                continue
+            last = entry[1]
+            filt = entry[3]
+            if filt is None or filt.matches(action, state):
+                out.append(entry[2])
+        return out
+
+
+def _order(entry: Entry):
+    return entry[0], entry[1]
@@ -0,0 +1,149 @@
+# engine/data/aliases.py
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Articoli e parole vuote (italiano e inglese) ignorati nei nomi
+STOPWORDS = frozenset({
+    "il", "lo", "la", "i", "gli", "le", "un", "uno", "una",
+    "del", "dello", "della", "dei", "degli", "delle",
+    "al", "allo", "alla", "ai", "agli", "alle", "di", "da",
+    "con", "col", "the", "a", "an", "some", "of", "with", "to",
+})
+# Articoli elisi attaccati alla parola: "l'ascia", "un'ancora", "dell'oste"
+_ELISION = re.compile(r"^(?:l|un|dell|all|dall|nell|sull|quell)'")
+_PUNCT = re.compile(r"[^\w'\s]+")
+
+# Limite di chiavi esaminate per una ricerca per prefisso
+MAX_PREFIX_SCAN = 64
+
+
+def normalize(text: str) -> Tuple[str, ...]:
+    """
+    Riduce un nome a token confrontabili: minuscolo, senza punteggiatura,
+    articoli ed elisioni; gli underscore degli id diventano spazi.
+    """
+    text = text.lower().replace("’", "'").replace("_", " ")
+    tokens = []
+    for tok in _PUNCT.sub(" ", text).split():
+        tok = _ELISION.sub("", tok).strip("'")
+        if tok and tok not in STOPWORDS:
+            tokens.append(tok)
+    return tuple(tokens)
+
+
+class AliasIndex:
+    """
+    Indice nome -> id per la risoluzione dei riferimenti digitati dal giocatore.
+
+    - corrispondenza esatta (anche multi-parola) con una lookup in dict
+    - prefissi e abbreviazioni ("lant" -> lanterna, "pietra prez",
+      "pie prez") con ricerche binarie: prima sulle prime parole ordinate,
+      poi sul resto del nome; ogni scansione è limitata a MAX_PREFIX_SCAN chiavi
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, List[str]] = {}
+        self._by_first: Dict[str, List[str]] = {}
+        self._firsts: Optional[List[str]] = None
+
+    def add(self, phrase: str, obj_id: str):
+        tokens = normalize(phrase)
+        if not tokens:
+            return
+        key = " ".join(tokens)
+        ids = self._exact.get(key)
+        if ids is None:
+            ids = self._exact[key] = []
+            self._by_first.setdefault(tokens[0], []).append(" ".join(tokens[1:]))
+            self._firsts = None
+        if obj_id not in ids:
+            ids.append(obj_id)
+
+    def __len__(self):
+        return len(self._exact)
+
+    def words(self) -> Dict[str, int]:
+        """
+        Parole dei nomi indicizzati -> numero di nomi in cui compaiono.
+        """
+        counts: Dict[str, int] = {}
+        for key in self._exact:
+            for word in key.split():
+                counts[word] = counts.get(word, 0) + 1
+        return counts
+
+    def _prepare(self):
+        for rests in self._by_first.values():
+            rests.sort()
+        self._firsts = sorted(self._by_first)
+
+    def resolve(self, phrase: str) -> Tuple[str, ...]:
+        """
+        Restituisce gli id corrispondenti a phrase: esatti se ce ne sono,
+        altrimenti quelli che la completano per prefisso (prima quelli in cui
+        solo la prima parola è abbreviata). Tupla vuota se nessuno.
+        """
+        tokens = normalize(phrase)
+        if not tokens:
+            return ()
+        key = " ".join(tokens)
+        exact = self._exact.get(key)
+        if exact:
+            return tuple(exact)
+
+        if self._firsts is None:
+            self._prepare()
+        first, rest = tokens[0], " ".join(tokens[1:])
+
+        # le parole che iniziano con il primo token sono contigue
+        firsts = self._firsts
+        start = bisect_left(firsts, first)
+        exact_rest, partial = [], []
+        for word in firsts[start:start + MAX_PREFIX_SCAN]:
+            if not word.startswith(first):
+                break
+            rests = self._by_first[word]
+            pos = bisect_left(rests, rest)
+            for tail in rests[pos:pos + MAX_PREFIX_SCAN]:
+                if not tail.startswith(rest):
+                    break
+                target = exact_rest if tail == rest else partial
+                target.extend(self._exact[f"{word} {tail}" if tail else word])
+
+        found = []
+        for obj_id in exact_rest + partial:
+            if obj_id not in found:
+                found.append(obj_id)
+        return tuple(found)
+
+
+class WorldAliases:
+    """
+    Indici degli alias di un mondo: oggetti (id e names), NPC e stanze (id e name).
+    Costruito una volta per mondo con world.cached("aliases", ...).
+    """
+
+    def __init__(self, world):
+        self.items = AliasIndex()
+        for item_id, item in world.items.items():
+            self.items.add(item_id, item_id)
+            for name in item.names:
+                self.items.add(name, item_id)
+
+        self.npcs = AliasIndex()
+        for npc_id, npc in world.npcs.items():
+            self.npcs.add(npc_id, npc_id)
+            self.npcs.add(npc.name, npc_id)
+
+        self.rooms = AliasIndex()
+        for room_id, room in world.rooms.items():
+            self.rooms.add(room_id, room_id)
+            self.rooms.add(room.name, room_id)
+
+
+def world_aliases(world) -> WorldAliases:
+    # l'indice è condiviso: si costruisce sul mondo base, non sull'overlay di una sessione
+    base = getattr(world, "base", world)
+    return base.cached("aliases", lambda: WorldAliases(base))
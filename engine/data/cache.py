@@ -0,0 +1,382 @@
+# engine/data/cache.py
+
+import os
+import copy
+import json
+import mmap
+import pickle
+import struct
+import hashlib
+import weakref
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, List, Optional, Tuple
+
+from engine.data.models import World
+from engine.data.aliases import WorldAliases
+from engine.core.missions import MissionIndex
+from engine.core.routing import RoomGraph
+from engine.core.spelling import spelling_indexes
+
+# Formato dello snapshot:
+#   MAGIC (4 byte) | versione (uint16) | lunghezza header (uint32)
+#   header JSON (sorgenti, mtime, hash)
+#   lunghezza meta (uint64) | meta pickle (World "vuoto" + indice degli offset)
+#   lunghezza directory (uint64) | directory pickle (indice derivato -> posizione)
+#   indici derivati: un pickle per indice (vedi DERIVED)
+#   record: un pickle per ogni stanza, oggetto, NPC e missione
+CACHE_MAGIC = b"TQEW"
+CACHE_VERSION = 11
+CACHE_SUFFIX = ".tqec"
+
+# Tabelle del World salvate come record indicizzati
+TABLES = ("rooms", "items", "npcs", "missions")
+
+# Indici derivati salvati nello snapshot (chiave di World.cached -> costruttore):
+# il mondo lazy li legge da qui invece di scorrere le tabelle
+DERIVED = {
+    "aliases": WorldAliases,
+    "missions": lambda world: MissionIndex(world.missions),
+    "graph": lambda world: RoomGraph(world.rooms),
+    "spelling_indexes": spelling_indexes,
+}
+
+_PREFIX = struct.Struct("<4sHI")
+_META_LEN = struct.Struct("<Q")
+
+
+def cache_path_for(world_path: str) -> str:
+    """
+    Percorso dello snapshot compilato: accanto al world.yaml,
+    con lo stesso nome e suffisso .tqec (es. config/world.tqec).
+    """
+    stem, _ = os.path.splitext(world_path)
+    return stem + CACHE_SUFFIX
+
+
+def source_files(world_path: str) -> List[str]:
+    """
+    File sorgente da cui dipende il mondo: world.yaml ed eventuale items.json.
+    """
+    paths = [world_path]
+    items_file = os.path.join(os.path.dirname(world_path), "items.json")
+    if os.path.isfile(items_file):
+        paths.append(items_file)
+    return paths
+
+
+def _fingerprint(paths: List[str]) -> List[Tuple[str, int, int]]:
+    """
+    Impronta veloce delle sorgenti: (nome, mtime_ns, dimensione).
+    """
+    out = []
+    for p in paths:
+        st = os.stat(p)
+        out.append((os.path.basename(p), st.st_mtime_ns, st.st_size))
+    return out
+
+
+def _content_hash(paths: List[str]) -> str:
+    """
+    Hash SHA-256 del contenuto delle sorgenti, usato quando le mtime cambiano
+    (checkout git, copia dei file) ma il contenuto è rimasto lo stesso.
+    """
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(os.path.basename(p).encode("utf-8"))
+        with open(p, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def write_snapshot(world: World, world_path: str, cache_path: Optional[str] = None) -> str:
+    """
+    Serializza il mondo in uno snapshot binario versionato.
+    Ogni stanza/oggetto/NPC/missione è un record a sé, così lo snapshot
+    può essere letto sia per intero sia in modo lazy (vedi LazyTable).
+    La scrittura è atomica (file temporaneo + rename).
+    Restituisce il percorso dello snapshot.
+    """
+    cache_path = cache_path or cache_path_for(world_path)
+    sources = source_files(world_path)
+    header = json.dumps({
+        "sources": _fingerprint(sources),
+        "sha256": _content_hash(sources),
+    }).encode("utf-8")
+
+    records = []
+    index = {}
+    pos = 0
+    for table in TABLES:
+        ids = []
+        offsets = array("Q")
+        for obj_id, obj in getattr(world, table).items():
+            blob = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+            ids.append(obj_id)
+            offsets.append(pos)
+            records.append(blob)
+            pos += len(blob)
+        offsets.append(pos)
+        index[table] = (ids, offsets)
+
+    shell = copy.copy(world)
+    for table in TABLES:
+        setattr(shell, table, {})
+    meta = pickle.dumps((shell, index), protocol=pickle.HIGHEST_PROTOCOL)
+
+    derived = []
+    entries = {}
+    pos = 0
+    for key, build in DERIVED.items():
+        blob = pickle.dumps(build(world), protocol=pickle.HIGHEST_PROTOCOL)
+        entries[key] = (pos, pos + len(blob))
+        derived.append(blob)
+        pos += len(blob)
+    directory = pickle.dumps((entries, pos), protocol=pickle.HIGHEST_PROTOCOL)
+
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(CACHE_MAGIC, CACHE_VERSION, len(header)))
+        f.write(header)
+        f.write(_META_LEN.pack(len(meta)))
+        f.write(meta)
+        f.write(_META_LEN.pack(len(directory)))
+        f.write(directory)
+        f.writelines(derived)
+        f.writelines(records)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def _read_meta(f, world_path: str):
+    """
+    Legge e valida l'intestazione. Restituisce (shell, index, data_offset,
+    touched, derived) oppure None se lo snapshot manca, è di un'altra
+    versione o è scaduto; derived è (offset, {chiave: (inizio, fine)}).
+    """
+    prefix = f.read(_PREFIX.size)
+    if len(prefix) < _PREFIX.size:
+        return None
+    magic, version, header_len = _PREFIX.unpack(prefix)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        return None
+    try:
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    except ValueError:
+        return None
+
+    sources = source_files(world_path)
+    fingerprint = [list(fp) for fp in _fingerprint(sources)]
+    touched = header.get("sources") != fingerprint
+    if touched and header.get("sha256") != _content_hash(sources):
+        return None
+
+    try:
+        (meta_len,) = _META_LEN.unpack(f.read(_META_LEN.size))
+        shell, index = pickle.loads(f.read(meta_len))
+        derived_offset, entries, data_offset = _read_directory(f)
+    except (struct.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return shell, index, data_offset, touched, (derived_offset, entries)
+
+
+def _read_directory(f):
+    (directory_len,) = _META_LEN.unpack(f.read(_META_LEN.size))
+    entries, size = pickle.loads(f.read(directory_len))
+    derived_offset = f.tell()
+    return derived_offset, entries, derived_offset + size
+
+
+def read_snapshot(world_path: str, cache_path: Optional[str] = None) -> Optional[World]:
+    """
+    Restituisce il World dallo snapshot se è valido per le sorgenti attuali,
+    altrimenti None. Lo snapshot è valido se le mtime coincidono oppure,
+    in mancanza, se coincide l'hash del contenuto.
+    Nota: lo snapshot è un pickle, va usato solo su file generati localmente.
+    """
+    cache_path = cache_path or cache_path_for(world_path)
+    if not os.path.isfile(cache_path):
+        return None
+
+    with open(cache_path, "rb") as f:
+        meta = _read_meta(f, world_path)
+        if meta is None:
+            return None
+        world, index, data_offset, touched, _ = meta
+        f.seek(data_offset)
+        data = f.read()
+
+    try:
+        for table in TABLES:
+            ids, offsets = index[table]
+            target = getattr(world, table)
+            loads = pickle.loads
+            for n, obj_id in enumerate(ids):
+                target[obj_id] = loads(data[offsets[n]:offsets[n + 1]])
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    # Contenuto invariato ma mtime diverse: aggiorno l'header per
+    # tornare al controllo veloce dal prossimo avvio
+    if touched:
+        try:
+            write_snapshot(world, world_path, cache_path)
+        except OSError:
+            pass
+    return world
+
+
+def open_lazy_snapshot(world_path: str, capacity: int = 4096,
+                       cache_path: Optional[str] = None) -> Optional[World]:
+    """
+    Apre lo snapshot in modalità lazy: legge solo l'indice degli offset e
+    restituisce un World le cui tabelle sono LazyTable. Ogni oggetto viene
+    deserializzato al primo accesso e al massimo `capacity` oggetti per
+    tabella restano residenti (LRU). Restituisce None se lo snapshot non è valido.
+    """
+    cache_path = cache_path or cache_path_for(world_path)
+    if not os.path.isfile(cache_path):
+        return None
+
+    with open(cache_path, "rb") as f:
+        meta = _read_meta(f, world_path)
+        if meta is None:
+            return None
+        world, index, data_offset, touched, (derived_offset, entries) = meta
+        if touched:
+            return None
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    for table in TABLES:
+        ids, offsets = index[table]
+        setattr(world, table, LazyTable(cache_path, table, buf, data_offset,
+                                        ids, offsets, capacity))
+    # alias, missioni, grafo e vocabolari dallo snapshot: costruirli
+    # scorrerebbe le tabelle
+    for key, (start, end) in entries.items():
+        world.store(key, _derived_loader(buf, derived_offset + start, derived_offset + end))
+    return world
+
+
+def _derived_loader(buf, start: int, end: int):
+    return lambda: pickle.loads(buf[start:end])
+
+
+class LazyTable(MutableMapping):
+    """
+    Mapping id -> oggetto che materializza i record dello snapshot al primo
+    accesso, con un limite LRU sugli oggetti residenti.
+
+    Un oggetto espulso dall'LRU viene riserializzato: se differisce dal record
+    originale (es. room.items modificato) resta fissato in memoria, così le
+    modifiche non vanno perse. Gli oggetti espulsi ma ancora referenziati
+    altrove vengono ritrovati tramite weakref, per non averne due copie.
+    """
+
+    def __init__(self, path: str, table: str, buf, data_offset: int,
+                 ids: List[str], offsets: array, capacity: int):
+        self._path = path
+        self._table = table
+        self._buf = buf
+        self._base = data_offset
+        self._slots: Dict[str, int] = {obj_id: n for n, obj_id in enumerate(ids)}
+        self._offsets = offsets
+        self.capacity = max(1, capacity)
+        self._resident: "OrderedDict[str, object]" = OrderedDict()
+        self._detached = weakref.WeakValueDictionary()
+        self._pinned: Dict[str, object] = {}
+        self._deleted = set()
+
+    def _record(self, n: int) -> bytes:
+        start = self._base + self._offsets[n]
+        return self._buf[start:self._base + self._offsets[n + 1]]
+
+    def __getitem__(self, key):
+        obj = self._pinned.get(key)
+        if obj is not None:
+            return obj
+        resident = self._resident
+        obj = resident.get(key)
+        if obj is not None:
+            resident.move_to_end(key)
+            return obj
+
+        n = self._slots.get(key)
+        if n is None or key in self._deleted:
+            raise KeyError(key)
+        obj = self._detached.pop(key, None)
+        if obj is None:
+            obj = pickle.loads(self._record(n))
+        resident[key] = obj
+        if len(resident) > self.capacity:
+            self._evict()
+        return obj
+
+    def _evict(self):
+        key, obj = self._resident.popitem(last=False)
+        if pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL) != self._record(self._slots[key]):
+            self._pinned[key] = obj
+            return
+        try:
+            self._detached[key] = obj
+        except TypeError:
+            # oggetto senza supporto weakref: viene semplicemente scartato
+            pass
+
+    def __setitem__(self, key, value):
+        self._resident.pop(key, None)
+        self._detached.pop(key, None)
+        self._deleted.discard(key)
+        self._pinned[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._pinned.pop(key, None)
+        self._resident.pop(key, None)
+        self._detached.pop(key, None)
+        if key in self._slots:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        if key in self._pinned:
+            return True
+        return key in self._slots and key not in self._deleted
+
+    def __iter__(self):
+        for key in self._slots:
+            if key not in self._deleted:
+                yield key
+        for key in self._pinned:
+            if key not in self._slots:
+                yield key
+
+    def __len__(self):
+        extra = sum(1 for key in self._pinned if key not in self._slots)
+        return len(self._slots) - len(self._deleted) + extra
+
+    @property
+    def resident_count(self) -> int:
+        return len(self._resident) + len(self._pinned)
+
+    def __reduce__(self):
+        # copy/deepcopy/pickle: si riapre lo snapshot, portandosi dietro le modifiche
+        return (_reopen_table, (self._path, self._table, self.capacity,
+                                dict(self._pinned), set(self._deleted)))
+
+
+def _reopen_table(path: str, table: str, capacity: int, pinned: dict, deleted: set):
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        _, _, header_len = _PREFIX.unpack(prefix)
+        f.seek(header_len, os.SEEK_CUR)
+        (meta_len,) = _META_LEN.unpack(f.read(_META_LEN.size))
+        _, index = pickle.loads(f.read(meta_len))
+        _, _, data_offset = _read_directory(f)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    ids, offsets = index[table]
+    lazy = LazyTable(path, table, buf, data_offset, ids, offsets, capacity)
+    lazy._pinned.update(pinned)
+    lazy._deleted.update(deleted)
+    return lazy
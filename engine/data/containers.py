@@ -0,0 +1,257 @@
+# engine/data/containers.py
+
+from heapq import heapify, heappop, heappush
+from itertools import islice
+from sys import intern
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+
+class ItemBag:
+    """
+    Multiinsieme ordinato di item_id per inventari e contenuto delle stanze.
+
+    - appartenenza, inserimento e rimozione in O(1) (dict id -> quantità)
+    - ordine di visualizzazione stabile (ordine di primo inserimento)
+    - quantità per gli oggetti impilabili
+
+    Mantiene i metodi di lista usati da dispatcher e plugin (append, remove,
+    count, in, iterazione), così il codice esistente continua a funzionare.
+    L'iterazione restituisce ogni id una sola volta; per le quantità usare
+    count() o items(). `version` cresce a ogni modifica.
+    """
+    __slots__ = ("_counts", "version", "__weakref__")
+
+    def __init__(self, items: Union[Iterable[str], Dict[str, int]] = ()):
+        self._counts: Dict[str, int] = {}
+        self.version = 0
+        if isinstance(items, (dict, ItemBag)):
+            for iid, qty in items.items():
+                if qty > 0:
+                    self._counts[intern(str(iid))] = int(qty)
+        else:
+            for iid in items:
+                iid = intern(str(iid))
+                self._counts[iid] = self._counts.get(iid, 0) + 1
+
+    # --- modifiche -------------------------------------------------------
+
+    def add(self, iid: str, qty: int = 1):
+        if qty <= 0:
+            raise ValueError("La quantità deve essere positiva.")
+        counts = self._counts
+        counts[iid] = counts.get(iid, 0) + qty
+        self.version += 1
+
+    def append(self, iid: str):
+        self.add(iid, 1)
+
+    def remove(self, iid: str, qty: int = 1):
+        """
+        Toglie qty unità di iid; ValueError se non ce ne sono abbastanza
+        (come list.remove).
+        """
+        counts = self._counts
+        have = counts.get(iid, 0)
+        if have < qty or qty <= 0:
+            raise ValueError(f"{iid!r} non presente (quantità {have}, richiesta {qty})")
+        if have == qty:
+            del counts[iid]
+        else:
+            counts[iid] = have - qty
+        self.version += 1
+
+    def discard(self, iid: str) -> int:
+        """
+        Toglie tutte le unità di iid e restituisce quante erano.
+        """
+        qty = self._counts.pop(iid, 0)
+        if qty:
+            self.version += 1
+        return qty
+
+    def clear(self):
+        if self._counts:
+            self._counts.clear()
+            self.version += 1
+
+    # --- letture ---------------------------------------------------------
+
+    def count(self, iid: str) -> int:
+        return self._counts.get(iid, 0)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return iter(self._counts.items())
+
+    def total(self) -> int:
+        return sum(self._counts.values())
+
+    def __contains__(self, iid) -> bool:
+        return iid in self._counts
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __getitem__(self, index: int) -> str:
+        n = len(self._counts)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("indice fuori dall'intervallo")
+        return next(islice(self._counts, index, None))
+
+    def copy(self) -> "ItemBag":
+        bag = ItemBag()
+        bag._counts = dict(self._counts)
+        bag.version = self.version
+        return bag
+
+    def __eq__(self, other):
+        if isinstance(other, ItemBag):
+            return self._counts == other._counts
+        if isinstance(other, (list, tuple)):
+            return self == ItemBag(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        inner = ", ".join(iid if qty == 1 else f"{iid} x{qty}" for iid, qty in self._counts.items())
+        return f"ItemBag([{inner}])"
+
+    def __reduce__(self):
+        return (ItemBag, (self._counts,))
+
+
+class Timer:
+    """
+    Evento programmato: scadenza in minuti di gioco, id univoco nella coda,
+    nome e dati (serializzabili). Passato agli hook on_timer_<nome> al posto
+    dell'azione: command è il nome, così i filtri @when(command=...) valgono.
+    """
+    __slots__ = ("due", "id", "name", "data")
+    target = None
+    indirect = None
+
+    def __init__(self, due: int, timer_id: int, name: str, data: Optional[dict] = None):
+        self.due = due
+        self.id = timer_id
+        self.name = intern(name)
+        self.data = data or {}
+
+    @property
+    def command(self) -> str:
+        return self.name
+
+    def __eq__(self, other):
+        if isinstance(other, Timer):
+            return (self.due, self.id, self.name, self.data) == (other.due, other.id, other.name, other.data)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Timer({self.name!r}, due={self.due}, id={self.id})"
+
+    def __reduce__(self):
+        return (Timer, (self.due, self.id, self.name, self.data))
+
+
+class TimerQueue:
+    """
+    Eventi programmati di una sessione, in un heap ordinato per (scadenza, id):
+    inserimento O(log n), estrazione dei soli eventi scaduti senza scorrere
+    gli altri. cancel() è O(1): l'evento resta nell'heap e viene scartato
+    quando arriva in cima (l'heap si ricompatta se i cancellati sono troppi).
+    `version` cresce a ogni modifica.
+    """
+    __slots__ = ("_heap", "_live", "_next_id", "version", "__weakref__")
+
+    def __init__(self, timers: Iterable[Timer] = ()):
+        self._live: Dict[int, Timer] = {}
+        self._next_id = 1
+        for timer in timers:
+            self._live[timer.id] = timer
+            self._next_id = max(self._next_id, timer.id + 1)
+        self._heap = [(t.due, t.id, t) for t in self._live.values()]
+        heapify(self._heap)
+        self.version = 0
+
+    def push(self, due: int, name: str, data: Optional[dict] = None) -> Timer:
+        timer = Timer(due, self._next_id, name, data)
+        self._next_id += 1
+        self._live[timer.id] = timer
+        heappush(self._heap, (due, timer.id, timer))
+        self.version += 1
+        return timer
+
+    def cancel(self, timer_id: int) -> bool:
+        if self._live.pop(timer_id, None) is None:
+            return False
+        self.version += 1
+        heap = self._heap
+        if len(heap) > 64 and len(heap) > 2 * len(self._live):
+            self._heap = [e for e in heap if e[1] in self._live]
+            heapify(self._heap)
+        return True
+
+    def peek(self) -> Optional[Timer]:
+        """
+        Prossimo evento in scadenza (None se la coda è vuota).
+        """
+        heap, live = self._heap, self._live
+        while heap and heap[0][1] not in live:
+            heappop(heap)
+        return heap[0][2] if heap else None
+
+    def pop_due(self, now: int) -> Optional[Timer]:
+        """
+        Toglie e restituisce il prossimo evento con scadenza <= now, None se
+        non ce ne sono.
+        """
+        timer = self.peek()
+        if timer is None or timer.due > now:
+            return None
+        heappop(self._heap)
+        del self._live[timer.id]
+        self.version += 1
+        return timer
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __iter__(self) -> Iterator[Timer]:
+        # in ordine di scadenza
+        return iter(sorted(self._live.values(), key=lambda t: (t.due, t.id)))
+
+    def __contains__(self, timer_id) -> bool:
+        return timer_id in self._live
+
+    def copy(self) -> "TimerQueue":
+        queue = TimerQueue()
+        queue._live = dict(self._live)
+        queue._heap = list(self._heap)
+        queue._next_id = self._next_id
+        queue.version = self.version
+        return queue
+
+    def __eq__(self, other):
+        if isinstance(other, TimerQueue):
+            return self._live == other._live and self._next_id == other._next_id
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TimerQueue({list(self)!r})"
+
+    def __reduce__(self):
+        return (_timer_queue, (list(self._live.values()), self._next_id))
+
+
+def _timer_queue(timers, next_id) -> TimerQueue:
+    queue = TimerQueue(timers)
+    queue._next_id = max(queue._next_id, next_id)
+    return queue
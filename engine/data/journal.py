@@ -0,0 +1,212 @@
+# engine/data/journal.py
+
+import os
+import time
+import zlib
+import heapq
+import pickle
+import struct
+import itertools
+import threading
+from typing import List, Optional, Tuple
+
+# Formato del journal (<sessione>.tqej):
+#   MAGIC (4 byte) | versione (uint16)
+#   record: tipo (uint8) | lunghezza (uint32) | crc32 (uint32) | pickle
+# ACTION:     (turno, command, target, indirect) scritto PRIMA di eseguire l'azione
+# CHECKPOINT: (slot, turno) lo stato fino a quel turno è nello slot di salvataggio
+JOURNAL_MAGIC = b"TQEJ"
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".tqej"
+
+ACTION, CHECKPOINT = 0, 1
+
+_PREFIX = struct.Struct("<4sH")
+_RECORD = struct.Struct("<BII")
+
+Entry = Tuple[int, str, Optional[str], Optional[str]]
+
+
+class JournalError(Exception):
+    pass
+
+
+def _record(kind: int, payload) -> bytes:
+    blob = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    return _RECORD.pack(kind, len(blob), zlib.crc32(blob)) + blob
+
+
+class _Flusher:
+    """
+    Un solo thread per tutte le fsync differite: un heap di scadenze
+    (scadenza, n, journal), invece di un timer per ogni journal in sospeso.
+    """
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, deadline: float, journal: "Journal"):
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._order), journal))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="journal-flusher", daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is journal:
+                # nuova prima scadenza: il thread ricalcola l'attesa
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                journal = heapq.heappop(self._heap)[2]
+            try:
+                journal.sync()
+            except OSError:
+                # il thread serve anche gli altri journal
+                pass
+
+
+_FLUSHER = _Flusher()
+
+
+class Journal:
+    """
+    Journal append-only delle azioni interpretate di una sessione.
+
+    Ogni azione viene scritta nel file prima di essere eseguita: un crash
+    del processo non perde nulla. Le fsync sono raggruppate: al più una ogni
+    sync_window secondi (0 = a ogni azione, None = mai); le azioni rimaste in
+    sospeso vengono sincronizzate allo scadere della finestra da un thread
+    condiviso da tutti i journal (_Flusher),
+    quindi un crash del sistema perde al massimo le azioni dell'ultima finestra.
+    checkpoint() riparte da un file che contiene solo il marker del
+    salvataggio appena scritto, così il journal resta corto.
+    """
+
+    def __init__(self, path: str, sync_window: Optional[float] = 0.05):
+        self.path = path
+        self.sync_window = sync_window
+        self._last_sync = time.monotonic()
+        self._pending = False
+        self._fd = None
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.isfile(self.path):
+            # un record finale troncato va tolto, o le nuove azioni finirebbero dopo
+            with open(self.path, "rb") as f:
+                end = _scan(f.read())[2]
+            if end < os.path.getsize(self.path):
+                os.truncate(self.path, end)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, _PREFIX.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+
+    def append(self, turn: int, action):
+        self._write(_record(ACTION, (turn, action.command, action.target, action.indirect)))
+
+    def checkpoint(self, slot: str, turn: int):
+        """
+        Registra che lo stato fino a turn è salvato in slot e scarta le
+        azioni precedenti (riscrittura atomica del file).
+        """
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_PREFIX.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+            f.write(_record(CHECKPOINT, (slot, turn)))
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            os.replace(tmp_path, self.path)
+            os.close(self._fd)
+            self._open()
+            self._pending = False
+            self._last_sync = time.monotonic()
+
+    def _write(self, record: bytes):
+        with self._lock:
+            os.write(self._fd, record)
+            self._pending = True
+            if self.sync_window is None:
+                return
+            now = time.monotonic()
+            wait = self._last_sync + self.sync_window - now
+            if wait <= 0:
+                self._fsync(now)
+            elif not self._scheduled:
+                # nessuna azione successiva potrebbe arrivare: fsync differita
+                self._scheduled = True
+                _FLUSHER.schedule(now + wait, self)
+
+    def _fsync(self, now: float):
+        os.fsync(self._fd)
+        self._pending = False
+        self._last_sync = now
+
+    def sync(self):
+        with self._lock:
+            self._scheduled = False
+            if self._pending and self._fd is not None:
+                self._fsync(time.monotonic())
+
+    def close(self, discard: bool = False):
+        """
+        Chiude il journal; discard=True (sessione terminata regolarmente)
+        lo svuota, così il prossimo avvio non ripristina la sessione.
+        """
+        with self._lock:
+            if self._fd is None:
+                return
+            if discard:
+                os.ftruncate(self._fd, _PREFIX.size)
+                self._pending = True
+            if self._pending:
+                self._fsync(time.monotonic())
+            # una scadenza ancora nel flusher trova il journal già chiuso
+            os.close(self._fd)
+            self._fd = None
+
+
+def read_journal(path: str) -> Tuple[Optional[Tuple[str, int]], List[Entry]]:
+    """
+    Legge un journal: ultimo checkpoint (slot, turno) o None e le azioni
+    registrate dopo di esso. Un record finale troncato viene ignorato.
+    """
+    with open(path, "rb") as f:
+        checkpoint, entries, _ = _scan(f.read(), path)
+    return checkpoint, entries
+
+
+def _scan(data: bytes, path: str = ""):
+    if len(data) < _PREFIX.size:
+        return None, [], 0
+    magic, version = _PREFIX.unpack_from(data)
+    if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+        raise JournalError(f"Journal '{path}' in un formato non supportato.")
+
+    checkpoint = None
+    entries: List[Entry] = []
+    pos = _PREFIX.size
+    while pos + _RECORD.size <= len(data):
+        kind, length, crc = _RECORD.unpack_from(data, pos)
+        start = pos + _RECORD.size
+        blob = data[start:start + length]
+        if len(blob) != length or zlib.crc32(blob) != crc:
+            break
+        payload = pickle.loads(blob)
+        if kind == CHECKPOINT:
+            checkpoint, entries = tuple(payload), []
+        else:
+            entries.append(tuple(payload))
+        pos = start + length
+    return checkpoint, entries, pos
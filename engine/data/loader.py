@@ -4,17 +4,61 @@ import os
 import json
 import yaml
 from engine.data.models import World, Room, Item, NPC, Mission
+from engine.data.cache import read_snapshot, write_snapshot, open_lazy_snapshot
 
-def load_world(world_path: str) -> World:
+# Loader C di libyaml se disponibile, altrimenti quello puro Python
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def load_world(world_path: str, use_cache: bool = False, lazy: bool = False,
+               lazy_capacity: int = 4096) -> World:
     """
     Carica il mondo da YAML e JSON:
-    - config (start_room, start_time, initial_missions, intro_text)
+    - config (start_room, start_time, initial_missions, intro_text, grammar, clock)
     - items da items.json
     - rooms, NPC e missions da world.yaml
+    Con use_cache=True riusa lo snapshot compilato (vedi engine.data.cache)
+    se è ancora valido, altrimenti lo rigenera dopo il parsing.
+    Con lazy=True le tabelle del mondo vengono materializzate dallo snapshot
+    al primo accesso, con al più lazy_capacity oggetti residenti per tabella.
+    """
+    if lazy:
+        world = open_lazy_snapshot(world_path, capacity=lazy_capacity)
+        if world is not None:
+            return world
+        # snapshot assente o scaduto: read_snapshot aggiorna l'header se
+        # cambiano solo le mtime, altrimenti si ricompila dalle sorgenti
+        world = read_snapshot(world_path)
+        if world is None:
+            world = parse_world(world_path)
+            try:
+                write_snapshot(world, world_path)
+            except OSError:
+                # cartella in sola lettura: si continua con il mondo completo
+                return world
+        return open_lazy_snapshot(world_path, capacity=lazy_capacity) or world
+
+    if use_cache:
+        world = read_snapshot(world_path)
+        if world is not None:
+            return world
+
+    world = parse_world(world_path)
+
+    if use_cache:
+        try:
+            write_snapshot(world, world_path)
+        except OSError:
+            # cartella in sola lettura: si continua senza cache
+            pass
+    return world
+
+def parse_world(world_path: str) -> World:
+    """
+    Parsing completo delle sorgenti YAML/JSON, senza cache.
     """
     # 1. Leggi il file YAML
     with open(world_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f) or {}
+        data = yaml.load(f, Loader=_YamlLoader) or {}
 
     # 2. Config iniziale: passata al costruttore di World
     config = data.get('config', {}) or {}
@@ -27,11 +71,13 @@ def load_world(world_path: str) -> World:
         with open(items_file, 'r', encoding='utf-8') as f:
             items_data = json.load(f) or {}
         for item_id, item_def in items_data.items():
-            world.items[item_id] = Item.from_dict(item_id, item_def)
+            item = Item.from_dict(item_id, item_def)
+            world.items[item.id] = item
 
     # 4. Carica le stanze
     for room_id, room_def in (data.get('rooms') or {}).items():
-        world.rooms[room_id] = Room.from_dict(room_id, room_def)
+        room = Room.from_dict(room_id, room_def)
+        world.rooms[room.id] = room
 
     # 5. Risolvi le connessioni tra stanze
     for room in world.rooms.values():
@@ -39,10 +85,12 @@ def load_world(world_path: str) -> World:
 
     # 6. Carica NPC (opzionale)
     for npc_id, npc_def in (data.get('npcs') or {}).items():
-        world.npcs[npc_id] = NPC.from_dict(npc_id, npc_def)
+        npc = NPC.from_dict(npc_id, npc_def)
+        world.npcs[npc.id] = npc
 
     # 7. Carica missioni (opzionale)
     for mission_id, mission_def in (data.get('missions') or {}).items():
-        world.missions[mission_id] = Mission.from_dict(mission_id, mission_def)
+        mission = Mission.from_dict(mission_id, mission_def)
+        world.missions[mission.id] = mission
 
     return world
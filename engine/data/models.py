@@ -1,19 +1,124 @@
 # engine/data/models.py
 
-from typing import Dict, List, Any
+from sys import intern
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterable, Optional, Union
+
+from engine.data.containers import ItemBag
+
+
+def _entity_id(value, kind: str, name=None) -> str:
+    """
+    Id internato di un elemento del mondo: i numeri diventano stringhe,
+    un id nullo o non scalare è un errore nella definizione del mondo.
+    """
+    if isinstance(value, str) and value:
+        return intern(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return intern(str(value))
+    entry = f"{kind} {name!r}" if name else kind
+    raise ValueError(f"{entry}: id non valido {value!r}.")
+
+
+class Exits(tuple):
+    """
+    Tabella delle uscite compatta: una tupla piatta
+    (direzione1, stanza1, direzione2, stanza2, ...) con interfaccia da Mapping
+    di sola lettura. Direzioni e id stanza sono internati, così ogni stringa
+    è condivisa fra tutte le stanze del mondo.
+    Per modificare le uscite usare Room.set_exit() / Room.remove_exit().
+    """
+    __slots__ = ()
+
+    def __new__(cls, connections: Dict[str, str] = None):
+        flat = []
+        for direction, target in (connections or {}).items():
+            flat.append(intern(str(direction)))
+            flat.append(intern(str(target)))
+        return tuple.__new__(cls, flat)
+
+    @classmethod
+    def _from_flat(cls, flat: Iterable[str]) -> "Exits":
+        return tuple.__new__(cls, [intern(s) for s in flat])
+
+    def __reduce__(self):
+        return (Exits._from_flat, (tuple.__getitem__(self, slice(None)),))
+
+    def keys(self):
+        return tuple.__getitem__(self, slice(0, None, 2))
+
+    def values(self):
+        return tuple.__getitem__(self, slice(1, None, 2))
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return tuple.__len__(self) // 2
+
+    def __contains__(self, direction):
+        return direction in self.keys()
+
+    def __getitem__(self, direction):
+        try:
+            pos = self.keys().index(direction)
+        except ValueError:
+            raise KeyError(direction) from None
+        return tuple.__getitem__(self, 2 * pos + 1)
+
+    def get(self, direction, default=None):
+        try:
+            return self[direction]
+        except KeyError:
+            return default
+
+    # uguale a qualsiasi Mapping con le stesse uscite (come dict):
+    # quindi, come dict, non è hashable
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Exits({dict(self.items())!r})"
+
+
+Mapping.register(Exits)
 
 
 class Room:
     """
     Rappresenta una stanza del mondo.
+    Classe con __slots__: niente __dict__ per istanza, id e direzioni internati.
+    L'output di describe() è memorizzato (vedi cached_render).
     """
+    __slots__ = ("id", "name", "desc", "connections", "items", "_render", "__weakref__")
+
     def __init__(self, room_id: str, name: str, desc: str,
-                 connections: Dict[str, str], items: List[str]):
-        self.id = room_id
+                 connections: Dict[str, str], items: Union[List[str], Dict[str, int]]):
+        self.id = _entity_id(room_id, "Stanza", name)
         self.name = name
         self.desc = desc
-        self.connections = connections  # es. {"nord": "altra_stanza"}
-        self.items = items[:]  # lista di item_id presenti in stanza
+        self.connections = Exits(connections)  # es. {"nord": "altra_stanza"}
+        self.items = ItemBag(items)  # item_id presenti in stanza, con quantità
+        self._render = None
+
+    def __getstate__(self):
+        return (self.id, self.name, self.desc, self.connections, self.items)
+
+    def __setstate__(self, state):
+        self.id, self.name, self.desc, self.connections, self.items = state
+        self.id = intern(self.id)
+        self._render = None
 
     @classmethod
     def from_dict(cls, room_id: str, data: Dict[str, Any]):
@@ -25,16 +130,37 @@ class Room:
             items=data.get("items", []) or []
         )
 
-    def resolve_connections(self, rooms: Dict[str, "Room"]):
+    def resolve_connections(self, rooms: Dict[str, "Room"]) -> List[str]:
+        """
+        Validazione dei riferimenti: restituisce le direzioni che portano
+        a stanze inesistenti (vedi engine.data.validate / 'tqe check').
+        """
+        return [d for d, target in self.connections.items() if target not in rooms]
+
+    def set_exit(self, direction: str, target: str):
         """
-        Validazione / eventuali riferimenti incrociati.
+        Aggiunge o sostituisce un'uscita (la tabella è immutabile: viene ricreata).
         """
-        # (al bisogno si può controllare che ogni target esista in rooms)
-        pass
+        conns = dict(self.connections.items())
+        conns[direction] = target
+        self.connections = Exits(conns)
+
+    def remove_exit(self, direction: str):
+        conns = dict(self.connections.items())
+        conns.pop(direction, None)
+        self.connections = Exits(conns)
 
     def describe(self, state: Dict[str, Any], world: "World") -> str:
         """
         Restituisce la descrizione della stanza, oggetti visibili e uscite.
+        L'output resta in cache finché non cambiano oggetti, uscite, flag
+        del mondo o finché un plugin non chiama world.invalidate_descriptions().
+        """
+        return cached_render(self, self, self.items, state, world)
+
+    def render(self, state: Dict[str, Any], world: "World") -> str:
+        """
+        Costruisce la descrizione senza cache.
         I plugin possono modificare world o state per far comparire/nascondere cose.
         """
         lines = [f"== {self.name} =="]
@@ -45,7 +171,9 @@ class Room:
             visible = []
             for iid in self.items:
                 if iid in world.items:
-                    visible.append(world.items[iid].names[0])
+                    qty = self.items.count(iid)
+                    name = world.items[iid].names[0]
+                    visible.append(name if qty == 1 else f"{name} (x{qty})")
             if visible:
                 lines.append("\nOggetti visibili: " + ", ".join(visible))
 
@@ -57,17 +185,49 @@ class Room:
         return "\n".join(lines)
 
 
+def cached_render(holder, room, bag: ItemBag, state, world) -> str:
+    """
+    Memoizzazione di Room.render(): holder._render conserva
+    (ItemBag, uscite, chiave, testo). La chiave combina la versione
+    dell'ItemBag, l'epoca di invalidazione della stanza e la versione dei
+    flag del mondo; ItemBag e uscite sono confrontati per identità.
+    """
+    render_epoch = getattr(world, "render_epoch", None)
+    key = (bag.version,
+           render_epoch(room.id) if render_epoch else None,
+           getattr(getattr(world, "flags", None), "version", 0))
+    connections = room.connections
+    cached = holder._render
+    if cached is not None and cached[0] is bag and cached[1] is connections and cached[2] == key:
+        return cached[3]
+    text = room.render(state, world)
+    holder._render = (bag, connections, key, text)
+    return text
+
+
 class Item:
     """
     Definizione di un oggetto raccoltabile/usabile.
+    Gli oggetti impilabili (stackable) si raccolgono e si lasciano
+    in blocco, con la loro quantità.
     """
+    __slots__ = ("id", "names", "description", "weight", "usable_on", "stackable", "__weakref__")
+
     def __init__(self, item_id: str, names: List[str], description: str,
-                 weight: float, usable_on: List[str]):
-        self.id = item_id
-        self.names = names
+                 weight: float, usable_on: List[str], stackable: bool = False):
+        self.id = _entity_id(item_id, "Oggetto", names[0] if names else None)
+        self.names = tuple(names)
         self.description = description
         self.weight = weight
-        self.usable_on = usable_on or []
+        self.usable_on = tuple(intern(str(t)) for t in usable_on or ())
+        self.stackable = stackable
+
+    def __getstate__(self):
+        return (self.id, self.names, self.description, self.weight, self.usable_on, self.stackable)
+
+    def __setstate__(self, state):
+        self.id, self.names, self.description, self.weight, self.usable_on, self.stackable = state
+        self.id = intern(self.id)
 
     @classmethod
     def from_dict(cls, item_id: str, data: Dict[str, Any]):
@@ -76,7 +236,8 @@ class Item:
             names=data.get("names", []),
             description=data.get("description", ""),
             weight=data.get("weight", 0.0),
-            usable_on=data.get("usable_on", []) or []
+            usable_on=data.get("usable_on", []) or [],
+            stackable=bool(data.get("stackable", False))
         )
 
 
@@ -84,12 +245,22 @@ class NPC:
     """
     NPC con dialoghi a scelta multipla.
     """
+    __slots__ = ("id", "name", "location", "dialogues", "__weakref__")
+
     def __init__(self, npc_id: str, name: str, location: str, dialogues: List[Dict]):
-        self.id = npc_id
+        self.id = _entity_id(npc_id, "NPC", name)
         self.name = name
-        self.location = location
+        self.location = intern("" if location is None else str(location))
         self.dialogues = dialogues
 
+    def __getstate__(self):
+        return (self.id, self.name, self.location, self.dialogues)
+
+    def __setstate__(self, state):
+        self.id, self.name, self.location, self.dialogues = state
+        self.id = intern(self.id)
+        self.location = intern(self.location)
+
     @classmethod
     def from_dict(cls, npc_id: str, data: Dict[str, Any]):
         return cls(
@@ -104,16 +275,25 @@ class Mission:
     """
     Rappresenta una missione con requisiti e ricompense.
     """
+    __slots__ = ("id", "title", "description", "requirements", "steps", "rewards", "__weakref__")
+
     def __init__(self, mission_id: str, title: str, description: str,
                  requirements: Dict[str, List[str]], steps: List[str],
                  rewards: Dict[str, Any]):
-        self.id = mission_id
+        self.id = _entity_id(mission_id, "Missione", title)
         self.title = title
         self.description = description
         self.requirements = requirements or {}
-        self.steps = steps or []
+        self.steps = tuple(steps or ())
         self.rewards = rewards or {}
 
+    def __getstate__(self):
+        return (self.id, self.title, self.description, self.requirements, self.steps, self.rewards)
+
+    def __setstate__(self, state):
+        self.id, self.title, self.description, self.requirements, self.steps, self.rewards = state
+        self.id = intern(self.id)
+
     @classmethod
     def from_dict(cls, mission_id: str, data: Dict[str, Any]):
         return cls(
@@ -129,14 +309,15 @@ class Mission:
 class World:
     """
     Contiene stanze, oggetti, NPC, missioni e la configurazione di base.
-    I valori start_room_id, start_time e initial_missions
+    I valori start_room_id, start_time, initial_missions, grammar e clock
     sono letti dal dict config passato al costruttore.
     """
 
     def __init__(self, config: Dict[str, Any] = None):
         cfg = config or {}
         # Defaults se non presenti
-        self._start_room_id: str = cfg.get("start_room", "")
+        start_room = cfg.get("start_room")
+        self._start_room_id: str = "" if start_room is None else str(start_room)
         self._start_time: int = cfg.get("start_time", 0)
         self.initial_missions: List[str] = cfg.get("initial_missions", []) or []
 
@@ -145,9 +326,77 @@ class World:
         self.npcs: Dict[str, NPC] = {}
         self.missions: Dict[str, Mission] = {}
 
+        # Flag globali del mondo (porte aperte, eventi avvenuti, ...)
+        self.flags: Dict[str, Any] = dict(cfg.get("flags", {}) or {})
+
         # intro_text può servire al Game
         self.intro_text: str = cfg.get("intro_text", "")
 
+        # Regole aggiuntive del parser: verbi, preposizioni, schemi (vedi Grammar.update)
+        self.grammar: Dict[str, Any] = dict(cfg.get("grammar", {}) or {})
+
+        # Tempo di gioco: costi dei comandi ed eventi programmati (vedi engine.core.clock)
+        self.clock: Dict[str, Any] = dict(cfg.get("clock", {}) or {})
+
+        # Destinazioni degli NPC in cammino (vedi engine.core.clock.send_npc)
+        self.npc_targets: Dict[str, str] = {}
+
+        # Indici derivati (missioni, alias, grafo, ...) costruiti una volta per mondo
+        self._derived: Dict[str, Any] = {}
+        # Indici derivati già pronti altrove (snapshot): chiave -> loader
+        self._stored: Dict[str, Any] = {}
+
+        # Epoche di invalidazione delle descrizioni in cache (globale e per stanza)
+        self._render_epoch = 0
+        self._render_epochs: Dict[str, int] = {}
+
+    def __getstate__(self):
+        # gli indici derivati non vengono serializzati: si ricostruiscono al bisogno
+        state = self.__dict__.copy()
+        state["_derived"] = {}
+        state["_stored"] = {}
+        return state
+
+    def cached(self, key: str, factory):
+        """
+        Restituisce l'indice derivato `key`, costruendolo con factory() al primo
+        uso (o leggendolo con il loader registrato da store()). Gli indici
+        sono condivisi da tutte le sessioni sullo stesso mondo.
+        """
+        value = self._derived.get(key)
+        if value is None:
+            loader = self._stored.pop(key, None)
+            value = loader() if loader is not None else factory()
+            self._derived[key] = value
+        return value
+
+    def npc_location(self, npc_id: str) -> str:
+        return self.npcs[npc_id].location
+
+    def move_npc(self, npc_id: str, room_id: str):
+        self.npcs[npc_id].location = room_id
+
+    def store(self, key: str, loader):
+        """
+        Registra un indice derivato precalcolato (es. nello snapshot): al
+        primo cached(key) si usa loader() al posto della factory.
+        """
+        self._stored[key] = loader
+
+    def render_epoch(self, room_id: str) -> int:
+        return self._render_epoch + self._render_epochs.get(room_id, 0)
+
+    def invalidate_descriptions(self, room_id: Optional[str] = None):
+        """
+        Hook per i plugin: da chiamare quando cambia qualcosa che describe()
+        mostra ma che la cache non vede (es. testo generato da uno stato esterno).
+        Senza room_id invalida tutte le stanze, per tutte le sessioni.
+        """
+        if room_id is None:
+            self._render_epoch += 1
+        else:
+            self._render_epochs[room_id] = self._render_epochs.get(room_id, 0) + 1
+
     @property
     def start_room_id(self) -> str:
         return self._start_room_id
@@ -0,0 +1,290 @@
+# engine/data/overlay.py
+
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict
+
+from engine.data.containers import ItemBag
+from engine.data.models import World, Room, Item, Exits, cached_render
+
+
+class WorldOverlay:
+    """
+    Vista per sessione su un World condiviso e immutabile.
+
+    Le letture ricadono sul mondo base; le scritture (oggetti nelle stanze,
+    uscite, oggetti generati, flag, posizioni e destinazioni degli NPC) finiscono in un piccolo delta della
+    sessione. Creare un overlay è O(1), indipendente dalla dimensione del mondo.
+
+    Espone la stessa interfaccia di World: world.rooms[...], world.items[...],
+    world.npcs, world.missions, start_room_id, ecc.
+    """
+
+    def __init__(self, base: World):
+        self.base = base
+        # Delta della sessione
+        self.room_items: Dict[str, ItemBag] = {}
+        self.room_exits: Dict[str, Exits] = {}
+        self.spawned_items: Dict[str, Item] = {}
+        self.flag_delta: Dict[str, Any] = {}
+        self.npc_locations: Dict[str, str] = {}
+        self.npc_targets: Dict[str, str] = {}
+
+        self.rooms = OverlayRooms(self)
+        self.items = OverlayMapping(self.spawned_items, base.items)
+        self.flags = OverlayMapping(self.flag_delta, getattr(base, "flags", {}))
+
+    def __getattr__(self, name):
+        # npcs, missions, start_room_id, intro_text, ... dal mondo base
+        return getattr(self.base, name)
+
+    def npc_location(self, npc_id: str) -> str:
+        location = self.npc_locations.get(npc_id)
+        return self.base.npcs[npc_id].location if location is None else location
+
+    def move_npc(self, npc_id: str, room_id: str):
+        self.npc_locations[npc_id] = room_id
+
+    def delta(self) -> Dict[str, Any]:
+        """
+        Modifiche della sessione rispetto al mondo base, come dati semplici.
+        """
+        return {
+            "room_items": {rid: dict(items.items()) for rid, items in self.room_items.items()},
+            "room_exits": {rid: dict(ex.items()) for rid, ex in self.room_exits.items()},
+            "spawned_items": dict(self.spawned_items),
+            "flags": dict(self.flag_delta),
+            "npc_locations": dict(self.npc_locations),
+            "npc_targets": dict(self.npc_targets),
+        }
+
+    def restore(self, delta: Dict[str, Any]):
+        """
+        Sostituisce il delta corrente con uno prodotto da delta().
+        """
+        self.room_items.clear()
+        self.room_items.update({rid: ItemBag(items) for rid, items in delta.get("room_items", {}).items()})
+        self.room_exits.clear()
+        self.room_exits.update({rid: Exits(ex) for rid, ex in delta.get("room_exits", {}).items()})
+        self.spawned_items.clear()
+        self.spawned_items.update(delta.get("spawned_items", {}))
+        self.flag_delta.clear()
+        self.flag_delta.update(delta.get("flags", {}))
+        self.npc_locations.clear()
+        self.npc_locations.update(delta.get("npc_locations", {}))
+        self.npc_targets.clear()
+        self.npc_targets.update(delta.get("npc_targets", {}))
+        self.rooms.clear_views()
+
+
+class OverlayMapping(MutableMapping):
+    """
+    Mapping a due livelli: le scritture vanno nel delta, le letture ricadono
+    sul mapping base. A differenza di ChainMap, len() non scorre il base.
+    """
+
+    def __init__(self, delta: dict, base: Mapping):
+        self.delta = delta
+        self.base = base
+        # cresce a ogni scrittura (usata dalla cache delle descrizioni)
+        self.version = 0
+
+    def __getitem__(self, key):
+        try:
+            return self.delta[key]
+        except KeyError:
+            return self.base[key]
+
+    def __setitem__(self, key, value):
+        self.delta[key] = value
+        self.version += 1
+
+    def __delitem__(self, key):
+        # le chiavi del mondo base sono di sola lettura
+        del self.delta[key]
+        self.version += 1
+
+    def __contains__(self, key):
+        return key in self.delta or key in self.base
+
+    def __iter__(self):
+        yield from self.base
+        for key in self.delta:
+            if key not in self.base:
+                yield key
+
+    def __len__(self):
+        return len(self.base) + sum(1 for key in self.delta if key not in self.base)
+
+
+class OverlayRooms(Mapping):
+    """
+    world.rooms di una sessione: restituisce RoomView sulle stanze base.
+    Le viste vengono create solo per le stanze effettivamente visitate.
+    """
+
+    def __init__(self, overlay: WorldOverlay):
+        self._overlay = overlay
+        self._base = overlay.base.rooms
+        self._views: Dict[str, RoomView] = {}
+
+    def __getitem__(self, room_id):
+        view = self._views.get(room_id)
+        if view is None:
+            view = RoomView(self._base[room_id], self._overlay)
+            self._views[room_id] = view
+        return view
+
+    def __contains__(self, room_id):
+        return room_id in self._base
+
+    def __iter__(self):
+        return iter(self._base)
+
+    def __len__(self):
+        return len(self._base)
+
+    def clear_views(self):
+        self._views.clear()
+
+
+class RoomView:
+    """
+    Stanza vista da una sessione: attributi statici dal Room base,
+    items e connections dal delta della sessione se modificati.
+    """
+    __slots__ = ("_room", "_overlay", "_items", "_render")
+
+    def __init__(self, room: Room, overlay: WorldOverlay):
+        self._room = room
+        self._overlay = overlay
+        self._items = None
+        self._render = None
+
+    @property
+    def id(self):
+        return self._room.id
+
+    @property
+    def name(self):
+        return self._room.name
+
+    @property
+    def desc(self):
+        return self._room.desc
+
+    @property
+    def connections(self):
+        exits = self._overlay.room_exits.get(self._room.id)
+        return self._room.connections if exits is None else exits
+
+    @property
+    def items(self) -> "RoomItems":
+        if self._items is None:
+            self._items = RoomItems(self._overlay, self._room)
+        return self._items
+
+    @items.setter
+    def items(self, value):
+        self._overlay.room_items[self._room.id] = ItemBag(value)
+
+    def set_exit(self, direction: str, target: str):
+        conns = dict(self.connections.items())
+        conns[direction] = target
+        self._overlay.room_exits[self._room.id] = Exits(conns)
+
+    def remove_exit(self, direction: str):
+        conns = dict(self.connections.items())
+        conns.pop(direction, None)
+        self._overlay.room_exits[self._room.id] = Exits(conns)
+
+    def describe(self, state, world) -> str:
+        overlay = self._overlay
+        rid = self._room.id
+        if rid not in overlay.room_items and rid not in overlay.room_exits and not overlay.flags.version:
+            # stanza non toccata dalla sessione: cache condivisa sul Room base
+            return self._room.describe(state, world)
+        return cached_render(self, self, self.items._current(), state, world)
+
+    def render(self, state, world) -> str:
+        return Room.render(self, state, world)
+
+
+class RoomItems:
+    """
+    Contenuto copy-on-write di una stanza: legge l'ItemBag del mondo base
+    finché la sessione non lo modifica, poi lavora su una copia nel delta.
+    Espone la stessa interfaccia di ItemBag.
+    """
+    __slots__ = ("_overlay", "_room")
+
+    def __init__(self, overlay: WorldOverlay, room: Room):
+        self._overlay = overlay
+        self._room = room
+
+    def _current(self) -> ItemBag:
+        items = self._overlay.room_items.get(self._room.id)
+        return self._room.items if items is None else items
+
+    def _writable(self) -> ItemBag:
+        items = self._overlay.room_items.get(self._room.id)
+        if items is None:
+            items = self._room.items.copy()
+            self._overlay.room_items[self._room.id] = items
+        return items
+
+    # letture
+    @property
+    def version(self) -> int:
+        return self._current().version
+
+    def count(self, iid: str) -> int:
+        return self._current().count(iid)
+
+    def items(self):
+        return self._current().items()
+
+    def total(self) -> int:
+        return self._current().total()
+
+    def __getitem__(self, index):
+        return self._current()[index]
+
+    def __len__(self):
+        return len(self._current())
+
+    def __contains__(self, iid):
+        return iid in self._current()
+
+    def __iter__(self):
+        return iter(self._current())
+
+    def __eq__(self, other):
+        if isinstance(other, RoomItems):
+            other = other._current()
+        return self._current() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._current())
+
+    # scritture
+    def add(self, iid: str, qty: int = 1):
+        self._writable().add(iid, qty)
+
+    def append(self, iid: str):
+        self._writable().add(iid, 1)
+
+    def remove(self, iid: str, qty: int = 1):
+        if self.count(iid) < qty:
+            raise ValueError(f"{iid!r} non presente")
+        self._writable().remove(iid, qty)
+
+    def discard(self, iid: str) -> int:
+        if iid not in self._current():
+            return 0
+        return self._writable().discard(iid)
+
+    def clear(self):
+        if len(self._current()):
+            self._writable().clear()
@@ -0,0 +1,290 @@
+# engine/data/saves.py
+
+import os
+import re
+import zlib
+import pickle
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+from engine.data.containers import ItemBag, TimerQueue
+from engine.data.state import GameState
+
+# Formato di uno slot di salvataggio (<slot>.tqes):
+#   MAGIC (4 byte) | versione (uint16)
+#   record: tipo (uint8) | lunghezza (uint32) | crc32 (uint32) | pickle compresso zlib
+# Il primo record è uno snapshot completo, i successivi sono delta rispetto
+# all'immagine precedente. Un record finale troncato o corrotto (es. crash
+# durante un autosalvataggio) viene ignorato: vale l'ultimo stato integro.
+SAVE_MAGIC = b"TQES"
+SAVE_VERSION = 1
+SAVE_SUFFIX = ".tqes"
+
+FULL, DELTA = 0, 1
+
+# Sezioni dell'immagine salvata: stato della sessione + delta dell'overlay
+# + metadati della sessione (es. numero di turni, per il journal)
+SECTIONS = ("state", "room_items", "room_exits", "spawned_items", "flags",
+            "npc_locations", "npc_targets", "meta")
+
+_PREFIX = struct.Struct("<4sH")
+_RECORD = struct.Struct("<BII")
+_SLOT_NAME = re.compile(r"^[\w-]{1,64}$")
+
+Image = Dict[str, Dict[str, Any]]
+
+_MISSING = object()
+
+
+class SaveError(Exception):
+    pass
+
+
+def _copy_value(value):
+    # copie dei contenitori mutabili: l'immagine non deve cambiare con il gioco
+    if isinstance(value, (ItemBag, TimerQueue)):
+        return value.copy()
+    if isinstance(value, (set, dict, list)):
+        return type(value)(value)
+    return value
+
+
+def restore_state(image: Image) -> GameState:
+    """
+    Nuovo stato di gioco a partire da un'immagine (copiato, così
+    l'immagine resta utilizzabile come base per i delta successivi).
+    """
+    return GameState.from_dict(image["state"], clean=True)
+
+
+def overlay_delta(image: Image) -> Dict[str, Any]:
+    """
+    Delta nel formato di WorldOverlay.delta() / restore().
+    """
+    return {
+        "room_items": image["room_items"],
+        "room_exits": image["room_exits"],
+        "spawned_items": image["spawned_items"],
+        "flags": image["flags"],
+        # assenti nei salvataggi precedenti agli spostamenti degli NPC
+        "npc_locations": image.get("npc_locations", {}),
+        "npc_targets": image.get("npc_targets", {}),
+    }
+
+
+def _diff(old: Image, new: Image) -> Dict[str, Tuple[dict, list]]:
+    """
+    Per ogni sezione: chiavi nuove o cambiate, chiavi rimosse.
+    """
+    delta = {}
+    for section in SECTIONS:
+        before, after = old.get(section, {}), new[section]
+        changed = {}
+        for k, v in after.items():
+            old_v = before.get(k, _MISSING)
+            # le copie riusate da capture() sono lo stesso oggetto
+            if old_v is not v and old_v != v:
+                changed[k] = v
+        removed = [k for k in before if k not in after]
+        if changed or removed:
+            delta[section] = (changed, removed)
+    return delta
+
+
+def _apply(image: Image, delta: Dict[str, Tuple[dict, list]]) -> Image:
+    for section, (changed, removed) in delta.items():
+        target = image.setdefault(section, {})
+        for key in removed:
+            target.pop(key, None)
+        target.update(changed)
+    return image
+
+
+class SaveStore:
+    """
+    Slot di salvataggio binari in una directory.
+
+    Il primo salvataggio di uno slot (e ogni compattazione) scrive uno
+    snapshot completo; i successivi appendono solo il delta rispetto
+    all'ultima immagine salvata, così gli autosalvataggi frequenti costano
+    quanto le modifiche del turno. Dopo compact_every delta, o quando i delta
+    superano lo snapshot, lo slot viene riscritto come un solo snapshot.
+    Un delta si appende solo se il file è ancora quello scritto (o letto)
+    per ultimo da questo store: se un'altra sessione l'ha riscritto nel
+    frattempo, si riparte da uno snapshot completo.
+    """
+
+    def __init__(self, directory: str = "saves", compact_every: int = 32):
+        self.directory = directory
+        self.compact_every = compact_every
+        # slot -> (ultima immagine, numero di delta, byte dello snapshot, byte dei delta,
+        #          firma del file dopo l'ultima scrittura o lettura)
+        self._slots: Dict[str, list] = {}
+        # versioni degli ItemBag delle stanze all'ultima cattura
+        self._bag_versions: Dict[str, Dict[str, Tuple[int, int]]] = {}
+
+    def path(self, slot: str) -> str:
+        if not _SLOT_NAME.match(slot or ""):
+            raise SaveError(f"Nome di slot non valido: '{slot}'.")
+        return os.path.join(self.directory, slot + SAVE_SUFFIX)
+
+    def exists(self, slot: str) -> bool:
+        return os.path.isfile(self.path(slot))
+
+    # --- cattura ---------------------------------------------------------
+
+    def capture(self, slot: str, state: Dict[str, Any], world, meta: Optional[dict] = None) -> Image:
+        """
+        Immagine della sessione: copia dello stato e delta dell'overlay.
+        Le stanze il cui ItemBag non è cambiato riusano la copia precedente,
+        come i campi di un GameState non cambiati dall'ultimo snapshot.
+        """
+        previous = self._slots.get(slot)
+        prev_items = previous[0]["room_items"] if previous else {}
+        prev_versions = self._bag_versions.get(slot, {})
+        versions = {}
+
+        room_items = {}
+        for rid, bag in getattr(world, "room_items", {}).items():
+            key = (id(bag), bag.version)
+            versions[rid] = key
+            if prev_versions.get(rid) == key and rid in prev_items:
+                room_items[rid] = prev_items[rid]
+            else:
+                room_items[rid] = bag.copy()
+        self._bag_versions[slot] = versions
+
+        return {
+            "state": state.snapshot() if isinstance(state, GameState)
+                     else {key: _copy_value(value) for key, value in state.items()},
+            "room_items": room_items,
+            "room_exits": dict(getattr(world, "room_exits", {})),
+            "spawned_items": dict(getattr(world, "spawned_items", {})),
+            "flags": dict(getattr(world, "flag_delta", {})),
+            "npc_locations": dict(getattr(world, "npc_locations", {})),
+            "npc_targets": dict(getattr(world, "npc_targets", {})),
+            "meta": dict(meta or {}),
+        }
+
+    # --- scrittura -------------------------------------------------------
+
+    def save(self, slot: str, state: Dict[str, Any], world, meta: Optional[dict] = None) -> int:
+        """
+        Salva la sessione nello slot. Restituisce i byte scritti.
+        """
+        path = self.path(slot)
+        image = self.capture(slot, state, world, meta)
+        info = self._slots.get(slot)
+
+        if info is None or info[1] >= self.compact_every or _signature(path) != info[4]:
+            return self._write_full(slot, path, image)
+
+        delta = _diff(info[0], image)
+        if not delta:
+            return 0
+        record = _encode(DELTA, delta)
+        if info[3] + len(record) > info[2]:
+            # i delta costerebbero più dello snapshot: compattazione
+            return self._write_full(slot, path, image)
+        with open(path, "ab") as f:
+            f.write(record)
+            f.flush()
+            signature = _fsignature(f)
+        self._slots[slot] = [image, info[1] + 1, info[2], info[3] + len(record), signature]
+        return len(record)
+
+    def _write_full(self, slot: str, path: str, image: Image) -> int:
+        os.makedirs(self.directory, exist_ok=True)
+        record = _encode(FULL, image)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_PREFIX.pack(SAVE_MAGIC, SAVE_VERSION))
+            f.write(record)
+            f.flush()
+            signature = _fsignature(f)
+        os.replace(tmp_path, path)
+        self._slots[slot] = [image, 0, len(record), 0, signature]
+        return _PREFIX.size + len(record)
+
+    def compact(self, slot: str):
+        """
+        Riscrive lo slot come un solo snapshot completo.
+        """
+        image = self.load(slot)
+        self._write_full(slot, self.path(slot), image)
+
+    # --- lettura ---------------------------------------------------------
+
+    def load(self, slot: str) -> Image:
+        """
+        Ricostruisce l'immagine dello slot: snapshot + delta in ordine.
+        SaveError se lo slot non esiste o non è leggibile.
+        """
+        path = self.path(slot)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+                signature = _fsignature(f)
+        except FileNotFoundError:
+            raise SaveError(f"Slot '{slot}' inesistente.") from None
+
+        if len(data) < _PREFIX.size:
+            raise SaveError(f"Slot '{slot}' danneggiato.")
+        magic, version = _PREFIX.unpack_from(data)
+        if magic != SAVE_MAGIC or version != SAVE_VERSION:
+            raise SaveError(f"Slot '{slot}' in un formato non supportato.")
+
+        image: Optional[Image] = None
+        deltas = full_size = delta_size = 0
+        pos = _PREFIX.size
+        while pos < len(data):
+            decoded = _decode(data, pos)
+            if decoded is None:
+                break
+            kind, payload, size = decoded
+            if kind == FULL:
+                image, deltas, full_size, delta_size = payload, 0, size, 0
+            elif image is not None:
+                _apply(image, payload)
+                deltas += 1
+                delta_size += size
+            pos += size
+        if image is None:
+            raise SaveError(f"Slot '{slot}' danneggiato.")
+        if pos < len(data):
+            # coda danneggiata: il prossimo salvataggio riscrive lo slot
+            deltas = self.compact_every
+
+        self._slots[slot] = [image, deltas, full_size, delta_size, signature]
+        self._bag_versions.pop(slot, None)
+        return image
+
+
+def _fsignature(f) -> Tuple[int, int, int]:
+    st = os.fstat(f.fileno())
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+    # None se il file non esiste più
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _encode(kind: int, payload) -> bytes:
+    blob = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    return _RECORD.pack(kind, len(blob), zlib.crc32(blob)) + blob
+
+
+def _decode(data: bytes, pos: int):
+    if pos + _RECORD.size > len(data):
+        return None
+    kind, length, crc = _RECORD.unpack_from(data, pos)
+    start = pos + _RECORD.size
+    blob = data[start:start + length]
+    if len(blob) != length or zlib.crc32(blob) != crc:
+        return None
+    return kind, pickle.loads(zlib.decompress(blob)), _RECORD.size + length
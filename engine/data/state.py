@@ -0,0 +1,342 @@
+# engine/data/state.py
+
+from copy import deepcopy
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+
+from engine.data.containers import ItemBag, TimerQueue
+
+# Campi tipizzati dello stato di una sessione; ogni altra chiave (es. i
+# flag dei plugin come "torch_lit") finisce nel dizionario flags
+CORE_FIELDS = ("current_room", "inventory", "missions", "time", "visited", "talked_to",
+               "variables", "timers")
+_CORE = frozenset(CORE_FIELDS)
+
+# Valori immutabili: confrontati per valore, mai copiati
+_SCALARS = (str, int, float, bool, type(None), bytes, frozenset)
+
+_UNTRACKED = object()
+
+
+class TrackedSet(set):
+    """
+    set con un contatore `version` che cresce a ogni modifica (come ItemBag).
+    """
+    __slots__ = ("version",)
+
+    def __init__(self, items: Iterable = ()):
+        super().__init__(items)
+        self.version = 0
+
+    def add(self, value):
+        if value not in self:
+            set.add(self, value)
+            self.version += 1
+
+    def discard(self, value):
+        if value in self:
+            set.discard(self, value)
+            self.version += 1
+
+    def remove(self, value):
+        set.remove(self, value)
+        self.version += 1
+
+    def pop(self):
+        value = set.pop(self)
+        self.version += 1
+        return value
+
+    def clear(self):
+        set.clear(self)
+        self.version += 1
+
+    def update(self, *others):
+        set.update(self, *others)
+        self.version += 1
+
+    def difference_update(self, *others):
+        set.difference_update(self, *others)
+        self.version += 1
+
+    def intersection_update(self, *others):
+        set.intersection_update(self, *others)
+        self.version += 1
+
+    def symmetric_difference_update(self, other):
+        set.symmetric_difference_update(self, other)
+        self.version += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+    def __reduce__(self):
+        return (TrackedSet, (list(self),))
+
+
+class TrackedDict(dict):
+    """
+    dict con un contatore `version` che cresce a ogni modifica.
+    """
+    __slots__ = ("version",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.version += 1
+
+    def pop(self, key, *default):
+        if key in self:
+            self.version += 1
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self.version += 1
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self.version += 1
+
+    def clear(self):
+        dict.clear(self)
+        self.version += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        return (TrackedDict, (dict(self),))
+
+
+def _tracked(value):
+    # contenitori dello stato con un contatore di versione
+    if isinstance(value, (TrackedSet, TrackedDict, ItemBag, TimerQueue)):
+        return value
+    if isinstance(value, (set, frozenset)):
+        return TrackedSet(value)
+    if isinstance(value, dict):
+        return TrackedDict(value)
+    return value
+
+
+def _nested(value) -> bool:
+    # dict o lista con valori mutabili annidati: le loro modifiche non
+    # passano dal contatore di versione del contenitore
+    if isinstance(value, dict):
+        values = value.values()
+    elif isinstance(value, list):
+        values = value
+    else:
+        return False
+    return any(not isinstance(v, _SCALARS) for v in values)
+
+
+def _token(value):
+    """
+    Identità di un valore per il dirty tracking: (tipo, valore) per gli
+    scalari, (oggetto, versione) per i contenitori tracciati, _UNTRACKED
+    per gli altri oggetti mutabili e per i contenitori con valori mutabili
+    annidati (considerati sempre cambiati).
+    """
+    if isinstance(value, _SCALARS):
+        return type(value), value
+    version = getattr(value, "version", None)
+    if version is None or _nested(value):
+        return _UNTRACKED
+    # il riferimento all'oggetto evita che il suo id venga riusato
+    return value, version
+
+
+def _unchanged(token, value) -> bool:
+    if token is _UNTRACKED or token is None:
+        return False
+    if isinstance(value, _SCALARS):
+        return token[0] is type(value) and token[1] == value
+    return token[0] is value and token[1] == getattr(value, "version", None)
+
+
+def _copy(value):
+    # copia per le immagini: tipi standard, indipendenti dal gioco (i valori
+    # mutabili annidati vengono copiati in profondità)
+    if isinstance(value, (ItemBag, TimerQueue)):
+        return value.copy()
+    if isinstance(value, (set, TrackedSet)):
+        return set(value)
+    if isinstance(value, dict):
+        if _nested(value):
+            return {key: deepcopy(v) for key, v in value.items()}
+        return dict(value)
+    if isinstance(value, list):
+        return deepcopy(value) if _nested(value) else list(value)
+    if not isinstance(value, _SCALARS):
+        return deepcopy(value)
+    return value
+
+
+class GameState(MutableMapping):
+    """
+    Stato di una sessione: campi tipizzati (stanza corrente, inventario,
+    missioni, tempo, stanze visitate, NPC incontrati, variabili dei plugin,
+    eventi programmati) più un dizionario flags per le chiavi libere aggiunte dai plugin.
+
+    Resta utilizzabile come il vecchio dizionario: state["inventory"],
+    state.get("torch_lit"), state["variables"][...] continuano a funzionare.
+    I contenitori hanno un contatore di versione, così snapshot() copia
+    solo i campi cambiati dall'ultimo snapshot e riusa gli altri.
+    """
+    __slots__ = CORE_FIELDS + ("flags", "_tokens", "_copies", "__weakref__")
+
+    def __init__(self, current_room: Optional[str] = None, inventory: Iterable[str] = (),
+                 missions: Optional[Dict[str, str]] = None, time: Any = 0,
+                 visited: Iterable[str] = (), talked_to: Iterable[str] = (),
+                 variables: Optional[Dict[str, Any]] = None, flags: Optional[Dict[str, Any]] = None,
+                 timers: Iterable = ()):
+        self.current_room = current_room
+        self.inventory = inventory if isinstance(inventory, ItemBag) else ItemBag(inventory)
+        self.missions = TrackedDict(missions or {})
+        self.time = time
+        self.visited = TrackedSet(visited)
+        self.talked_to = TrackedSet(talked_to)
+        self.variables = TrackedDict(variables or {})
+        self.timers = timers if isinstance(timers, TimerQueue) else TimerQueue(timers)
+        self.flags = TrackedDict(flags or {})
+        # chiave -> token e copia all'ultimo snapshot (None = mai fatto)
+        self._tokens: Optional[Dict[str, Any]] = None
+        self._copies: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, values: Mapping, clean: bool = False) -> "GameState":
+        """
+        Stato costruito da un dizionario piatto (es. image["state"]), copiando
+        i valori. Con clean=True i valori di partenza diventano l'ultimo
+        snapshot: il prossimo salvataggio riporta solo ciò che cambia dopo.
+        """
+        state = cls()
+        for key, value in values.items():
+            state[key] = _copy(value)
+        if clean:
+            state._tokens = {key: _token(state[key]) for key in values}
+            state._copies = dict(values)
+        return state
+
+    # --- accesso come dizionario -----------------------------------------
+
+    def __getitem__(self, key):
+        if key in _CORE:
+            return getattr(self, key)
+        return self.flags[key]
+
+    def __setitem__(self, key, value):
+        if key in _CORE:
+            if key == "inventory" and not isinstance(value, ItemBag):
+                value = ItemBag(value)
+            elif key == "timers" and not isinstance(value, TimerQueue):
+                value = TimerQueue(value)
+            setattr(self, key, _tracked(value))
+        else:
+            self.flags[key] = value
+
+    def __delitem__(self, key):
+        if key in _CORE:
+            raise KeyError(f"Il campo '{key}' dello stato non si può rimuovere.")
+        del self.flags[key]
+
+    def __contains__(self, key):
+        return key in _CORE or key in self.flags
+
+    def __iter__(self) -> Iterator[str]:
+        yield from CORE_FIELDS
+        yield from self.flags
+
+    def __len__(self):
+        return len(CORE_FIELDS) + len(self.flags)
+
+    def get(self, key, default=None):
+        if key in _CORE:
+            return getattr(self, key)
+        return self.flags.get(key, default)
+
+    def setdefault(self, key, default=None):
+        if key in _CORE:
+            return getattr(self, key)
+        return self.flags.setdefault(key, default)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"GameState({dict(self.items())!r})"
+
+    def __getstate__(self):
+        return {key: self[key] for key in self}
+
+    def __setstate__(self, values):
+        self.__init__()
+        for key, value in values.items():
+            self[key] = value
+
+    # --- dirty tracking e snapshot ---------------------------------------
+
+    def dirty(self) -> Set[str]:
+        """
+        Chiavi cambiate (o rimosse) dall'ultimo snapshot(); tutte se non
+        ne è mai stato fatto uno.
+        """
+        tokens = self._tokens
+        if tokens is None:
+            return set(self)
+        changed = {key for key in tokens if key not in self}
+        for key in self:
+            if not _unchanged(tokens.get(key), self[key]):
+                changed.add(key)
+        return changed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Dizionario piatto con copie dei valori, nel formato di image["state"].
+        I campi non cambiati dall'ultimo snapshot riusano la copia precedente
+        (stesso oggetto): le copie non vanno modificate.
+        """
+        old_tokens, old_copies = self._tokens or {}, self._copies or {}
+        tokens, copies = {}, {}
+        for key in self:
+            value = self[key]
+            tokens[key] = _token(value)
+            if _unchanged(old_tokens.get(key), value):
+                copies[key] = old_copies[key]
+            else:
+                copies[key] = _copy(value)
+        self._tokens, self._copies = tokens, copies
+        return dict(copies)
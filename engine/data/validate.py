@@ -0,0 +1,195 @@
+# engine/data/validate.py
+
+import os
+import time
+import multiprocessing
+from typing import Any, Dict, List, Optional
+
+from engine.core.clock import Clock
+from engine.core.missions import REQUIREMENT_KINDS
+from engine.core.dialogue import DialogueGraph
+from engine.core.routing import room_graph
+
+# Oltre questa soglia i controlli per stanza vengono distribuiti su più processi
+PARALLEL_MIN_ROOMS = 50000
+CHUNK_SIZE = 8192
+
+ERROR, WARNING = "error", "warning"
+
+
+class Issue:
+    """
+    Problema trovato nel mondo: gravità, codice stabile (per gli strumenti),
+    tabella e id dell'oggetto coinvolto, messaggio leggibile.
+    """
+    __slots__ = ("severity", "code", "table", "id", "message")
+
+    def __init__(self, severity: str, code: str, table: str, obj_id: str, message: str):
+        self.severity = severity
+        self.code = code
+        self.table = table
+        self.id = obj_id
+        self.message = message
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"severity": self.severity, "code": self.code, "table": self.table,
+                "id": self.id, "message": self.message}
+
+    def __reduce__(self):
+        return (Issue, (self.severity, self.code, self.table, self.id, self.message))
+
+
+def check_rooms(world, room_ids: List[str]) -> List[Issue]:
+    """
+    Controlli locali a ogni stanza: uscite verso stanze inesistenti,
+    oggetti non definiti in items.json.
+    """
+    rooms, items = world.rooms, world.items
+    issues = []
+    for rid in room_ids:
+        room = rooms[rid]
+        for direction in room.resolve_connections(rooms):
+            issues.append(Issue(ERROR, "dangling_exit", "rooms", rid,
+                                f"L'uscita '{direction}' porta alla stanza inesistente "
+                                f"'{room.connections[direction]}'."))
+        for iid in room.items:
+            if iid not in items:
+                issues.append(Issue(ERROR, "unknown_item", "rooms", rid,
+                                    f"L'oggetto '{iid}' non è definito in items.json."))
+    return issues
+
+
+# Mondo condiviso con i processi figli (ereditato con fork, senza pickle)
+_WORLD = None
+
+
+def _check_chunk(room_ids: List[str]) -> List[Issue]:
+    return check_rooms(_WORLD, room_ids)
+
+
+def _parallel_check_rooms(world, jobs: int) -> Optional[List[Issue]]:
+    global _WORLD
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    ids = list(world.rooms)
+    chunks = [ids[i:i + CHUNK_SIZE] for i in range(0, len(ids), CHUNK_SIZE)]
+    _WORLD = world
+    try:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            issues = []
+            for part in pool.imap(_check_chunk, chunks):
+                issues.extend(part)
+            return issues
+    finally:
+        _WORLD = None
+
+
+def check_world(world, jobs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Valida il mondo e restituisce un report serializzabile in JSON:
+    riferimenti pendenti (uscite, oggetti, NPC, missioni), stanze non
+    raggiungibili da start_room, vicoli ciechi e oggetti mai usati.
+    Con jobs > 1 e un mondo grande i controlli per stanza vanno in un pool
+    di processi; il grafo delle stanze è costruito una volta sola.
+    """
+    t0 = time.perf_counter()
+    rooms, items, npcs, missions = world.rooms, world.items, world.npcs, world.missions
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    issues: Optional[List[Issue]] = None
+    if jobs > 1 and len(rooms) >= PARALLEL_MIN_ROOMS:
+        issues = _parallel_check_rooms(world, jobs)
+    if issues is None:
+        issues = check_rooms(world, list(rooms))
+
+    # Configurazione
+    start = world.start_room_id
+    if start not in rooms:
+        issues.append(Issue(ERROR, "missing_start_room", "config", start,
+                            f"La stanza iniziale '{start}' non esiste."))
+    for mid in getattr(world, "initial_missions", []):
+        if mid not in missions:
+            issues.append(Issue(ERROR, "unknown_mission", "config", mid,
+                                f"La missione iniziale '{mid}' non esiste."))
+
+    # Eventi programmati del tempo di gioco
+    try:
+        events = Clock(getattr(world, "clock", None)).events
+    except (ValueError, TypeError, KeyError) as e:
+        events = {}
+        issues.append(Issue(ERROR, "invalid_clock", "config", "clock", f"Configurazione del tempo non valida: {e}"))
+    for name, event in events.items():
+        used = [event.room] + [spec.get("room") for spec in event.set_exits + event.remove_exits]
+        used += [spec.get("to") for spec in event.set_exits + event.send_npcs]
+        for rid in used:
+            if rid is not None and rid not in rooms:
+                issues.append(Issue(ERROR, "unknown_room", "config", name,
+                                    f"L'evento '{name}' usa la stanza inesistente '{rid}'."))
+        for spec in event.send_npcs:
+            if spec.get("npc") not in npcs:
+                issues.append(Issue(ERROR, "unknown_npc", "config", name,
+                                    f"L'evento '{name}' muove l'NPC inesistente '{spec.get('npc')}'."))
+
+    # NPC
+    for nid, npc in npcs.items():
+        if npc.location not in rooms:
+            issues.append(Issue(ERROR, "unknown_room", "npcs", nid,
+                                f"La posizione '{npc.location}' non è una stanza."))
+        for node_id, target in DialogueGraph(npc).dangling:
+            issues.append(Issue(WARNING, "unknown_dialogue_node", "npcs", nid,
+                                f"Il nodo '{node_id}' rimanda al nodo inesistente '{target}'."))
+
+    # Missioni
+    # tipo di requisito -> (elementi ammessi, codice del riferimento mancante)
+    targets = {"have_item": (items, "unknown_item"), "visited_room": (rooms, "unknown_room"),
+               "talked_to": (npcs, "unknown_npc")}
+    required_items = set()
+    for mid, mission in missions.items():
+        for kind, keys in mission.requirements.items():
+            if kind not in REQUIREMENT_KINDS:
+                issues.append(Issue(WARNING, "unknown_requirement", "missions", mid,
+                                    f"Tipo di requisito '{kind}' non supportato."))
+                continue
+            if kind not in targets:
+                continue
+            known, code = targets[kind]
+            for key in [keys] if isinstance(keys, str) else keys or ():
+                if kind == "have_item":
+                    required_items.add(key)
+                if key not in known:
+                    issues.append(Issue(ERROR, code, "missions", mid,
+                                        f"Il requisito {kind} '{key}' non esiste."))
+
+    # Raggiungibilità e vicoli ciechi (grafo costruito una volta)
+    graph = room_graph(world)
+    seen = graph.reachable(start)
+    for n, rid in enumerate(graph.ids):
+        if not seen[n]:
+            issues.append(Issue(WARNING, "unreachable_room", "rooms", rid,
+                                f"La stanza non è raggiungibile da '{start}'."))
+        elif not graph.adjacency[n]:
+            issues.append(Issue(WARNING, "dead_end", "rooms", rid,
+                                "Nessuna uscita valida: il giocatore resta bloccato."))
+
+    # Oggetti mai piazzati in una stanza né richiesti da una missione
+    placed = set()
+    for room in rooms.values():
+        placed.update(room.items)
+    for iid in items:
+        if iid not in placed and iid not in required_items:
+            issues.append(Issue(WARNING, "unused_item", "items", iid,
+                                "Oggetto mai piazzato in una stanza né richiesto da una missione."))
+
+    errors = sum(1 for i in issues if i.severity == ERROR)
+    return {
+        "rooms": len(rooms),
+        "items": len(items),
+        "npcs": len(npcs),
+        "missions": len(missions),
+        "reachable_rooms": sum(seen),
+        "errors": errors,
+        "warnings": len(issues) - errors,
+        "issues": [i.as_dict() for i in issues],
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
@@ -1,32 +1,108 @@
 # engine/plugins/base.py
 
+from engine.plugins.isolation import isolated
+
+
+def event_for(attr: str):
+    """
+    Evento su cui register() sottoscrive il metodo attr (None se nessuno).
+    """
+    if attr.startswith("on_pre_action"):
+        return "pre_action"
+    if attr.startswith("on_post_action"):
+        return "post_action"
+    if attr.startswith("on_command_"):
+        return "command_" + attr[len("on_command_"):]
+    if attr.startswith("on_timer_"):
+        return "timer_" + attr[len("on_timer_"):]
+    return None
+
+
+def when(command=None, room=None, item=None, flag=None, priority=None):
+    """
+    Filtri dichiarativi per un metodo on_* (stringa o insieme di stringhe):
+    il dispatcher lo chiama solo se l'azione riguarda quel comando, quella
+    stanza, quell'oggetto (target o indiretto) e con quel flag di stato vero.
+    priority sostituisce la priorità del plugin per questo solo metodo.
+
+        @when(command="look", room="grotta")
+        def on_pre_action(self, action, state, world): ...
+    """
+    filters = {k: v for k, v in (("command", command), ("room", room),
+                                 ("item", item), ("flag", flag)) if v is not None}
+
+    def decorate(fn):
+        fn.filters = filters
+        fn.hook_priority = priority
+        return fn
+    return decorate
+
+
 class PluginBase:
     """
     Base class per tutti i plugin.
     Il metodo register() viene invocato da Game._load_plugins()
     con il dispatcher, e qui intercettiamo i metodi on_* per
     registrarli sugli eventi e forniamo subscribe() per i plugin.
+    L'attributo di classe priority ordina i plugin sullo stesso evento
+    (valori più alti vengono chiamati prima); con @when un metodo può
+    dichiarare filtri (comando, stanza, oggetto, flag) e una priorità propria,
+    così il dispatcher non lo chiama nei turni che non lo riguardano.
+    I plugin che non ridefiniscono register() sono caricati in modo lazy
+    (vedi engine/plugins/registry.py): il modulo viene importato e la
+    classe istanziata al primo evento gestito.
+    Le descrizioni delle stanze sono in cache: un plugin che cambia ciò che
+    describe() mostra senza toccare oggetti, uscite o flag del mondo deve
+    chiamare world.invalidate_descriptions(room_id).
+    on_timer_<nome>(timer, state, world) scatta quando scade l'evento
+    programmato <nome> (vedi engine.core.clock.schedule()); il testo
+    restituito viene mostrato al giocatore.
+    I plugin con heavy = True (generazione procedurale, NPC costosi, ...)
+    eseguono i metodi on_* in un pool di processi, su copie di azione e
+    stato, con una scadenza di timeout secondi: vedi engine/plugins/isolation.py.
     """
 
+    priority = 0
+    heavy = False
+    timeout = 2.0
+
     def register(self, dispatcher):
         # salvo il dispatcher per subscribe() manuale
         self.dispatcher = dispatcher
 
-        # autogestione: cerco on_pre_action, on_post_action e on_command_xxx
+        # autogestione: cerco on_pre_action, on_post_action, on_command_xxx e on_timer_xxx
         for attr in dir(self):
-            if attr.startswith("on_pre_action"):
-                dispatcher.subscribe("pre_action", getattr(self, attr))
-            elif attr.startswith("on_post_action"):
-                dispatcher.subscribe("post_action", getattr(self, attr))
-            elif attr.startswith("on_command_"):
-                cmd = attr[len("on_command_"):]
-                dispatcher.subscribe(f"command_{cmd}", getattr(self, attr))
-
-    def subscribe(self, event_name: str, callback):
+            event = event_for(attr)
+            if event is not None:
+                method = getattr(self, attr)
+                priority = getattr(method, "hook_priority", None)
+                dispatcher.subscribe(event, self.callback(attr),
+                                     self.priority if priority is None else priority,
+                                     **getattr(method, "filters", {}))
+
+    def callback(self, attr: str):
+        """
+        Callback da sottoscrivere per il metodo attr: il metodo stesso,
+        oppure il proxy verso il pool di processi se il plugin è heavy.
+        """
+        if self.heavy:
+            return isolated(self, attr)
+        return getattr(self, attr)
+
+    def subscribe(self, event_name: str, callback, priority: int = None):
         """
         Metodo helper per plugin: registra callback su event_name.
         Deve essere chiamato *dopo* register().
         """
         if not hasattr(self, "dispatcher"):
             raise RuntimeError("Plugin non registrato: subscribe() può essere usato solo dopo register().")
-        self.dispatcher.subscribe(event_name, callback)
+        self.dispatcher.subscribe(event_name, callback, self.priority if priority is None else priority)
+
+    def register_command(self, name: str, handler, aliases=()):
+        """
+        Metodo helper per plugin: aggiunge un verbo nuovo al dispatcher.
+        Deve essere chiamato *dopo* register().
+        """
+        if not hasattr(self, "dispatcher"):
+            raise RuntimeError("Plugin non registrato: register_command() può essere usato solo dopo register().")
+        self.dispatcher.register_command(name, handler, aliases)
@@ -0,0 +1,258 @@
+# engine/plugins/isolation.py
+
+import os
+import sys
+import pickle
+import logging
+import importlib
+import threading
+import multiprocessing
+from typing import Any, Dict, List, Set
+
+from engine.data.models import Exits
+from engine.data.overlay import WorldOverlay
+from engine.data.containers import ItemBag
+
+log = logging.getLogger(__name__)
+
+# Almeno due worker: un plugin bloccato non ferma anche tutti gli altri
+HEAVY_WORKERS = max(2, os.cpu_count() or 1)
+
+_MISSING = object()
+
+
+# --- lato worker ---------------------------------------------------------
+
+# Mondo base del processo padre (ereditato con fork, o passato una volta
+# all'avvio del worker) e istanze dei plugin, una per classe e per worker
+_BASE = None
+_PLUGINS: Dict[tuple, Any] = {}
+
+
+def _init_worker(base, path):
+    global _BASE
+    _BASE = base
+    for entry in reversed(path):
+        if entry not in sys.path:
+            sys.path.insert(0, entry)
+
+
+def _plugin(module: str, qualname: str):
+    key = (module, qualname)
+    plugin = _PLUGINS.get(key)
+    if plugin is None:
+        cls = importlib.import_module(module)
+        for part in qualname.split("."):
+            cls = getattr(cls, part)
+        plugin = _PLUGINS[key] = cls()
+    return plugin
+
+
+def _run(module: str, qualname: str, method: str, action, state_blob: bytes, delta):
+    """
+    Esegue plugin.method(action, state, world) su copie: restituisce il
+    risultato, le chiavi di stato cambiate/rimosse e il nuovo delta del mondo.
+    """
+    state = pickle.loads(state_blob)
+    before = pickle.loads(state_blob)
+    world = _BASE
+    if delta is not None:
+        world = WorldOverlay(_BASE)
+        world.restore(delta)
+    result = getattr(_plugin(module, qualname), method)(action, state, world)
+    changed = {k: v for k, v in state.items() if before.get(k, _MISSING) != v}
+    removed = [k for k in before if k not in state]
+    return result, changed, removed, world.delta() if delta is not None else None
+
+
+def _serve(conn, base, path):
+    """
+    Ciclo di un worker: una richiesta alla volta finché il pipe resta aperto.
+    """
+    _init_worker(base, path)
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        try:
+            reply = (True, _run(*request))
+        except Exception as exc:
+            reply = (False, exc)
+        try:
+            conn.send(reply)
+        except Exception:
+            # eccezione o risultato non serializzabile
+            conn.send((False, RuntimeError(repr(reply[1]))))
+
+
+# --- lato gioco ----------------------------------------------------------
+
+def merge_delta(world: WorldOverlay, old: Dict[str, dict], new: Dict[str, dict]):
+    """
+    Applica all'overlay le differenze fra due delta (vedi WorldOverlay.delta()).
+    I flag passano da world.flags, così la cache delle descrizioni se ne accorge.
+    """
+    touched = False
+    for section, target, wrap in (("room_items", world.room_items, ItemBag),
+                                  ("room_exits", world.room_exits, Exits)):
+        before, after = old.get(section, {}), new.get(section, {})
+        for rid, value in after.items():
+            if before.get(rid) != value:
+                target[rid] = wrap(value)
+                touched = True
+        for rid in before:
+            if rid not in after:
+                del target[rid]
+                touched = True
+    before, after = old.get("spawned_items", {}), new.get("spawned_items", {})
+    for iid in before.keys() - after.keys():
+        del world.spawned_items[iid]
+    world.spawned_items.update({k: v for k, v in after.items() if before.get(k, _MISSING) != v})
+    before, after = old.get("flags", {}), new.get("flags", {})
+    for key in before.keys() - after.keys():
+        del world.flags[key]
+    for key, value in after.items():
+        if before.get(key, _MISSING) != value:
+            world.flags[key] = value
+    for section, target in (("npc_locations", world.npc_locations), ("npc_targets", world.npc_targets)):
+        before, after = old.get(section, {}), new.get(section, {})
+        for key in before.keys() - after.keys():
+            del target[key]
+        target.update({k: v for k, v in after.items() if before.get(k) != v})
+    if touched:
+        world.rooms.clear_views()
+
+
+class _Worker:
+    """
+    Processo worker con il suo pipe: serve una chiamata alla volta.
+    """
+
+    def __init__(self, context, base):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, base, list(sys.path)), daemon=True)
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+
+class PluginPool:
+    """
+    Pool di processi per i callback dei plugin pesanti (heavy = True).
+
+    Ogni chiamata riceve copie serializzate di azione, stato e delta del
+    mondo della sessione; il worker restituisce l'output e le modifiche,
+    che vengono applicate allo stato e all'overlay della sessione.
+    Una chiamata che supera la scadenza viene abbandonata (nessun output,
+    nessuna modifica) e solo il suo worker viene terminato: le chiamate
+    delle altre sessioni, su altri worker, proseguono.
+    """
+
+    def __init__(self, base, workers: int = HEAVY_WORKERS):
+        self.base = base
+        self.workers = workers
+        self.timeouts = 0
+        # fork: i worker ereditano mondo e plugin già importati senza copiarli
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self._slots = threading.Semaphore(workers)
+        self._idle: List[_Worker] = []
+        self._all: Set[_Worker] = set()
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            worker = _Worker(self._context, self.base)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.add(worker)
+        return worker
+
+    def _release(self, worker: _Worker, alive: bool = True):
+        with self._lock:
+            if alive:
+                self._idle.append(worker)
+            else:
+                self._all.discard(worker)
+        if not alive:
+            worker.kill()
+        self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._all, self._idle = self._all, set(), []
+        for worker in workers:
+            worker.stop()
+
+    def call(self, plugin, method: str, action, state: dict, world):
+        name = f"{type(plugin).__name__}.{method}"
+        delta = world.delta() if isinstance(world, WorldOverlay) else None
+        blob = pickle.dumps(dict(state), protocol=pickle.HIGHEST_PROTOCOL)
+        request = (type(plugin).__module__, type(plugin).__qualname__, method, action, blob, delta)
+        worker = self._acquire()
+        try:
+            worker.conn.send(request)
+            if not worker.conn.poll(getattr(plugin, "timeout", None)):
+                self.timeouts += 1
+                log.warning("Plugin %s oltre la scadenza di %ss: chiamata annullata.", name, plugin.timeout)
+                self._release(worker, alive=False)
+                return None
+            ok, reply = worker.conn.recv()
+        except (EOFError, OSError):
+            log.warning("Plugin %s interrotto (worker riavviato).", name)
+            self._release(worker, alive=False)
+            return None
+        except BaseException:
+            self._release(worker, alive=False)
+            raise
+        self._release(worker)
+        if not ok:
+            raise reply
+        result, changed, removed, new_delta = reply
+
+        for key in removed:
+            state.pop(key, None)
+        state.update(changed)
+        if new_delta is not None:
+            merge_delta(world, delta, new_delta)
+        return result
+
+
+def plugin_pool(world) -> PluginPool:
+    """
+    Pool condiviso dalle sessioni sullo stesso mondo base.
+    """
+    base = getattr(world, "base", world)
+    return base.cached("plugin_pool", lambda: PluginPool(base))
+
+
+def isolated(plugin, method: str):
+    """
+    Callback che esegue plugin.method nel pool di processi.
+    """
+    def callback(action, state, world):
+        return plugin_pool(world).call(plugin, method, action, state, world)
+    callback.__qualname__ = f"{type(plugin).__name__}.{method}"
+    return callback
@@ -0,0 +1,348 @@
+# engine/plugins/registry.py
+
+import os
+import sys
+import ast
+import json
+import builtins
+import importlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from engine.plugins.base import PluginBase, event_for
+
+# Manifest dei plugin: per ogni file di plugins/ (mtime_ns, dimensione) e,
+# per ogni classe plugin, priorità ed eventi gestiti. Sta in
+# plugins/__pycache__/ perché è una cache come i .pyc
+MANIFEST_VERSION = 4
+MANIFEST_NAME = "tqe_plugins.json"
+
+_BASE_MODULE = "engine.plugins.base"
+
+
+def _hook_info(fn: ast.FunctionDef, when_names) -> Optional[dict]:
+    """
+    Filtri e priorità dichiarati con @when su un metodo on_*, {} se non
+    decorato, None se i decoratori non sono valutabili senza import.
+    """
+    if not fn.decorator_list:
+        return {}
+    # il decoratore più esterno è applicato per ultimo e vince
+    dec = fn.decorator_list[0]
+    if not (isinstance(dec, ast.Call) and isinstance(dec.func, ast.Name)
+            and dec.func.id in when_names and not dec.args):
+        return None
+    info = {"filters": {}, "priority": None}
+    for kw in dec.keywords:
+        try:
+            value = ast.literal_eval(kw.value)
+        except ValueError:
+            return None
+        if kw.arg == "priority":
+            if value is not None and not isinstance(value, int):
+                return None
+            info["priority"] = value
+        elif kw.arg in ("command", "room", "item", "flag"):
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set, frozenset)):
+                value = sorted(value)
+            if not (isinstance(value, str) or all(isinstance(v, str) for v in value)):
+                return None
+            info["filters"][kw.arg] = value
+        else:
+            return None
+    return info
+
+
+def analyze_source(source: str) -> Optional[List[dict]]:
+    """
+    Classi plugin di un modulo, ricavate dall'AST senza importarlo:
+    [{"class", "priority", "heavy", "events": [[evento, metodo, filtri, priorità], ...]}].
+    None se il modulo va importato subito (classi che ridefiniscono
+    register(), basi, priorità, heavy o decoratori dei metodi on_* non
+    risolvibili staticamente, errori di sintassi).
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    # nomi con cui il modulo importa PluginBase e when dal motore
+    bases, when_names = set(), set()
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module == _BASE_MODULE:
+            for alias in node.names:
+                if alias.name == "PluginBase":
+                    bases.add(alias.asname or alias.name)
+                elif alias.name == "when":
+                    when_names.add(alias.asname or alias.name)
+
+    # classe -> (priorità, heavy, metodi -> @when) per le classi plugin già viste nel modulo
+    local: Dict[str, Tuple[int, bool, dict]] = {}
+    plugins = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        inherited = []
+        plugin = False
+        unknown = False
+        for base in node.bases:
+            name = base.id if isinstance(base, ast.Name) else None
+            if name in bases:
+                plugin = True
+            elif name in local:
+                plugin = True
+                inherited.append(local[name])
+            elif name is None or not hasattr(builtins, name):
+                # base definita altrove: solo l'import dice se è un plugin
+                unknown = True
+        if unknown:
+            return None
+        if not plugin:
+            continue
+        if node.decorator_list or node.keywords:
+            return None
+
+        priority, heavy = inherited[0][:2] if inherited else (0, False)
+        methods = {}
+        for _, _, parent_methods in inherited:
+            methods.update(parent_methods)
+        for stmt in node.body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if stmt.name == "register":
+                    return None
+                info = _hook_info(stmt, when_names) if event_for(stmt.name) else {}
+                if info is None:
+                    return None
+                methods[stmt.name] = info
+            elif isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+                targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+                for target in targets:
+                    if not isinstance(target, ast.Name):
+                        continue
+                    if target.id in ("priority", "heavy"):
+                        value = stmt.value
+                        if not (isinstance(value, ast.Constant) and isinstance(value.value, int)):
+                            return None
+                        if target.id == "priority":
+                            priority = value.value
+                        else:
+                            heavy = bool(value.value)
+                    elif target.id == "register" or event_for(target.id):
+                        # metodo definito altrove: filtri sconosciuti
+                        return None
+                    else:
+                        methods[target.id] = {}
+        local[node.name] = (priority, heavy, methods)
+        # stesso ordine di PluginBase.register(), che scorre dir() (alfabetico)
+        events = [[event_for(m), m, methods[m].get("filters") or None, methods[m].get("priority")]
+                  for m in sorted(methods) if event_for(m)]
+        plugins.append({"class": node.name, "priority": priority, "heavy": heavy, "events": events})
+    return plugins
+
+
+class PluginSpec:
+    """
+    Classe plugin nota dal manifest: modulo, nome, priorità, heavy ed
+    eventi (evento, metodo, filtri o None, priorità del metodo o None).
+    """
+    __slots__ = ("module", "cls", "priority", "heavy", "events")
+
+    def __init__(self, module: str, cls: str, priority: int, heavy: bool,
+                 events: List[tuple]):
+        self.module = module
+        self.cls = cls
+        self.priority = priority
+        self.heavy = heavy
+        self.events = [tuple(e) for e in events]
+
+
+class LazyPlugin:
+    """
+    Plugin sottoscritto tramite proxy: il modulo viene importato e la classe
+    istanziata la prima volta che uno dei suoi eventi scatta, poi i proxy
+    vengono sostituiti nel dispatcher dai metodi veri.
+    """
+
+    def __init__(self, registry: "PluginRegistry", spec: PluginSpec, dispatcher):
+        self.registry = registry
+        self.spec = spec
+        self.dispatcher = dispatcher
+        self.heavy = spec.heavy
+        self.instance = None
+        # (evento, chiave della sottoscrizione, metodo), riempita da attach()
+        self.subscriptions = []
+
+    def proxy(self, method: str):
+        def proxy(*args, **kwargs):
+            return getattr(self.materialize(), method)(*args, **kwargs)
+        proxy.__qualname__ = f"{self.spec.cls}.{method}"
+        return proxy
+
+    def materialize(self):
+        if self.instance is None:
+            plugin = self.registry.plugin_class(self.spec)()
+            # ciò che farebbe PluginBase.register(), senza ripetere dir()
+            plugin.dispatcher = self.dispatcher
+            for event, key, method in self.subscriptions:
+                self.dispatcher.replace_callback(event, key, plugin.callback(method))
+            self.instance = plugin
+        return self.instance
+
+
+class PluginRegistry:
+    """
+    Plugin della directory <root>/plugins, scoperti una volta per processo.
+
+    I file vengono analizzati con l'AST (niente import) e il risultato è
+    salvato nel manifest, valido finché mtime e dimensione non cambiano.
+    attach() collega i plugin a un dispatcher: quelli descritti dal manifest
+    tramite proxy (LazyPlugin), gli altri importati e registrati subito.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.directory = os.path.join(self.root, "plugins")
+        self.manifest_path = os.path.join(self.directory, "__pycache__", MANIFEST_NAME)
+        # (file, spec) in ordine di nome file; spec None = modulo da importare subito
+        self.specs: List[Tuple[str, Optional[PluginSpec]]] = []
+        self._classes: Dict[Tuple[str, str], type] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    # --- scoperta --------------------------------------------------------
+
+    def refresh(self):
+        """
+        Rilegge plugins/: i file invariati riusano il manifest, quelli
+        nuovi o modificati vengono rianalizzati e il manifest riscritto.
+        """
+        self.specs = []
+        if not os.path.isdir(self.directory):
+            return
+        cached = self._read_manifest()
+        files = {}
+        changed = False
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            name = entry.name
+            if name.startswith("__") or not name.endswith(".py") or not entry.is_file():
+                continue
+            st = entry.stat()
+            info = cached.get(name)
+            if info is None or info.get("mtime_ns") != st.st_mtime_ns or info.get("size") != st.st_size:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    plugins = analyze_source(f.read())
+                info = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "plugins": plugins}
+                changed = True
+            files[name] = info
+
+            module = f"plugins.{name[:-3]}"
+            if info["plugins"] is None:
+                self.specs.append((module, None))
+            else:
+                for p in info["plugins"]:
+                    self.specs.append((module, PluginSpec(module, p["class"], p["priority"], p["heavy"], p["events"])))
+        if changed or set(files) != set(cached):
+            self._write_manifest(files)
+
+    def _read_manifest(self) -> Dict[str, dict]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _write_manifest(self, files: Dict[str, dict]):
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": files}, f)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            # directory in sola lettura: il manifest si ricalcola al prossimo avvio
+            pass
+
+    # --- import ----------------------------------------------------------
+
+    def _import(self, module: str):
+        if self.root not in sys.path:
+            sys.path.insert(0, self.root)
+        return importlib.import_module(module)
+
+    def plugin_class(self, spec: PluginSpec) -> type:
+        key = (spec.module, spec.cls)
+        cls = self._classes.get(key)
+        if cls is None:
+            with self._lock:
+                cls = self._classes[key] = getattr(self._import(spec.module), spec.cls)
+        return cls
+
+    def eager_classes(self, module: str) -> List[type]:
+        """
+        Classi plugin definite nel modulo (importato subito), in ordine di nome.
+        """
+        m = self._import(module)
+        return [cls for _, cls in sorted(vars(m).items())
+                if isinstance(cls, type) and issubclass(cls, PluginBase)
+                and cls is not PluginBase and cls.__module__ == m.__name__]
+
+    # --- sessioni --------------------------------------------------------
+
+    def attach(self, dispatcher) -> List[object]:
+        """
+        Collega i plugin al dispatcher di una sessione. Restituisce le
+        istanze (plugin importati subito) e i LazyPlugin.
+        """
+        attached = []
+        pending = []
+
+        def flush():
+            # una sola sottoscrizione in blocco per i proxy accumulati
+            subs = [(lazy, event, method, filters, lazy.spec.priority if priority is None else priority)
+                    for lazy in pending for event, method, filters, priority in lazy.spec.events]
+            keys = dispatcher.subscribe_many(
+                [(event, lazy.proxy(method), priority, filters)
+                 for lazy, event, method, filters, priority in subs])
+            for (lazy, event, method, _, _), key in zip(subs, keys):
+                lazy.subscriptions.append((event, key, method))
+            pending.clear()
+
+        for module, spec in self.specs:
+            if spec is not None:
+                if spec.events:
+                    lazy = LazyPlugin(self, spec, dispatcher)
+                    pending.append(lazy)
+                    attached.append(lazy)
+                continue
+            # l'ordine di registrazione fra plugin con la stessa priorità resta quello dei file
+            flush()
+            for cls in self.eager_classes(module):
+                plugin = cls()
+                plugin.register(dispatcher)
+                attached.append(plugin)
+        flush()
+        return attached
+
+
+_REGISTRIES: Dict[str, PluginRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def plugin_registry(root: Optional[str] = None) -> PluginRegistry:
+    """
+    Registry condiviso da tutte le sessioni del processo per la root
+    indicata (default: directory corrente).
+    """
+    root = os.path.abspath(root or os.getcwd())
+    registry = _REGISTRIES.get(root)
+    if registry is None:
+        with _REGISTRIES_LOCK:
+            registry = _REGISTRIES.get(root)
+            if registry is None:
+                registry = _REGISTRIES[root] = PluginRegistry(root)
+    return registry
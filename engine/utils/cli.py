@@ -7,7 +7,7 @@ test, lint e packaging.
 import argparse
 import sys
 from engine.core.game import Game
-from engine.core.cli_commands import init_project, run_game, test_project, build_project, package_project
+from engine.core.cli_commands import init_project, run_game, replay_game, serve_game, compile_world, check_project, test_project, build_project, package_project
 
 def main():
     parser = argparse.ArgumentParser(
@@ -24,6 +24,43 @@ def main():
     # tqe run
     p_run = subparsers.add_parser("run", help="Avvia il gioco in modalità interattiva")
     p_run.add_argument("--world", type=str, default="config/world.yaml", help="Percorso al file world")
+    p_run.add_argument("--no-cache", action="store_true", help="Ignora lo snapshot compilato del mondo")
+    p_run.add_argument("--lazy", action="store_true", help="Carica stanze e oggetti solo al primo accesso")
+    p_run.add_argument("--autosave", type=int, default=0, metavar="N", help="Salva nello slot 'autosave' ogni N turni")
+    p_run.add_argument("--journal", type=str, default=None, help="Journal dei comandi per il ripristino dopo un crash")
+    p_run.add_argument("--sync-window", type=float, default=0.05, metavar="S", help="Intervallo massimo fra due fsync del journal")
+    p_run.add_argument("--profile", nargs="?", const="1", default=None, metavar="REPORT.json",
+                       help="Misura i tempi per fase e per plugin (comando 'profile'; report JSON in uscita)")
+
+    # tqe replay
+    p_replay = subparsers.add_parser("replay", help="Esegue una trascrizione di comandi e misura il throughput")
+    p_replay.add_argument("transcript", type=str, help="File con un comando per riga")
+    p_replay.add_argument("--world", type=str, default="config/world.yaml", help="Percorso al file world")
+    p_replay.add_argument("--repeat", type=int, default=1, help="Ripete i comandi N volte")
+    p_replay.add_argument("--quiet", action="store_true", help="Mostra solo le statistiche")
+    p_replay.add_argument("--lazy", action="store_true", help="Carica stanze e oggetti solo al primo accesso")
+    p_replay.add_argument("--profile", nargs="?", const="1", default=None, metavar="REPORT.json",
+                          help="Mostra i tempi per fase e per plugin (e li salva in JSON)")
+
+    # tqe serve
+    p_serve = subparsers.add_parser("serve", help="Ospita più sessioni di gioco via socket")
+    p_serve.add_argument("--world", type=str, default="config/world.yaml", help="Percorso al file world")
+    p_serve.add_argument("--host", type=str, default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=4000)
+    p_serve.add_argument("--unix", type=str, default=None, help="Percorso di un socket Unix (al posto di TCP)")
+    p_serve.add_argument("--lazy", action="store_true", help="Carica stanze e oggetti solo al primo accesso")
+    p_serve.add_argument("--profile", nargs="?", const="1", default=None, metavar="REPORT.json",
+                         help="Tempi per fase e per plugin di tutte le sessioni (report all'arresto)")
+
+    # tqe compile
+    p_compile = subparsers.add_parser("compile", help="Compila il mondo in uno snapshot binario")
+    p_compile.add_argument("--world", type=str, default="config/world.yaml", help="Percorso al file world")
+
+    # tqe check
+    p_check = subparsers.add_parser("check", help="Valida il mondo: riferimenti, raggiungibilità, oggetti inutilizzati")
+    p_check.add_argument("--world", type=str, default="config/world.yaml", help="Percorso al file world")
+    p_check.add_argument("--jobs", type=int, default=None, help="Processi per i controlli sui mondi grandi")
+    p_check.add_argument("--format", choices=["json", "text"], default="json")
 
     # tqe test
     p_test = subparsers.add_parser("test", help="Esegue test di unit e integrazione")
@@ -43,7 +80,19 @@ def main():
     if args.command == "init":
         init_project(args.path)
     elif args.command == "run":
-        run_game(world_path=args.world)
+        run_game(world_path=args.world, use_cache=not args.no_cache, lazy=args.lazy,
+                 autosave=args.autosave, journal=args.journal, sync_window=args.sync_window,
+                 profile=args.profile)
+    elif args.command == "replay":
+        replay_game(args.transcript, world_path=args.world, repeat=args.repeat,
+                    quiet=args.quiet, lazy=args.lazy, profile=args.profile)
+    elif args.command == "serve":
+        serve_game(world_path=args.world, host=args.host, port=args.port,
+                   unix_path=args.unix, lazy=args.lazy, profile=args.profile)
+    elif args.command == "compile":
+        compile_world(world_path=args.world)
+    elif args.command == "check":
+        sys.exit(check_project(world_path=args.world, jobs=args.jobs, output_format=args.format))
     elif args.command == "test":
         test_project(scope=args.focus)
     elif args.command == "lint":
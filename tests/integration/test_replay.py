@@ -0,0 +1,35 @@
+import pytest
+from engine.core.game import Game
+from engine.core.replay import read_transcript, replay
+from engine.data.models import World, Room, Item, Mission
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a", "initial_missions": ["m1"]})
+    w.rooms["a"] = Room("a", "Room A", "Stanza A.", {"est": "b"}, [])
+    w.rooms["b"] = Room("b", "Room B", "Stanza B.", {"ovest": "a"}, ["chiave"])
+    w.items["chiave"] = Item("chiave", ["chiave"], "Una chiave", 0.1, [])
+    w.missions["m1"] = Mission("m1", "Chiave", "", {"have_item": ["chiave"]}, [],
+                               {"message": "Missione chiave completata!"})
+    return w
+
+def test_replay_runs_full_pipeline(world, capsys):
+    result = replay(Game(world), ["vai est", "prendi chiave", "inventario", "esci", "guarda"])
+
+    assert result.count == 4
+    assert result.outputs[0] == "Sei arrivato in Room B."
+    assert "Missione chiave completata!" in result.outputs[1]
+    assert "chiave: Una chiave" in result.outputs[2]
+    assert result.commands_per_sec > 0
+    # nessun output su stdout durante il replay
+    assert capsys.readouterr().out == ""
+
+def test_read_transcript_formats(tmp_path):
+    plain = tmp_path / "plain.txt"
+    plain.write_text("# commento\nguarda\n\nvai est\n", encoding="utf-8")
+    assert read_transcript(str(plain)) == ["guarda", "vai est"]
+
+    log = tmp_path / "log.txt"
+    log.write_text("> guarda\n== Room A ==\nStanza A.\n> vai est\nSei arrivato in Room B.\n",
+                   encoding="utf-8")
+    assert read_transcript(str(log)) == ["guarda", "vai est"]
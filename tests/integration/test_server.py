@@ -0,0 +1,114 @@
+import os
+import asyncio
+import pytest
+from engine.data.models import World, Room
+from engine.core.game import Game
+from engine.core.server import GameServer, REPLY_END, default_session
+from engine.data.journal import read_journal
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a", "intro_text": "Intro di prova."})
+    w.rooms["a"] = Room("a", "Room A", "Stanza A.", {"est": "b"}, [])
+    w.rooms["b"] = Room("b", "Room B", "Stanza B.", {"ovest": "a"}, [])
+    return w
+
+async def _talk(path, lines):
+    reader, writer = await asyncio.open_unix_connection(path)
+    end = REPLY_END.encode("utf-8")
+    replies = [(await reader.readuntil(end)).decode("utf-8")]
+    for line in lines:
+        writer.write((line + "\n").encode("utf-8"))
+        replies.append((await reader.readuntil(end)).decode("utf-8"))
+    writer.close()
+    return replies
+
+def test_sessions_have_independent_state(tmp_path, world):
+    path = str(tmp_path / "tqe.sock")
+
+    async def scenario():
+        server = GameServer(world)
+        await server.start(unix_path=path)
+        try:
+            first, second = await asyncio.gather(
+                _talk(path, ["vai est", "guarda"]),
+                _talk(path, ["guarda"]),
+            )
+        finally:
+            await server.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert "Intro di prova." in first[0]
+    assert "Sei arrivato in Room B." in first[1]
+    assert "== Room B ==" in first[2]
+    assert "== Room A ==" in second[1]
+
+def test_long_line_gets_an_error_reply(tmp_path, world):
+    path = str(tmp_path / "tqe.sock")
+
+    async def scenario():
+        server = GameServer(world, max_line=64)
+        await server.start(unix_path=path)
+        try:
+            return await _talk(path, ["x" * 5000, "vai est" + " " * 100, "guarda"])
+        finally:
+            await server.close()
+
+    replies = asyncio.run(scenario())
+    assert "Comando troppo lungo" in replies[1]
+    # sotto il limite dello stream ma oltre max_line: rifiutata, non troncata
+    assert "Comando troppo lungo" in replies[2]
+    assert "== Room A ==" in replies[3]
+
+def test_disconnect_closes_the_session(tmp_path, world):
+    path = str(tmp_path / "tqe.sock")
+    journal = str(tmp_path / "s.tqej")
+    games = []
+
+    def session(w):
+        games.append(Game(w, save_dir=str(tmp_path), journal=journal))
+        return games[-1]
+
+    async def scenario():
+        server = GameServer(world, session_factory=session)
+        await server.start(unix_path=path)
+        try:
+            await _talk(path, ["vai est"])
+            for _ in range(100):
+                if not server.sessions:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+    assert games[0].journal._fd is None
+    assert read_journal(journal) == (None, [])
+
+def test_players_find_their_saves_after_reconnecting(tmp_path, world):
+    path = str(tmp_path / "tqe.sock")
+    root = tmp_path / "saves"
+
+    async def scenario():
+        server = GameServer(world, session_factory=lambda w: default_session(w, save_root=str(root)))
+        await server.start(unix_path=path)
+        try:
+            guest = await _talk(path, ["salva prova"])
+            first = await _talk(path, ["giocatore anna", "vai est", "salva uno"])
+            for _ in range(100):
+                if not server.sessions:
+                    break
+                await asyncio.sleep(0.01)
+            second = await _talk(path, ["giocatore anna", "carica uno", "guarda"])
+        finally:
+            await server.close()
+        return guest, first, second
+
+    guest, first, second = asyncio.run(scenario())
+    assert "completato" in guest[1]
+    assert "Benvenuto, anna" in first[1]
+    assert "Caricamento da slot 'uno' completato." in second[2]
+    assert "== Room B ==" in second[3]
+    # le directory degli ospiti vengono rimosse alla disconnessione
+    assert sorted(os.listdir(root)) == ["anna"]
@@ -0,0 +1,49 @@
+import pytest
+from engine.core.parser import Parser
+from engine.data.aliases import AliasIndex, normalize
+from engine.data.containers import ItemBag
+from engine.data.models import World, Room, Item, NPC
+from engine.data.overlay import WorldOverlay
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {}, ["torcia"])
+    w.items["torcia"] = Item("torcia", ["torcia", "lanterna"], "", 1.0, [])
+    w.items["pietra_preziosa"] = Item("pietra_preziosa", ["pietra preziosa"], "", 1.0, [])
+    w.items["pietra_rotta"] = Item("pietra_rotta", ["pietra rotta"], "", 1.0, [])
+    w.npcs["gnomo"] = NPC("gnomo", "Gnomo Fannullone", "a", [])
+    return w
+
+def test_normalize_drops_articles_and_elision():
+    assert normalize("La Pietra preziosa") == ("pietra", "preziosa")
+    assert normalize("l'ascia") == ("ascia",)
+    assert normalize("pietra_preziosa") == ("pietra", "preziosa")
+
+def test_index_exact_and_prefix():
+    index = AliasIndex()
+    index.add("lanterna", "torcia")
+    index.add("pietra preziosa", "gemma")
+    assert index.resolve("la lanterna") == ("torcia",)
+    assert index.resolve("lant") == ("torcia",)
+    assert index.resolve("pie prez") == ("gemma",)
+    assert index.resolve("spada") == ()
+
+def test_parser_resolves_aliases(world):
+    parser = Parser()
+    state = {"current_room": "a", "inventory": ItemBag()}
+    assert parser.parse("prendi la lanterna", state, world).target == "torcia"
+    assert parser.parse("guarda pietra prez", state, world).target == "pietra_preziosa"
+    assert parser.parse("parla con gnomo", state, world).target == "gnomo"
+    assert parser.parse("prendi spada", state, world).target == "spada"
+
+def test_parser_prefers_items_in_scope(world):
+    parser = Parser()
+    state = {"current_room": "a", "inventory": ItemBag(["pietra_rotta"])}
+    assert parser.parse("lascia pietra", state, world).target == "pietra_rotta"
+
+def test_index_built_on_base_world(world):
+    overlay = WorldOverlay(world)
+    overlay.items["nuovo"] = Item("nuovo", ["nuovo"], "", 1.0, [])
+    Parser().parse("prendi lanterna", {"current_room": "a", "inventory": ItemBag()}, overlay)
+    assert "aliases" in world._derived
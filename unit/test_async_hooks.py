@@ -0,0 +1,72 @@
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+from engine.core.dispatcher import EventDispatcher
+from engine.core.game import Game
+from engine.data.models import World, Room
+from engine.plugins.base import PluginBase
+
+class Biblioteca(PluginBase):
+    def __init__(self):
+        self.registrati = []
+
+    async def on_command_leggi(self, action, state, world):
+        await asyncio.sleep(0.01)
+        return f"Leggi {action.target}."
+
+    async def on_post_action(self, action, state, world):
+        await asyncio.sleep(0.05)
+        self.registrati.append(action.command)
+
+class Guardia(PluginBase):
+    def on_pre_action(self, action, state, world):
+        if action.command == "leggi" and action.target == "proibito":
+            return "Non puoi."
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {}, [])
+    return w
+
+def _action(command, target=None):
+    return SimpleNamespace(command=command, target=target, indirect=None)
+
+def test_async_hook_on_both_paths():
+    dispatcher = EventDispatcher()
+    Biblioteca().register(dispatcher)
+    assert asyncio.run(dispatcher.dispatch_async(_action("leggi", "libro"), {}, None)) == "Leggi libro."
+    assert dispatcher.dispatch(_action("leggi", "libro"), {}, None) == "Leggi libro."
+
+def test_background_post_action_does_not_delay_reply(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path))
+    plugin = Biblioteca()
+    plugin.register(game.dispatcher)
+
+    async def turn():
+        t0 = time.perf_counter()
+        reply = await game.process_async("guarda")
+        elapsed = time.perf_counter() - t0
+        assert plugin.registrati == []
+        await game.dispatcher.drain()
+        return reply, elapsed
+
+    reply, elapsed = asyncio.run(turn())
+    assert "Room A" in reply
+    assert elapsed < 0.05
+    assert plugin.registrati == ["look"]
+
+def test_sync_plugins_keep_working_async(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path))
+    Guardia().register(game.dispatcher)
+    game.dispatcher.register_command("leggi", lambda a, s, w: "letto")
+    assert asyncio.run(game.process_async("leggi proibito")) == "Non puoi."
+    assert "Room A" in game.process("guarda")
+
+def test_sync_path_runs_async_listeners(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path))
+    plugin = Biblioteca()
+    plugin.register(game.dispatcher)
+    game.process("guarda")
+    assert plugin.registrati == ["look"]
@@ -0,0 +1,103 @@
+import pickle
+import pytest
+from engine.core.clock import Clock, cancel, schedule, schedule_at
+from engine.core.game import Game
+from engine.data.containers import TimerQueue
+from engine.data.models import World, Room
+from engine.data.state import GameState
+from engine.plugins.base import PluginBase
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a", "clock": {
+        "costs": {"move": 10},
+        "events": {
+            "porta": {"in": 15, "room": "b", "message": "La porta si chiude.",
+                      "set_flag": "porta_chiusa", "remove_exit": {"room": "b", "direction": "ovest"}},
+            "campana": {"at": "00:30", "every": 30, "message": "Suona la campana."},
+            "crollo": {"message": "Il soffitto crolla."},
+        }}})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, [])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    return w
+
+class Custode(PluginBase):
+    def on_timer_ronda(self, timer, state, world):
+        return f"Il custode passa ({timer.data['giro']})."
+
+def test_queue_pops_only_due_timers_in_order():
+    queue = TimerQueue()
+    timers = [queue.push(due, f"t{due}") for due in (50, 10, 30, 10)]
+    assert cancel({"timers": queue}, timers[2]) and len(queue) == 3
+    assert queue.pop_due(5) is None
+    assert [queue.pop_due(40).name for _ in range(2)] == ["t10", "t10"]
+    assert queue.pop_due(40) is None and queue.peek().name == "t50"
+    copy = pickle.loads(pickle.dumps(queue))
+    assert copy == queue and copy.push(60, "x").id > timers[-1].id
+
+def test_actions_advance_the_clock_and_fire_world_events(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path))
+    assert game.process("guarda").startswith("== Room A ==")
+    assert game.state["time"] == 1
+    assert game.process("help") and game.state["time"] == 1
+    assert game.process("xyzzy") and game.state["time"] == 1
+    out = game.process("vai est")
+    assert game.state["time"] == 11 and "La porta" not in out
+    out = game.process("vai ovest")
+    # scaduta a 15, sposta il giocatore prima: il messaggio è solo per la stanza b
+    assert game.state["time"] == 21 and out == "Sei arrivato in Room A."
+    assert game.world.flags["porta_chiusa"] and "ovest" not in game.world.rooms["b"].connections
+    out = game.process("vai est")
+    assert game.state["time"] == 31 and out.endswith("Suona la campana.")
+    assert [t.due for t in game.state["timers"]] == [60]
+
+def test_failed_commands_do_not_advance_the_clock(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path), profile=True)
+    assert game.process("vai nord") == "Non puoi andare lì."
+    assert game.process("prendi spada").startswith("Non vedo")
+    assert game.state["time"] == 0
+    game.process("vai est")
+    assert game.state["time"] == 10
+    assert game.profiler.as_dict()["stage:clock"]["count"] == 3
+
+def test_npcs_walk_one_room_per_step(tmp_path):
+    from engine.data.models import NPC
+    w = World({"start_room": "a", "clock": {
+        "costs": {"look": 5}, "npc_step": 5,
+        "events": {"giro": {"in": 5, "send_npc": {"npc": "oste", "to": "c"}}}}})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, [])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a", "est": "c"}, [])
+    w.rooms["c"] = Room("c", "Room C", "C", {"ovest": "b"}, [])
+    w.npcs["oste"] = NPC("oste", "Oste", "a", [])
+    game = Game(w, save_dir=str(tmp_path))
+    game.process("guarda")
+    assert game.world.npc_targets == {"oste": "c"}
+    assert game.process("guarda").endswith("Oste se ne va.")
+    assert game.world.npc_location("oste") == "b"
+    game.process("salva uno")
+    game.process("guarda")
+    assert game.world.npc_location("oste") == "c" and not game.world.npc_targets
+    assert game.process("parla oste") == "Oste non è qui."
+    # solo la sessione vede l'NPC spostato; un salvataggio lo riporta indietro
+    assert w.npcs["oste"].location == "a"
+    game.process("carica uno")
+    assert game.world.npc_location("oste") == "b" and game.world.npc_targets == {"oste": "c"}
+
+def test_plugin_timers_survive_save_and_load(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path))
+    Custode().register(game.dispatcher)
+    schedule(game.state, 3, "ronda", giro=1)
+    crollo = schedule_at(game.state, 4, "crollo")
+    game.process("salva uno")
+    cancel(game.state, crollo)
+    assert game.process("guarda") and game.state["time"] == 1
+    game.process("carica uno")
+    assert isinstance(game.state, GameState) and crollo.id in game.state["timers"]
+    game.state["time"] = 3
+    out = game.process("guarda")
+    assert out.endswith("Il custode passa (1).\nIl soffitto crolla.")
+
+def test_clock_rejects_non_positive_repeats():
+    with pytest.raises(ValueError):
+        Clock({"events": {"x": {"in": 1, "every": 0}}})
+    assert Clock({"costs": {"look": 0}}).cost("look") == 0
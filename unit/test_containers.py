@@ -0,0 +1,40 @@
+import pickle
+import pytest
+from types import SimpleNamespace
+from engine.core.dispatcher import EventDispatcher
+from engine.data.containers import ItemBag
+
+def test_bag_keeps_order_and_quantities():
+    bag = ItemBag(["torcia", "moneta", "moneta"])
+    bag.append("gemma")
+    bag.add("moneta", 3)
+    assert list(bag) == ["torcia", "moneta", "gemma"]
+    assert bag.count("moneta") == 5 and bag.total() == 7
+
+    bag.remove("torcia")
+    bag.append("torcia")
+    assert list(bag) == ["moneta", "gemma", "torcia"]
+
+def test_bag_remove_missing_raises():
+    bag = ItemBag({"moneta": 2})
+    with pytest.raises(ValueError):
+        bag.remove("gemma")
+    with pytest.raises(ValueError):
+        bag.remove("moneta", 3)
+
+def test_bag_version_and_pickle():
+    bag = ItemBag(["a"])
+    v = bag.version
+    bag.append("b")
+    assert bag.version > v
+    assert pickle.loads(pickle.dumps(bag)) == ["a", "b"]
+
+def test_take_stackable_moves_whole_stack():
+    items = {"moneta": SimpleNamespace(names=["moneta"], description="Oro", stackable=True)}
+    room = SimpleNamespace(items=ItemBag({"moneta": 3}), connections={})
+    world = SimpleNamespace(rooms={"a": room}, items=items)
+    state = {"current_room": "a", "inventory": ItemBag()}
+
+    out = EventDispatcher().dispatch(SimpleNamespace(command="take", target="moneta"), state, world)
+    assert out == "Hai raccolto moneta (x3)."
+    assert state["inventory"].count("moneta") == 3 and "moneta" not in room.items
@@ -0,0 +1,86 @@
+import pytest
+from types import SimpleNamespace
+from engine.core.dialogue import DialogueGraph, dialogue_graph, END
+from engine.core.parser import Parser
+from engine.data.models import World, Room, NPC
+from engine.data.overlay import WorldOverlay
+from engine.data.state import GameState
+from engine.data.validate import check_world
+from engine.plugins.dialogue_plugin import DialoguePlugin
+
+DIALOGUES = [
+    {"id": "saluto", "text": "Ciao!", "options": [
+        {"reply": "Ecco la birra", "requires": {"have_item": "birra"}, "text": "Grazie!", "next": "eroe"},
+        {"reply": "Niente", "text": "Peccato.", "next": "saluto"},
+    ]},
+    {"id": "eroe", "text": "Sei un eroe?", "options": [
+        {"reply": "Sì", "next": "fine"},
+        {"reply": "Dimmi altro", "next": 3},
+    ]},
+    {"text": "Mai visto.", "next": "fine"},
+    {"text": "Leggenda della grotta."},
+]
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "taverna"})
+    w.rooms["taverna"] = Room("taverna", "Taverna", "", {}, [])
+    w.npcs["gnomo"] = NPC("gnomo", "Gnomo", "taverna", DIALOGUES)
+    return WorldOverlay(w)
+
+@pytest.fixture
+def state():
+    return GameState(current_room="taverna", visited=("taverna",))
+
+def test_graph_compiles_ids_and_targets(world):
+    graph = dialogue_graph(world, "gnomo")
+    assert graph is dialogue_graph(WorldOverlay(world.base), "gnomo")
+    assert graph.index == {"saluto": 0, "eroe": 1}
+    assert [o.next for o in graph.nodes[1].options] == [END, 3]
+    assert graph.nodes[2].next == END and graph.nodes[3].next == END
+    assert graph.nodes[0].menu is None and graph.nodes[1].menu is not None
+
+def test_branching_with_conditions(world, state):
+    graph = dialogue_graph(world, "gnomo")
+    out = graph.talk(state, world)
+    assert out.startswith('Gnomo dice: "Ciao!"') and "Ecco la birra" not in out and "1. Niente" in out
+    assert graph.talk(state, world, 1) == 'Gnomo dice: "Peccato."'
+    state["inventory"].append("birra")
+    assert "1. Ecco la birra" in graph.talk(state, world)
+    assert graph.talk(state, world, 1) == 'Gnomo dice: "Grazie!"'
+    assert state["variables"]["dialogue_gnomo"] == 1
+
+    # scelta senza replica: si passa subito al nodo indicato
+    assert graph.talk(state, world, 2) == 'Gnomo dice: "Leggenda della grotta."'
+    assert graph.talk(state, world) == "Gnomo non ha altro da dire in questo momento."
+
+def test_invalid_choice_keeps_position(world, state):
+    graph = dialogue_graph(world, "gnomo")
+    assert graph.talk(state, world, 5).startswith("Opzione non valida")
+    assert graph.position(state) == 0
+
+def test_plugin_and_parser_option_number(world, state):
+    action = Parser().parse("parla gnomo 1", state, world)
+    assert (action.command, action.target, action.indirect) == ("talk", "gnomo", "1")
+    plugin = DialoguePlugin()
+    assert plugin.handle_talk(action, state, world) == 'Gnomo dice: "Peccato."'
+    talk = SimpleNamespace(command="talk", target="nessuno", indirect=None)
+    assert plugin.handle_talk(talk, state, world) == "Non vedo nessuno con cui parlare qui."
+
+def test_dangling_next_is_reported(world):
+    w = world.base
+    w.npcs["oste"] = NPC("oste", "Oste", "taverna", [{"text": "Eh?", "next": "boh"}])
+    assert DialogueGraph(w.npcs["oste"]).dangling == [("0", "boh")]
+    codes = {(i["code"], i["id"]) for i in check_world(w, jobs=1)["issues"]}
+    assert ("unknown_dialogue_node", "oste") in codes
+
+def test_talk_through_the_game(world, tmp_path):
+    from engine.core.game import Game
+    game = Game(world.base, save_dir=str(tmp_path))
+    out = game.process("parla gnomo")
+    assert out.startswith('Gnomo dice: "Ciao!"') and "1. Niente" in out
+    assert game.process("parla gnomo 1") == 'Gnomo dice: "Peccato."'
+    assert game.process("talk gnomo 1") == 'Gnomo dice: "Peccato."'
+    assert "gnomo" in game.state["talked_to"]
+    game.state["current_room"] = "cantina"
+    assert game.process("parla gnomo") == "Gnomo non è qui."
@@ -59,3 +59,25 @@ def test_handle_take_and_drop(dispatcher, state, dummy_world):
     assert "Hai lasciato chiave" in res2
     assert "chiave" not in state["inventory"]
     assert "chiave" in dummy_world.rooms["a"].items
+
+def test_plugin_hooks_follow_priority(dispatcher, state, dummy_world):
+    calls = []
+    dispatcher.subscribe("command_look", lambda a, s, w: calls.append("low"))
+    dispatcher.subscribe("command_look", lambda a, s, w: calls.append("high"), priority=10)
+    dispatcher.dispatch(SimpleNamespace(command="look", target="chiave"), state, dummy_world)
+    assert calls == ["high", "low"]
+
+def test_plugin_registers_new_verb(dispatcher, state, dummy_world):
+    dispatcher.register_command("dance", lambda a, s, w: "Balli.", aliases=("balla",))
+    assert dispatcher.dispatch(SimpleNamespace(command="balla", target=None), state, dummy_world) == "Balli."
+    assert "dance: balla" in dispatcher.dispatch(SimpleNamespace(command="help", target=None), state, dummy_world)
+
+def test_help_always_lists_the_canonical_verb(dispatcher, state, dummy_world):
+    dispatcher.register_command("profile", lambda a, s, w: "", aliases=("profilo",))
+    help_text = dispatcher.dispatch(SimpleNamespace(command="help", target=None), state, dummy_world)
+    assert "- profile: profilo, profile" in help_text.splitlines()
+    assert "- look: guarda, look" in help_text.splitlines()
+
+def test_unknown_command(dispatcher, state, dummy_world):
+    result = dispatcher.dispatch(SimpleNamespace(command="vola", target=None), state, dummy_world)
+    assert result.startswith("Comando non riconosciuto: 'vola'")
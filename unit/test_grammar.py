@@ -0,0 +1,85 @@
+import pickle
+from engine.core.dispatcher import EventDispatcher
+from engine.core.grammar import Action, Grammar, tokenize
+from engine.core.parser import Parser
+from engine.data.containers import ItemBag
+from engine.data.models import World, Room, Item
+from engine.data.overlay import WorldOverlay
+
+def _world(grammar=None):
+    w = World({"start_room": "a", "grammar": grammar})
+    w.rooms["a"] = Room("a", "Atrio", "", {"nord": "b"}, ["chiave"])
+    w.rooms["b"] = Room("b", "Biblioteca", "", {"sud": "a"}, [])
+    w.items["chiave"] = Item("chiave", ["chiave d'ottone"], "", 1.0, [])
+    w.items["porta"] = Item("porta", ["porta"], "", 1.0, [])
+    return WorldOverlay(w)
+
+def test_tokenize_single_pass():
+    assert tokenize("Usa l’Ascia, SUBITO!") == ["usa", "l'", "ascia", "subito"]
+    assert tokenize("carica slot-2") == ["carica", "slot-2"]
+
+def test_multiword_verbs_and_patterns():
+    grammar = Grammar()
+    grammar.verb("take", "prendi", "pick up")
+    grammar.verb("put", "metti")
+    grammar.preposition("in", "in", "nel", "nella", "into")
+    grammar.pattern("put", "<target> @in <indirect>")
+    compiled = grammar.compiled()
+    assert compiled.parse(["pick", "up", "la", "lampada"]) == ("take", "la lampada", None)
+    assert compiled.parse(["pick"]) is None
+    assert compiled.parse(["metti", "la", "moneta", "nella", "borsa"]) == ("put", "la moneta", "borsa")
+    assert compiled.parse(["metti", "moneta"]) == ("put", "moneta", None)
+    assert grammar.compiled() is compiled
+
+def test_layers_share_the_parent_automaton():
+    base = Grammar()
+    base.verb("look", "guarda")
+    layer = base.extend()
+    assert layer.compiled() is base.compiled()
+    layer.verb("look", "guarda")
+    assert layer.compiled() is base.compiled()
+    layer.verb("look", "osserva")
+    assert layer.compiled().verb(["osserva"]) == ("look", 1)
+    base.verb("take", "prendi")
+    assert layer.compiled().verb(["prendi", "x"]) == ("take", 1)
+
+def test_parser_resolves_structured_actions():
+    world = _world()
+    state = {"current_room": "a", "inventory": ItemBag()}
+    parser = Parser()
+    action = parser.parse("usa la chiave d'ottone sulla porta", state, world)
+    assert isinstance(action, Action)
+    assert (action.command, action.target, action.indirect) == ("use", "chiave", "porta")
+    assert vars(parser.parse("vai alla biblioteca", state, world)) == \
+        {"command": "travel", "target": "b", "indirect": None}
+    assert parser.parse("nord", state, world).command == "move"
+    assert parser.parse("balla forte", state, world).command == "balla"
+    assert pickle.loads(pickle.dumps(action)) == action
+
+def test_world_and_plugin_grammar():
+    world = _world({"verbs": {"take": ["raccogli", "pick up"]},
+                    "prepositions": {"with": ["tramite"]}})
+    state = {"current_room": "a", "inventory": ItemBag()}
+    parser = Parser()
+    assert parser.parse("pick up chiave", state, world).command == "take"
+    assert parser.parse("usa chiave tramite porta", state, world).indirect == "porta"
+
+    dispatcher = EventDispatcher(parser.grammar)
+    dispatcher.register_command("dance", lambda *a: "ok", aliases=("balla", "fai un ballo"))
+    action = parser.parse("fai un ballo", state, world)
+    assert (action.command, action.target) == ("dance", None)
+    assert Parser().parse("fai un ballo", state, world).command == "fai"
+
+def test_sessions_with_the_same_verbs_share_the_automaton(tmp_path):
+    from engine.core.game import Game
+    world = _world()
+    first = Game(world, save_dir=str(tmp_path))
+    second = Game(world, save_dir=str(tmp_path))
+    compiled = first.parser.compiled(first.world)
+    assert compiled.verb(["profilo"]) == ("profile", 1)
+    assert second.parser.compiled(second.world) is compiled
+    assert compiled.spelling() is second.parser.compiled(second.world).spelling()
+    # una sessione con un verbo in più ha il suo automa
+    second.dispatcher.register_command("dance", lambda a, s, w: "Balli.", aliases=("balla",))
+    assert second.parser.compiled(second.world) is not compiled
+    assert first.parser.compiled(first.world) is compiled
@@ -0,0 +1,101 @@
+import os
+import time
+import threading
+import pytest
+from types import SimpleNamespace
+from engine.core.dispatcher import EventDispatcher
+from engine.data.containers import ItemBag
+from engine.data.models import World, Room, Item
+from engine.data.overlay import WorldOverlay
+from engine.plugins.base import PluginBase
+from engine.plugins.isolation import plugin_pool
+
+class Scavo(PluginBase):
+    heavy = True
+
+    def on_command_scava(self, action, state, world):
+        state["scavato"] = os.getpid()
+        state["inventory"].append("chiave")
+        world.rooms[state["current_room"]].items.append("gemma")
+        world.flags["buca"] = True
+        return "Hai scavato."
+
+class Lento(PluginBase):
+    heavy = True
+    timeout = 0.2
+
+    def on_command_aspetta(self, action, state, world):
+        if action.target == "molto":
+            time.sleep(10)
+        return "Fatto."
+
+class Paziente(PluginBase):
+    heavy = True
+    timeout = 5
+
+    def on_command_attendi(self, action, state, world):
+        time.sleep(1)
+        return "Atteso."
+
+class Leggero(PluginBase):
+    def on_pre_action(self, action, state, world):
+        return None
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, [])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.items["gemma"] = Item("gemma", ["gemma"], "", 1.0, [])
+    w.items["chiave"] = Item("chiave", ["chiave"], "", 1.0, [])
+    yield WorldOverlay(w)
+    plugin_pool(w).shutdown()
+
+def _session(*plugins):
+    dispatcher = EventDispatcher()
+    for plugin in plugins:
+        plugin.register(dispatcher)
+    state = {"current_room": "a", "inventory": ItemBag(), "missions": {}, "visited": {"a"}}
+    return dispatcher, state
+
+def _action(command, target=None):
+    return SimpleNamespace(command=command, target=target, indirect=None)
+
+def test_changes_are_merged_back(world):
+    dispatcher, state = _session(Scavo())
+    assert dispatcher.dispatch(_action("scava"), state, world) == "Hai scavato."
+    assert state["scavato"] != os.getpid()
+    assert state["inventory"] == ["chiave"]
+    assert "gemma" in world.rooms["a"].items
+    assert "gemma" in world.rooms["a"].describe(state, world)
+    assert world.flags["buca"] is True
+    # il mondo base resta intatto
+    assert world.base.rooms["a"].items == []
+
+def test_deadline_abandons_call(world):
+    dispatcher, state = _session(Lento())
+    t0 = time.monotonic()
+    assert dispatcher.dispatch(_action("aspetta", "molto"), state, world).startswith("Comando non riconosciuto")
+    assert time.monotonic() - t0 < 5
+    assert plugin_pool(world).timeouts == 1
+    # i worker ripartono
+    assert dispatcher.dispatch(_action("aspetta"), state, world) == "Fatto."
+
+def test_timeout_spares_other_sessions(world):
+    slow, slow_state = _session(Paziente())
+    stuck, stuck_state = _session(Lento())
+    replies = []
+    other = threading.Thread(target=lambda: replies.append(
+        slow.dispatch(_action("attendi"), slow_state, world)))
+    other.start()
+    time.sleep(0.3)
+    stuck.dispatch(_action("aspetta", "molto"), stuck_state, world)
+    other.join()
+    assert plugin_pool(world).timeouts == 1
+    # la chiamata dell'altra sessione non viene interrotta
+    assert replies == ["Atteso."]
+
+def test_light_plugins_stay_inline():
+    plugin = Leggero()
+    assert plugin.callback("on_pre_action") == plugin.on_pre_action
+    assert Scavo().callback("on_command_scava") != Scavo.on_command_scava
@@ -0,0 +1,82 @@
+import os
+import time
+import threading
+import pytest
+from types import SimpleNamespace
+from engine.core.game import Game
+from engine.data.journal import Journal, read_journal
+from engine.data.models import World, Room, Item
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, ["chiave"])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.items["chiave"] = Item("chiave", ["chiave"], "", 1.0, [])
+    return w
+
+def _action(command, target=None):
+    return SimpleNamespace(command=command, target=target, indirect=None)
+
+def test_checkpoint_discards_earlier_actions(tmp_path):
+    path = str(tmp_path / "s.tqej")
+    journal = Journal(path, sync_window=None)
+    journal.append(1, _action("look"))
+    journal.checkpoint("autosave", 1)
+    journal.append(2, _action("take", "chiave"))
+    journal.close()
+    assert read_journal(path) == (("autosave", 1), [(2, "take", "chiave", None)])
+
+def test_truncated_record_is_dropped(tmp_path):
+    path = str(tmp_path / "s.tqej")
+    journal = Journal(path)
+    journal.append(1, _action("look"))
+    journal.append(2, _action("move", "est"))
+    journal.close()
+    os.truncate(path, os.path.getsize(path) - 2)
+    Journal(path).append(3, _action("look"))
+    assert [turn for turn, *_ in read_journal(path)[1]] == [1, 3]
+
+def test_crashed_session_is_recovered(tmp_path, world):
+    path = str(tmp_path / "s.tqej")
+    game = Game(world, save_dir=str(tmp_path), autosave=2, journal=path)
+    for line in ["prendi chiave", "vai est", "lascia chiave", "vai ovest", "guarda"]:
+        game.process(line)
+    # nessuna close(): il processo "muore" qui
+    restored = Game(world, save_dir=str(tmp_path), autosave=2, journal=path)
+    assert restored.recovered == 1
+    assert restored.turns == 5
+    assert restored.state["current_room"] == "a"
+    assert "chiave" in restored.world.rooms["b"].items
+    assert restored.state["visited"] == {"a", "b"}
+
+def test_idle_session_is_synced_after_the_window(tmp_path):
+    journal = Journal(str(tmp_path / "s.tqej"), sync_window=0.05)
+    journal.append(1, _action("look"))
+    assert journal._pending
+    time.sleep(0.3)
+    # nessuna azione successiva: ci pensa il flusher
+    assert not journal._pending
+    journal.close()
+
+def test_one_flusher_thread_for_all_journals(tmp_path):
+    journals = [Journal(str(tmp_path / f"s{n}.tqej"), sync_window=0.05) for n in range(20)]
+    for journal in journals:
+        journal.append(1, _action("look"))
+    flushers = [t for t in threading.enumerate() if t.name == "journal-flusher"]
+    assert len(flushers) == 1
+    time.sleep(0.3)
+    assert not any(journal._pending for journal in journals)
+    for journal in journals:
+        journal.close()
+
+def test_clean_close_is_not_recovered(tmp_path, world):
+    path = str(tmp_path / "s.tqej")
+    game = Game(world, save_dir=str(tmp_path), journal=path)
+    for line in ["prendi chiave", "vai est"]:
+        game.process(line)
+    game.close()
+    assert read_journal(path) == (None, [])
+    restored = Game(world, save_dir=str(tmp_path), journal=path)
+    assert restored.recovered == 0
+    assert restored.state["current_room"] == "a"
@@ -0,0 +1,82 @@
+import pytest
+from types import SimpleNamespace
+from engine.core.missions import MissionTracker
+from engine.data.models import World, Room, Mission, NPC
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, [])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.npcs["gnomo"] = NPC("gnomo", "Gnomo", "b", [])
+    w.missions["oggetti"] = Mission("oggetti", "Oggetti", "", {"have_item": ["chiave", "gemma"]}, [], {})
+    w.missions["viaggio"] = Mission("viaggio", "Viaggio", "", {"visited_room": ["b"]}, [],
+                                    {"message": "Sei arrivato!"})
+    w.missions["chiacchiere"] = Mission("chiacchiere", "Chiacchiere", "",
+                                        {"talked_to": ["gnomo"], "flag_set": ["torch_lit"]}, [], {})
+    return w
+
+@pytest.fixture
+def state(world):
+    return {"current_room": "a", "inventory": [], "time": 0,
+            "missions": {mid: "In corso" for mid in world.missions}}
+
+def _look():
+    return SimpleNamespace(command="look", target=None, indirect=None)
+
+def test_have_item_needs_all_items(world, state):
+    tracker = MissionTracker(world, state)
+    state["inventory"].append("chiave")
+    assert tracker.update(_look()) == []
+    state["inventory"].append("gemma")
+    assert tracker.update(_look()) == ["Missione 'Oggetti' completata!"]
+    assert state["missions"]["oggetti"] == "Completata"
+
+def test_visited_room(world, state):
+    tracker = MissionTracker(world, state)
+    tracker.update(_look())
+    state["current_room"] = "b"
+    assert tracker.update(_look()) == ["Sei arrivato!"]
+
+def test_talked_to_and_flag(world, state):
+    tracker = MissionTracker(world, state)
+    tracker.update(SimpleNamespace(command="talk", target="gnomo", indirect=None))
+    assert state["missions"]["chiacchiere"] == "In corso"
+    state["torch_lit"] = True
+    tracker.update(_look())
+    assert state["missions"]["chiacchiere"] == "Completata"
+
+def test_only_affected_missions_are_evaluated(world, state, monkeypatch):
+    tracker = MissionTracker(world, state)
+    tracker.update(_look())
+    evaluated = []
+    original = tracker.satisfied
+    monkeypatch.setattr(tracker, "satisfied", lambda mid: evaluated.append(mid) or original(mid))
+    state["inventory"].append("chiave")
+    tracker.update(_look())
+    assert evaluated == ["oggetti"]
+
+def test_flag_set_again_after_being_cleared(world, state):
+    tracker = MissionTracker(world, state)
+    state["torch_lit"] = True
+    tracker.update(_look())
+    state["torch_lit"] = False
+    tracker.update(SimpleNamespace(command="talk", target="gnomo", indirect=None))
+    assert state["missions"]["chiacchiere"] == "In corso"
+    state["torch_lit"] = True
+    tracker.update(_look())
+    assert state["missions"]["chiacchiere"] == "Completata"
+
+def test_missions_swapped_in_the_same_turn(world, state):
+    world.missions["partenza"] = Mission("partenza", "Partenza", "", {"visited_room": ["a"]}, [], {})
+    tracker = MissionTracker(world, state)
+    tracker.update(_look())
+    # una rimossa e una aggiunta: il numero delle missioni non cambia
+    del state["missions"]["oggetti"]
+    state["missions"]["partenza"] = "In corso"
+    assert tracker.update(_look()) == ["Missione 'Partenza' completata!"]
+    # la missione rimossa, se riattivata, viene valutata di nuovo
+    state["inventory"].extend(["chiave", "gemma"])
+    tracker.update(_look())
+    state["missions"]["oggetti"] = "In corso"
+    assert tracker.update(_look()) == ["Missione 'Oggetti' completata!"]
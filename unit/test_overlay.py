@@ -0,0 +1,43 @@
+import pytest
+from engine.data.models import World, Room, Item
+from engine.data.overlay import WorldOverlay
+
+@pytest.fixture
+def base_world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, ["chiave"])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.items["chiave"] = Item("chiave", ["chiave"], "Una chiave", 0.1, [])
+    return w
+
+def test_writes_stay_in_session_delta(base_world):
+    s1, s2 = WorldOverlay(base_world), WorldOverlay(base_world)
+    s1.rooms["a"].items.remove("chiave")
+    s1.rooms["b"].items.append("chiave")
+
+    assert list(s1.rooms["b"].items) == ["chiave"]
+    assert "chiave" in s2.rooms["a"].items
+    assert base_world.rooms["a"].items == ["chiave"]
+    assert base_world.rooms["b"].items == []
+    assert set(s1.delta()["room_items"]) == {"a", "b"}
+
+def test_reads_do_not_grow_delta(base_world):
+    s = WorldOverlay(base_world)
+    assert "chiave" in s.rooms["a"].items
+    assert "Room A" in s.rooms["a"].describe({}, s)
+    assert s.delta()["room_items"] == {}
+
+def test_spawned_items_flags_and_exits(base_world):
+    s = WorldOverlay(base_world)
+    s.items["gemma"] = Item("gemma", ["gemma"], "Una gemma", 0.2, [])
+    s.flags["porta_aperta"] = True
+    s.rooms["b"].set_exit("su", "a")
+
+    assert "gemma" in s.items and "gemma" not in base_world.items
+    assert s.flags["porta_aperta"] and "porta_aperta" not in base_world.flags
+    assert s.rooms["b"].connections["su"] == "a"
+    assert "su" not in base_world.rooms["b"].connections
+
+    other = WorldOverlay(base_world)
+    other.restore(s.delta())
+    assert other.rooms["b"].connections["su"] == "a" and "gemma" in other.items
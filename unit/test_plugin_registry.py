@@ -0,0 +1,117 @@
+import sys
+import pytest
+from engine.core.dispatcher import EventDispatcher
+from engine.plugins.registry import PluginRegistry, analyze_source
+
+LAZY = '''
+from engine.plugins.base import PluginBase
+
+IMPORTS.append(__name__)
+
+class Lanterna(PluginBase):
+    priority = 5
+
+    def on_pre_action(self, action, state, world):
+        if action.command == "look":
+            return "buio"
+
+    def on_command_accendi(self, action, state, world):
+        return "acceso"
+'''
+
+EAGER = '''
+from engine.plugins.base import PluginBase
+
+IMPORTS.append(__name__)
+
+class Campana(PluginBase):
+    def register(self, dispatcher):
+        dispatcher.register_command("suona", lambda a, s, w: "din")
+'''
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    # moduli "plugins.*" isolati per ogni test
+    for name in [m for m in sys.modules if m == "plugins" or m.startswith("plugins.")]:
+        monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    imports = []
+    monkeypatch.setattr("builtins.IMPORTS", imports, raising=False)
+    (tmp_path / "plugins").mkdir()
+    (tmp_path / "plugins" / "luce.py").write_text(LAZY)
+    (tmp_path / "plugins" / "campana.py").write_text(EAGER)
+    yield tmp_path, imports
+    for name in [m for m in sys.modules if m == "plugins" or m.startswith("plugins.")]:
+        del sys.modules[name]
+
+def _action(command):
+    from types import SimpleNamespace
+    return SimpleNamespace(command=command, target=None, indirect=None)
+
+def test_analyze_source():
+    (spec,) = analyze_source(LAZY)
+    assert spec["class"] == "Lanterna" and spec["priority"] == 5
+    assert spec["events"] == [["command_accendi", "on_command_accendi", None, None],
+                              ["pre_action", "on_pre_action", None, None]]
+    assert analyze_source(EAGER) is None
+    assert analyze_source("class X(Altro): pass") is None
+    assert analyze_source("class Errore(Exception): pass") == []
+
+def test_analyze_when_filters():
+    source = LAZY.replace("import PluginBase", "import PluginBase, when").replace(
+        "    def on_pre_action", '    @when(command="look", room=("grotta", "cripta"), priority=9)\n    def on_pre_action')
+    (spec,) = analyze_source(source)
+    assert spec["events"][1] == ["pre_action", "on_pre_action",
+                                 {"command": "look", "room": ["cripta", "grotta"]}, 9]
+    assert analyze_source(source.replace("@when(", "@altro(")) is None
+
+def test_lazy_import_on_first_event(root):
+    path, imports = root
+    registry = PluginRegistry(str(path))
+    dispatcher = EventDispatcher()
+    registry.attach(dispatcher)
+    assert imports == ["plugins.campana"]
+    assert dispatcher.dispatch(_action("suona"), {}, None) == "din"
+
+    assert dispatcher.emit("pre_action", _action("look"), {}, None) == "buio"
+    assert imports == ["plugins.campana", "plugins.luce"]
+    # il proxy è stato sostituito dal metodo vero
+    assert all(getattr(cb, "__self__", None) for cb in dispatcher.subscribers["pre_action"])
+    assert dispatcher.dispatch(_action("accendi"), {}, None) == "acceso"
+
+def test_manifest_reused_until_file_changes(root, monkeypatch):
+    path, _ = root
+    PluginRegistry(str(path))
+    monkeypatch.setattr("engine.plugins.registry.analyze_source",
+                        lambda src: pytest.fail("manifest non riusato"))
+    assert [spec.cls for _, spec in PluginRegistry(str(path)).specs if spec] == ["Lanterna"]
+
+    monkeypatch.undo()
+    (path / "plugins" / "luce.py").write_text(LAZY.replace("priority = 5", "priority = 7"))
+    (spec,) = [spec for _, spec in PluginRegistry(str(path)).specs if spec]
+    assert spec.priority == 7
+
+def test_sessions_get_their_own_instances(root):
+    path, imports = root
+    registry = PluginRegistry(str(path))
+    d1, d2 = EventDispatcher(), EventDispatcher()
+    p1 = [p for p in registry.attach(d1) if hasattr(p, "materialize")][0]
+    p2 = [p for p in registry.attach(d2) if hasattr(p, "materialize")][0]
+    d1.emit("pre_action", _action("look"), {}, None)
+    d2.emit("pre_action", _action("look"), {}, None)
+    assert p1.instance is not p2.instance
+    assert p1.instance.dispatcher is d1
+    assert imports.count("plugins.luce") == 1
+
+def test_lazy_plugin_keeps_filters(root):
+    path, imports = root
+    source = LAZY.replace("import PluginBase", "import PluginBase, when").replace(
+        "    def on_pre_action", '    @when(room="grotta")\n    def on_pre_action')
+    (path / "plugins" / "luce.py").write_text(source)
+    dispatcher = EventDispatcher()
+    PluginRegistry(str(path)).attach(dispatcher)
+    assert dispatcher.emit("pre_action", _action("look"), {"current_room": "bosco"}, None) is None
+    assert "plugins.luce" not in imports
+    assert dispatcher.emit("pre_action", _action("look"), {"current_room": "grotta"}, None) == "buio"
+    assert dispatcher.emit("pre_action", _action("look"), {"current_room": "grotta"}, None) == "buio"
+    assert dispatcher.emit("pre_action", _action("look"), {"current_room": "bosco"}, None) is None
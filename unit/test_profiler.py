@@ -0,0 +1,61 @@
+import json
+import pytest
+from engine.core.game import Game
+from engine.core.profiler import Histogram, Profiler, PROFILE_ENV
+from engine.data.models import World, Room, Item
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, ["chiave"])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.items["chiave"] = Item("chiave", ["chiave"], "", 1.0, [])
+    return w
+
+def test_histogram_percentiles():
+    h = Histogram()
+    for ns in [1000] * 90 + [100000] * 10:
+        h.add(ns)
+    assert h.count == 100 and h.min == 1000 and h.max == 100000
+    assert 1000 <= h.percentile(0.5) < 2048
+    assert 65536 <= h.percentile(0.99) <= 100000
+
+def test_disabled_by_default(world, tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+    game = Game(world, save_dir=str(tmp_path))
+    assert game.profiler is None
+    assert not hasattr(game.parser.parse, "__wrapped__")
+    assert "disattivata" in game.process("profile")
+
+def test_stages_and_callbacks(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path), profile=True)
+    game.process("vai est")
+    game.process("vai ovest")
+    stats = game.profiler.as_dict()
+    for name in ("turn", "stage:parse", "stage:pre_action", "stage:dispatch", "stage:clock",
+                 "stage:missions", "stage:post_action", "core:move"):
+        assert stats[name]["count"] == 2
+    assert "stage:dispatch" in game.process("profile")
+
+def test_json_and_reset(world, tmp_path):
+    game = Game(world, save_dir=str(tmp_path), profile=True)
+    game.process("guarda")
+    assert "turn" in json.loads(game.process("profile json"))
+    game.process("profile reset")
+    # il turno del reset è registrato solo dopo l'azzeramento
+    stats = game.profiler.as_dict()
+    assert "stage:parse" not in stats and stats["turn"]["count"] == 1
+
+def test_env_dumps_report(world, tmp_path, monkeypatch):
+    path = tmp_path / "profile.json"
+    monkeypatch.setenv(PROFILE_ENV, str(path))
+    game = Game(world, save_dir=str(tmp_path))
+    game.process("guarda")
+    game.close()
+    assert json.loads(path.read_text())["turn"]["count"] == 1
+
+def test_shared_profiler(world, tmp_path):
+    profiler = Profiler()
+    for _ in range(2):
+        Game(world, save_dir=str(tmp_path), profile=profiler).process("guarda")
+    assert profiler.histograms["turn"].count == 2
@@ -0,0 +1,51 @@
+import pytest
+from engine.data.models import World, Room, Item, Exits
+from engine.data.overlay import WorldOverlay
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, ["chiave"])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.items["chiave"] = Item("chiave", ["chiave"], "", 1.0, [])
+    w.items["gemma"] = Item("gemma", ["gemma"], "", 1.0, [])
+    return w
+
+def test_unchanged_room_is_cached(world, monkeypatch):
+    room = world.rooms["a"]
+    first = room.describe({}, world)
+    monkeypatch.setattr(Room, "render", lambda *a: pytest.fail("render non in cache"))
+    assert room.describe({}, world) is first
+
+def test_items_and_exits_invalidate(world):
+    room = world.rooms["a"]
+    room.describe({}, world)
+    room.items.append("gemma")
+    assert "gemma" in room.describe({}, world)
+    room.set_exit("nord", "b")
+    assert "nord" in room.describe({}, world)
+
+def test_explicit_invalidation(world):
+    room = world.rooms["a"]
+    room.describe({}, world)
+    room.desc = "Cambiata"
+    assert "Cambiata" not in room.describe({}, world)
+    world.invalidate_descriptions("a")
+    assert "Cambiata" in room.describe({}, world)
+
+def test_sessions_share_cache_until_they_diverge(world):
+    s1, s2 = WorldOverlay(world), WorldOverlay(world)
+    text = s1.rooms["a"].describe({}, s1)
+    assert s2.rooms["a"].describe({}, s2) is text
+    s1.rooms["a"].items.remove("chiave")
+    assert "chiave" not in s1.rooms["a"].describe({}, s1)
+    assert s2.rooms["a"].describe({}, s2) is text
+    s2.flags["allarme"] = True
+    assert s2.rooms["a"].describe({}, s2) == text
+
+def test_exits_compare_like_a_mapping():
+    exits = Exits({"est": "b", "nord": "c"})
+    assert exits == {"nord": "c", "est": "b"}
+    assert exits == Exits({"nord": "c", "est": "b"})
+    with pytest.raises(TypeError):
+        hash(exits)
@@ -0,0 +1,63 @@
+import pytest
+from engine.core.routing import RoomGraph, Router, bfs_directions, router
+from engine.core.parser import Parser
+from engine.data.models import World, Room
+from engine.data.overlay import WorldOverlay
+
+@pytest.fixture
+def world():
+    # a -> b -> c -> d, scorciatoia a -> c, d senza ritorno verso a
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Atrio", "", {"est": "b", "scala": "c"}, [])
+    w.rooms["b"] = Room("b", "Biblioteca", "", {"ovest": "a", "est": "c"}, [])
+    w.rooms["c"] = Room("c", "Cantina", "", {"ovest": "b", "giu": "d"}, [])
+    w.rooms["d"] = Room("d", "Deposito", "", {"su": "c"}, [])
+    w.rooms["e"] = Room("e", "Eremo", "", {}, [])
+    return w
+
+@pytest.mark.parametrize("next_hop_max", [100, 0])
+def test_shortest_paths(world, next_hop_max):
+    r = Router(RoomGraph(world.rooms), next_hop_max=next_hop_max)
+    assert r.directions("a", "d") == ["scala", "giu"]
+    assert r.directions("d", "a") == ["su", "ovest", "ovest"]
+    assert r.distance("a", "a") == 0
+    assert r.directions("a", "e") is None
+    assert r.next_step("d", "a") == "c"
+
+def test_router_matches_bfs(world):
+    r = Router(RoomGraph(world.rooms), next_hop_max=0)
+    for s in world.rooms:
+        for t in world.rooms:
+            expected = bfs_directions(world.rooms, s, t)
+            got = r.directions(s, t)
+            assert (got is None) == (expected is None)
+            if got is not None:
+                assert len(got) == len(expected)
+
+def test_router_is_shared_by_sessions(world):
+    assert router(WorldOverlay(world)) is router(world)
+
+def test_travel_command(world):
+    from engine.core.dispatcher import EventDispatcher
+    overlay = WorldOverlay(world)
+    state = {"current_room": "d", "inventory": [], "visited": {"a", "d"}}
+    action = Parser().parse("vai all'atrio", state, overlay)
+    assert (action.command, action.target) == ("travel", "a")
+    out = EventDispatcher().dispatch(action, state, overlay)
+    assert state["current_room"] == "a"
+    assert "su, ovest, ovest" in out
+
+def test_travel_visits_every_room_on_the_route(world):
+    from engine.core.dispatcher import EventDispatcher
+    from engine.core.missions import MissionTracker
+    from engine.data.models import Mission
+    world.missions["biblioteca"] = Mission("biblioteca", "Biblioteca", "", {"visited_room": ["b"]}, [],
+                                           {"message": "Hai trovato la biblioteca!"})
+    overlay = WorldOverlay(world)
+    state = {"current_room": "d", "inventory": [], "visited": {"a", "d"},
+             "missions": {"biblioteca": "In corso"}}
+    tracker = MissionTracker(overlay, state)
+    action = Parser().parse("vai all'atrio", state, overlay)
+    EventDispatcher().dispatch(action, state, overlay)
+    assert state["visited"] == {"a", "b", "c", "d"}
+    assert tracker.update(action) == ["Hai trovato la biblioteca!"]
@@ -0,0 +1,100 @@
+import os
+import pytest
+from engine.data.containers import ItemBag
+from engine.data.models import World, Room, Item
+from engine.data.overlay import WorldOverlay
+from engine.data.saves import SaveStore, SaveError, restore_state
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b"}, ["chiave"])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.items["chiave"] = Item("chiave", ["chiave"], "", 1.0, [])
+    return WorldOverlay(w)
+
+@pytest.fixture
+def state():
+    return {"current_room": "a", "inventory": ItemBag(), "missions": {}, "time": 0, "visited": {"a"}}
+
+def test_round_trip(tmp_path, world, state):
+    store = SaveStore(str(tmp_path))
+    world.rooms["a"].items.remove("chiave")
+    state["inventory"].append("chiave")
+    world.flags["porta_aperta"] = True
+    store.save("slot1", state, world)
+
+    image = SaveStore(str(tmp_path)).load("slot1")
+    restored = restore_state(image)
+    assert restored["inventory"] == ["chiave"]
+    assert image["room_items"]["a"] == []
+    assert image["flags"] == {"porta_aperta": True}
+
+def test_later_saves_append_deltas(tmp_path, world, state):
+    store = SaveStore(str(tmp_path))
+    full = store.save("auto", state, world)
+    state["current_room"] = "b"
+    state["visited"].add("b")
+    delta = store.save("auto", state, world)
+    assert 0 < delta < full
+    assert store.save("auto", state, world) == 0
+    assert os.path.getsize(store.path("auto")) == full + delta
+    assert restore_state(SaveStore(str(tmp_path)).load("auto"))["visited"] == {"a", "b"}
+
+def test_compaction_after_many_deltas(tmp_path, world, state):
+    store = SaveStore(str(tmp_path), compact_every=3)
+    store.save("auto", state, world)
+    for t in range(1, 5):
+        state["time"] = t
+        store.save("auto", state, world)
+    assert restore_state(store.load("auto"))["time"] == 4
+    assert store._slots["auto"][1] < 3
+
+def test_truncated_tail_is_ignored(tmp_path, world, state):
+    store = SaveStore(str(tmp_path))
+    store.save("auto", state, world)
+    state["time"] = 5
+    store.save("auto", state, world)
+    with open(store.path("auto"), "r+b") as f:
+        f.truncate(os.path.getsize(store.path("auto")) - 3)
+    assert restore_state(SaveStore(str(tmp_path)).load("auto"))["time"] == 0
+
+def test_invalid_or_missing_slot(tmp_path):
+    store = SaveStore(str(tmp_path))
+    with pytest.raises(SaveError):
+        store.load("nessuno")
+    with pytest.raises(SaveError):
+        store.path("../fuori")
+
+def test_game_save_and_load_commands(tmp_path, world):
+    from engine.core.game import Game
+    game = Game(world.base, save_dir=str(tmp_path))
+    game.process("prendi chiave")
+    assert "completato" in game.process("salva prova")
+    game.process("lascia chiave")
+    assert "completato" in game.process("carica prova")
+    assert "chiave" in game.state["inventory"]
+    assert "chiave" not in game.world.rooms["a"].items
+
+def test_two_sessions_saving_into_one_directory(tmp_path, world):
+    from engine.core.game import Game
+    first = Game(world.base, save_dir=str(tmp_path))
+    second = Game(world.base, save_dir=str(tmp_path))
+    first.process("salva comune")
+    second.process("vai est")
+    second.process("salva comune")
+    first.process("prendi chiave")
+    # first non deve appendere un delta sullo snapshot scritto da second
+    first.process("salva comune")
+    image = SaveStore(str(tmp_path)).load("comune")
+    assert image["state"]["current_room"] == "a"
+    assert image["state"]["inventory"] == ["chiave"]
+    second.process("carica comune")
+    assert second.state["current_room"] == "a" and "chiave" in second.state["inventory"]
+
+def test_server_sessions_get_their_own_save_directory(tmp_path, world):
+    from engine.core.server import default_session
+    a = default_session(world.base, save_root=str(tmp_path))
+    b = default_session(world.base, save_root=str(tmp_path))
+    assert a.saves.directory != b.saves.directory
+    assert os.path.dirname(a.saves.directory) == str(tmp_path)
@@ -0,0 +1,53 @@
+from engine.core.dispatcher import EventDispatcher
+from engine.core.parser import Parser
+from engine.core.spelling import SpellingIndex, edit_distance, world_spelling
+from engine.data.models import World, Room, Item, NPC
+from engine.data.overlay import WorldOverlay
+
+def _world():
+    w = World({"start_room": "atrio"})
+    w.rooms["atrio"] = Room("atrio", "Atrio", "", {"nord": "taverna"}, ["torcia"])
+    w.rooms["taverna"] = Room("taverna", "Taverna", "", {"sud": "atrio"}, [])
+    w.items["torcia"] = Item("torcia", ["torcia", "lanterna"], "", 1.0, [])
+    w.npcs["gnomo"] = NPC("gnomo", "Gnomo", "atrio", [])
+    return WorldOverlay(w)
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("prendi", "prnedi", 2) == 1
+    assert edit_distance("lanterna", "lanterma", 2) == 1
+    assert edit_distance("guarda", "prendi", 2) == 3
+
+def test_index_matches_a_full_scan():
+    words = ["prendi", "lascia", "guarda", "parla", "lanterna", "lanterne", "taverna", "torcia"]
+    index = SpellingIndex(words)
+    for typo in ["prnedi", "lanterma", "tavrena", "trocia", "parl", "guardaa", "xyz"]:
+        scan = sorted((w, d) for w, d in ((w, edit_distance(typo, w, 2)) for w in words) if d <= 2)
+        assert sorted(index.lookup(typo)) == scan
+    assert index.correct("tavrena") == "taverna"
+    # due termini alla stessa distanza: nessuna correzione automatica
+    assert index.correct("lanternx") is None
+    assert index.correct("xyz") is None
+
+def test_parser_corrects_verbs_and_names():
+    world = _world()
+    parser = Parser()
+    state = {"current_room": "atrio", "inventory": []}
+    a = parser.parse("prnedi la lanterma", state, world)
+    assert (a.command, a.target) == ("take", "torcia")
+    a = parser.parse("parla gnmoo", state, world)
+    assert (a.command, a.target) == ("talk", "gnomo")
+    a = parser.parse("raggiungi tavrena", state, world)
+    assert (a.command, a.target) == ("travel", "taverna")
+    # gli indici sono condivisi fra le sessioni dello stesso mondo
+    assert world_spelling(world) is world_spelling(WorldOverlay(world.base))
+
+def test_unknown_verbs_get_suggestions_and_known_ones_are_kept():
+    parser = Parser()
+    dispatcher = EventDispatcher(parser.grammar)
+    parser.known = dispatcher.knows
+    a = parser.parse("prnd torcia")
+    assert a.command == "prnd" and a.suggestions == ("prendi",)
+    assert "Forse intendevi: prendi?" in dispatcher.dispatch(a, {}, None)
+    # un verbo gestito solo da un hook non viene "corretto"
+    dispatcher.subscribe("command_prendo", lambda action, state, world: "ok")
+    assert parser.parse("prendo torcia").command == "prendo"
@@ -0,0 +1,84 @@
+import pickle
+import pytest
+from engine.data.containers import ItemBag
+from engine.data.models import World, Room
+from engine.data.overlay import WorldOverlay
+from engine.data.saves import SaveStore, restore_state
+from engine.data.state import GameState
+
+@pytest.fixture
+def state():
+    return GameState(current_room="a", visited=("a",))
+
+def test_dict_style_access(state):
+    assert state["current_room"] == "a" and state.current_room == "a"
+    assert state["variables"] == {} and state["talked_to"] == set()
+    state["torch_lit"] = True
+    assert state.get("torch_lit") and state.flags == {"torch_lit": True}
+    assert state.get("assente", 3) == 3 and "assente" not in state
+    state.setdefault("visited", set()).add("b")
+    assert state.visited == {"a", "b"}
+    state["inventory"] = ["torcia"]
+    assert isinstance(state.inventory, ItemBag)
+    del state["torch_lit"]
+    assert "torch_lit" not in state
+    with pytest.raises(KeyError):
+        del state["inventory"]
+
+def test_dirty_tracking(state):
+    assert "current_room" in state.dirty()
+    state.snapshot()
+    assert state.dirty() == set()
+    state["visited"].add("b")
+    state["variables"]["dialogue_mago"] = 1
+    state["current_room"] = "b"
+    state["torch_lit"] = True
+    assert state.dirty() == {"visited", "variables", "current_room", "torch_lit"}
+    state.snapshot()
+    state["visited"].add("b")
+    state["time"] = 0
+    assert state.dirty() == set()
+
+def test_snapshot_reuses_unchanged_copies(state):
+    first = state.snapshot()
+    state["inventory"].append("torcia")
+    second = state.snapshot()
+    assert second["visited"] is first["visited"]
+    assert second["inventory"] is not first["inventory"] and second["inventory"] == ["torcia"]
+    assert type(second["visited"]) is set
+    state["visited"].add("b")
+    assert second["visited"] == {"a"}
+
+def test_pickle_and_equality(state):
+    state["torch_lit"] = True
+    copy = pickle.loads(pickle.dumps(state))
+    assert copy == state and copy.flags == {"torch_lit": True}
+    assert dict(copy) == dict(state)
+
+def test_save_round_trip_and_small_deltas(tmp_path, state):
+    w = World({"start_room": "a"})
+    w.rooms["a"] = Room("a", "Room A", "A", {}, [])
+    world = WorldOverlay(w)
+    store = SaveStore(str(tmp_path))
+    state["visited"].update(f"r{n}" for n in range(500))
+    full = store.save("auto", state, world)
+    state["time"] = 1
+    assert store.save("auto", state, world) < full / 10
+
+    restored = restore_state(SaveStore(str(tmp_path)).load("auto"))
+    assert isinstance(restored, GameState) and restored == state
+    assert restored.dirty() == set()
+
+def test_nested_values_are_tracked_and_copied(state):
+    state["variables"]["porta"] = {"aperta": False}
+    state["diario"] = ["inizio"]
+    first = state.snapshot()
+    state["variables"]["porta"]["aperta"] = True
+    state["diario"].append("porta")
+    assert {"variables", "diario"} <= state.dirty()
+    second = state.snapshot()
+    assert first["variables"]["porta"] == {"aperta": False} and first["diario"] == ["inizio"]
+    assert second["variables"]["porta"] == {"aperta": True} and second["diario"] == ["inizio", "porta"]
+    restored = GameState.from_dict(second, clean=True)
+    restored["variables"]["porta"]["aperta"] = False
+    assert second["variables"]["porta"]["aperta"] is True
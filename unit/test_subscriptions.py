@@ -0,0 +1,68 @@
+import pytest
+from types import SimpleNamespace
+from engine.core.dispatcher import EventDispatcher
+from engine.plugins.base import PluginBase, when
+
+def _action(command, target=None, indirect=None):
+    return SimpleNamespace(command=command, target=target, indirect=indirect)
+
+def _recorder(calls, name, result=None):
+    def callback(action, state, world):
+        calls.append(name)
+        return result
+    return callback
+
+def test_only_matching_callbacks_run():
+    d = EventDispatcher()
+    calls = []
+    d.subscribe("pre_action", _recorder(calls, "sempre"))
+    d.subscribe("pre_action", _recorder(calls, "grotta"), room="grotta")
+    d.subscribe("pre_action", _recorder(calls, "look"), command="look")
+    d.subscribe("pre_action", _recorder(calls, "torcia"), item="torcia")
+    d.subscribe("pre_action", _recorder(calls, "acceso"), flag="torch_lit")
+    d.subscribe("pre_action", _recorder(calls, "look_grotta"), command="look", room="grotta")
+
+    d.emit("pre_action", _action("look"), {"current_room": "bosco"}, None)
+    assert calls == ["sempre", "look"]
+    calls.clear()
+    d.emit("pre_action", _action("use", "torcia"), {"current_room": "grotta", "torch_lit": True}, None)
+    assert calls == ["sempre", "grotta", "torcia", "acceso"]
+    calls.clear()
+    d.emit("pre_action", _action("look"), {"current_room": "grotta"}, None)
+    assert calls == ["sempre", "grotta", "look", "look_grotta"]
+
+def test_priority_order_across_buckets():
+    d = EventDispatcher()
+    calls = []
+    d.subscribe("pre_action", _recorder(calls, "basso"), priority=-1)
+    d.subscribe("pre_action", _recorder(calls, "stanza"), priority=5, room="a")
+    d.subscribe("pre_action", _recorder(calls, "comando"), priority=10, command="look")
+    d.subscribe("pre_action", _recorder(calls, "oggetto"), priority=5, item=("x", "y"))
+    d.emit("pre_action", _action("look", "x", "y"), {"current_room": "a"}, None)
+    assert calls == ["comando", "stanza", "oggetto", "basso"]
+
+def test_filtered_command_hooks():
+    d = EventDispatcher()
+    d.subscribe("command_use", lambda a, s, w: "acceso", item="torcia")
+    state = {"current_room": "a", "inventory": ["torcia", "chiave"]}
+    assert d.dispatch(_action("use", "torcia"), state, None) == "acceso"
+    assert d.dispatch(_action("use", "chiave"), state, None) == "Hai usato chiave."
+
+class Luce(PluginBase):
+    priority = 1
+
+    @when(command="look", room="grotta")
+    def on_pre_action(self, action, state, world):
+        return "buio"
+
+    @when(item="torcia", priority=7)
+    def on_command_use(self, action, state, world):
+        return "acceso"
+
+def test_when_decorator():
+    d = EventDispatcher()
+    Luce().register(d)
+    assert d.emit("pre_action", _action("look"), {"current_room": "grotta"}, None) == "buio"
+    assert d.emit("pre_action", _action("look"), {"current_room": "bosco"}, None) is None
+    assert d.emit("pre_action", _action("take"), {"current_room": "grotta"}, None) is None
+    assert d._entries["command_use"][0][0] == -7
@@ -0,0 +1,47 @@
+import pytest
+from engine.data.models import World, Room, Item, NPC, Mission
+from engine.data import validate
+from engine.data.validate import check_world
+
+@pytest.fixture
+def world():
+    w = World({"start_room": "a", "initial_missions": ["m1", "manca"]})
+    w.rooms["a"] = Room("a", "Room A", "A", {"est": "b", "nord": "fantasma"}, ["chiave", "spada"])
+    w.rooms["b"] = Room("b", "Room B", "B", {"ovest": "a"}, [])
+    w.rooms["c"] = Room("c", "Room C", "C", {}, [])
+    w.items["chiave"] = Item("chiave", ["chiave"], "", 1.0, [])
+    w.items["gemma"] = Item("gemma", ["gemma"], "", 1.0, [])
+    w.items["sasso"] = Item("sasso", ["sasso"], "", 1.0, [])
+    w.npcs["gnomo"] = NPC("gnomo", "Gnomo", "cantina", [])
+    w.missions["m1"] = Mission("m1", "M1", "", {"have_item": ["gemma"], "visited_room": ["z"]}, [], {})
+    return w
+
+def _codes(report):
+    return {(i["code"], i["id"]) for i in report["issues"]}
+
+def test_dangling_references(world):
+    codes = _codes(check_world(world, jobs=1))
+    assert ("dangling_exit", "a") in codes
+    assert ("unknown_item", "a") in codes
+    assert ("unknown_mission", "manca") in codes
+    assert ("unknown_room", "gnomo") in codes
+    assert ("unknown_room", "m1") in codes
+
+def test_talked_to_reports_unknown_npc(world):
+    world.missions["m1"].requirements["talked_to"] = ["gnomo", "fata"]
+    issues = [i for i in check_world(world, jobs=1)["issues"] if i["id"] == "m1"]
+    assert [i["code"] for i in issues if "fata" in i["message"]] == ["unknown_npc"]
+    assert not any("gnomo" in i["message"] for i in issues)
+
+def test_reachability_and_unused_items(world):
+    report = check_world(world, jobs=1)
+    codes = _codes(report)
+    assert report["reachable_rooms"] == 2
+    assert ("unreachable_room", "c") in codes
+    assert ("unused_item", "sasso") in codes
+    assert ("unused_item", "gemma") not in codes
+
+def test_parallel_matches_serial(world, monkeypatch):
+    monkeypatch.setattr(validate, "PARALLEL_MIN_ROOMS", 1)
+    monkeypatch.setattr(validate, "CHUNK_SIZE", 1)
+    assert check_world(world, jobs=2)["issues"] == check_world(world, jobs=1)["issues"]
@@ -0,0 +1,102 @@
+import os
+import yaml
+import pytest
+from engine.data import loader
+from engine.data.loader import load_world
+from engine.data.cache import cache_path_for
+
+@pytest.fixture
+def world_file(tmp_path):
+    cfg_dir = tmp_path / "config"
+    cfg_dir.mkdir()
+    world_data = {
+        "config": {"start_room": "a"},
+        "rooms": {
+            "a": {"name": "Room A", "desc": "A", "connections": {"est": "b"}, "items": []},
+            "b": {"name": "Room B", "desc": "B", "connections": {"ovest": "a"}, "items": []},
+        },
+    }
+    path = cfg_dir / "world.yaml"
+    path.write_text(yaml.safe_dump(world_data), encoding="utf-8")
+    return str(path)
+
+def test_first_load_writes_snapshot(world_file):
+    world = load_world(world_file, use_cache=True)
+    assert os.path.isfile(cache_path_for(world_file))
+    assert world.rooms["a"].connections["est"] == "b"
+
+def test_warm_load_skips_parsing(world_file, monkeypatch):
+    load_world(world_file, use_cache=True)
+
+    def fail(path):
+        raise AssertionError("parse_world non dovrebbe essere chiamato")
+    monkeypatch.setattr(loader, "parse_world", fail)
+
+    world = load_world(world_file, use_cache=True)
+    assert world.start_room_id == "a"
+
+def test_snapshot_invalidated_on_change(world_file):
+    load_world(world_file, use_cache=True)
+    data = yaml.safe_load(open(world_file, encoding="utf-8"))
+    data["rooms"]["c"] = {"name": "Room C", "desc": "C", "connections": {}, "items": []}
+    with open(world_file, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f)
+
+    world = load_world(world_file, use_cache=True)
+    assert "c" in world.rooms
+
+def test_lazy_world_materializes_on_access(world_file):
+    world = load_world(world_file, lazy=True, lazy_capacity=1)
+    assert world.rooms.resident_count == 0
+    assert "a" in world.rooms and len(world.rooms) == 2
+    assert world.rooms["b"].name == "Room B"
+    assert world.rooms.resident_count == 1
+
+def test_lazy_world_keeps_mutations_after_eviction(world_file):
+    world = load_world(world_file, lazy=True, lazy_capacity=1)
+    world.rooms["a"].items.append("chiave")
+    world.rooms["b"]  # espelle "a" dall'LRU
+    assert world.rooms["a"].items == ["chiave"]
+
+def test_numeric_ids_load_and_null_ids_are_reported(tmp_path):
+    path = tmp_path / "world.yaml"
+    path.write_text("config: {start_room: 1}\n"
+                    "rooms:\n"
+                    "  1: {name: Uno, connections: {est: 2}}\n"
+                    "  2: {name: Due, connections: {ovest: 1}}\n", encoding="utf-8")
+    world = load_world(str(path))
+    assert world.rooms["1"].connections["est"] == "2"
+    assert world.rooms["2"].id == "2"
+    assert world.start_room_id == "1"
+
+    path.write_text("rooms:\n  ~: {name: Nessuna}\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Nessuna"):
+        load_world(str(path))
+
+def test_lazy_world_reads_derived_indexes_from_the_snapshot(tmp_path):
+    from engine.core.game import Game
+    rooms = {f"r{n}": {"name": f"Stanza {n}", "connections": {"est": f"r{n + 1}", "ovest": f"r{n - 1}"},
+                       "items": []} for n in range(1, 49)}
+    rooms["r0"] = {"name": "Ingresso", "connections": {"est": "r1"}, "items": []}
+    rooms["r49"] = {"name": "Fondo", "connections": {"ovest": "r48"}, "items": []}
+    missions = {f"m{n}": {"title": f"M{n}", "requirements": {"visited_room": [f"r{n}"]}} for n in range(50)}
+    path = tmp_path / "world.yaml"
+    path.write_text(yaml.safe_dump({"config": {"start_room": "r0"}, "rooms": rooms, "missions": missions}),
+                    encoding="utf-8")
+    load_world(str(path), lazy=True)
+
+    world = load_world(str(path), lazy=True, lazy_capacity=8)
+    game = Game(world, save_dir=str(tmp_path))
+    game.process("prendi qualcosa")
+    game.process("vai est")
+    assert game.state["current_room"] == "r1"
+    # né alias, né missioni, né grafo scorrono le tabelle
+    assert world.rooms.resident_count <= 3
+    assert world.missions.resident_count == 0
+
+def test_lazy_load_from_a_read_only_directory(world_file, monkeypatch):
+    def read_only(*args, **kwargs):
+        raise OSError("sola lettura")
+    monkeypatch.setattr(loader, "write_snapshot", read_only)
+    world = load_world(world_file, lazy=True)
+    assert world is not None and world.rooms["b"].name == "Room B"